@@ -0,0 +1,271 @@
+"""
+Pools of long-lived worker processes, one pool per project.
+
+The three projects pin incompatible LangChain versions, so each pool starts
+`worker.py` inside its own project directory with that project's
+interpreter and talks to it over stdio (see protocol.py). Workers stay up
+between requests, keeping imports, HTTP clients and caches warm, and every
+worker runs one agent at a time, so a pool of N uses up to N cores.
+
+Backpressure: a request waits for an idle worker, but only while fewer than
+`max_queue` requests are already waiting. Beyond that, run() raises
+Overloaded straight away (HTTP 503). Every request has a deadline that
+covers queueing and execution. When a request times out or its client goes
+away, the worker is told to cancel. If it does not stop within
+CANCEL_GRACE_S, it is killed and replaced.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+# --- Defaults (override through .env) ---
+READY_TIMEOUT_S = float(os.getenv("AGENT_SERVICE_READY_TIMEOUT_S", "120"))
+CANCEL_GRACE_S = float(os.getenv("AGENT_SERVICE_CANCEL_GRACE_S", "10"))
+# Results carry whole reports and compositions; asyncio's default 64 KiB line limit is too small
+LINE_LIMIT_BYTES = 16 * 1024 * 1024
+RESPAWN_BACKOFF_S = (1, 2, 5, 10, 30)
+
+
+class PoolError(Exception):
+    status = 502
+    error_type = "worker_failed"
+
+
+class InvalidRequest(PoolError):
+    status = 400
+    error_type = "invalid_request"
+
+
+class Overloaded(PoolError):
+    status = 503
+    error_type = "overloaded"
+
+
+class RequestTimeout(PoolError):
+    status = 504
+    error_type = "timeout"
+
+
+class Worker:
+    """One worker process and its stdio pipes."""
+
+    def __init__(self, name: str, process: asyncio.subprocess.Process):
+        self.name = name
+        self.process = process
+        self.served = 0
+
+    @classmethod
+    async def spawn(cls, name: str, command: Sequence[str], cwd: str, env: Dict[str, str]) -> "Worker":
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=cwd,
+            env=env,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=LINE_LIMIT_BYTES,
+        )
+        worker = cls(name, process)
+        try:
+            # The first line is sent once the project's imports are done
+            message = await asyncio.wait_for(worker.read(), READY_TIMEOUT_S)
+        except BaseException:
+            worker.kill()
+            raise
+        if message.get("event") != "ready":
+            worker.kill()
+            raise PoolError(f"{name}: unexpected first message {message!r}")
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        return self.process.returncode is None
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        try:
+            self.process.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            raise PoolError(f"{self.name} is gone: {e}") from e
+
+    async def read(self) -> Dict[str, Any]:
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                raise PoolError(f"{self.name} exited with code {await self.process.wait()}")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = None
+            if isinstance(message, dict):
+                return message
+            # Something printed to stdout before serve() claimed it (an import, a .pth hook); pass it on
+            print(f"[{self.name}] {line.decode('utf-8', 'replace').rstrip()}", file=sys.stderr)
+
+    def kill(self) -> None:
+        if self.alive:
+            self.process.kill()
+
+
+class WorkerPool:
+    """Runs tasks on a fixed number of worker processes of one project."""
+
+    def __init__(
+        self,
+        name: str,
+        command: Sequence[str],
+        cwd: str,
+        size: int = 2,
+        max_queue: int = 16,
+        timeout_s: float = 120.0,
+        env: Optional[Dict[str, str]] = None,
+        metrics_port: int = 0,
+    ):
+        self.name = name
+        self.command = list(command)
+        self.cwd = cwd
+        self.size = size
+        self.max_queue = max_queue
+        self.timeout_s = timeout_s
+        self.env = {**os.environ, **(env or {}), "PYTHONUNBUFFERED": "1"}
+        # Worker i serves its /metrics on metrics_port + i (0: none); a shared port would serve only one worker
+        self.metrics_port = metrics_port
+        self._idle: "asyncio.Queue[Worker]" = asyncio.Queue()
+        self._workers: List[Worker] = []
+        self._background: set = set()
+        self._waiting = 0
+        self._closed = False
+        self._counters = {"served": 0, "failed": 0, "timeouts": 0, "rejected": 0, "cancelled": 0, "restarts": 0}
+
+    async def start(self) -> None:
+        workers = await asyncio.gather(*(self._spawn(i) for i in range(self.size)))
+        for worker in workers:
+            self._idle.put_nowait(worker)
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._background):
+            task.cancel()
+        for worker in self._workers:
+            worker.kill()
+        await asyncio.gather(*(w.process.wait() for w in self._workers), return_exceptions=True)
+
+    async def _spawn(self, index: int) -> Worker:
+        port = self.metrics_port + index if self.metrics_port else 0
+        env = {**self.env, "INSTRUMENTATION_METRICS_PORT": str(port)}
+        worker = await Worker.spawn(f"{self.name}-{index}", self.command, self.cwd, env)
+        self._workers.append(worker)
+        return worker
+
+    def stats(self) -> Dict[str, Any]:
+        alive = sum(w.alive for w in self._workers)
+        return {
+            "workers": alive,
+            "idle": self._idle.qsize(),
+            "busy": alive - self._idle.qsize(),
+            "waiting": self._waiting,
+            "max_queue": self.max_queue,
+            **self._counters,
+        }
+
+    async def run(self, task: str, payload: Dict[str, Any], timeout_s: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run `task` on the next idle worker and yield its events as
+        {"event", "data"} dicts. The last one is {"event": "result"}.
+        Raises Overloaded, RequestTimeout, InvalidRequest or PoolError.
+        """
+        if self._closed:
+            raise PoolError(f"{self.name} pool is shut down")
+        if self._idle.empty() and self._waiting >= self.max_queue:
+            self._counters["rejected"] += 1
+            raise Overloaded(f"{self.name}: {self._waiting} requests already waiting for a worker")
+        timeout_s = min(timeout_s or self.timeout_s, self.timeout_s)
+        deadline = time.monotonic() + timeout_s
+
+        self._waiting += 1
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), timeout_s)
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            raise RequestTimeout(f"{self.name}: no worker became free within {timeout_s:g}s") from None
+        finally:
+            self._waiting -= 1
+
+        request_id = uuid.uuid4().hex
+        finished = False
+        try:
+            await worker.send({"id": request_id, "task": task, "payload": payload})
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    message = await asyncio.wait_for(worker.read(), max(remaining, 0.001))
+                except asyncio.TimeoutError:
+                    self._counters["timeouts"] += 1
+                    raise RequestTimeout(f"{self.name}: {task} did not finish within {timeout_s:g}s") from None
+                if message.get("id") != request_id:
+                    continue
+                event, data = message.get("event"), message.get("data") or {}
+                if event in ("result", "error"):
+                    finished = True
+                    worker.served += 1
+                if event == "error":
+                    self._counters["failed"] += 1
+                    error = InvalidRequest if data.get("type") == "invalid_request" else PoolError
+                    raise error(data.get("message") or "worker error")
+                yield {"event": event, "data": data}
+                if event == "result":
+                    self._counters["served"] += 1
+                    return
+        finally:
+            # No awaits here: this also runs when the client disconnects and the generator is closed
+            if finished:
+                self._idle.put_nowait(worker)
+            else:
+                self._in_background(self._recover(worker, request_id))
+
+    def _in_background(self, coroutine) -> None:
+        task = asyncio.ensure_future(coroutine)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _recover(self, worker: Worker, request_id: str) -> None:
+        """Cancel an abandoned request; reuse the worker if it stops in time, otherwise replace it."""
+        self._counters["cancelled"] += 1
+        try:
+            await worker.send({"id": request_id, "cancel": True})
+
+            async def drain():
+                while True:
+                    message = await worker.read()
+                    if message.get("id") == request_id and message.get("event") in ("result", "error"):
+                        return
+
+            await asyncio.wait_for(drain(), CANCEL_GRACE_S)
+        except (PoolError, asyncio.TimeoutError, ValueError):
+            await self._replace(worker)
+        else:
+            self._idle.put_nowait(worker)
+
+    async def _replace(self, worker: Worker) -> None:
+        worker.kill()
+        await worker.process.wait()
+        self._workers.remove(worker)
+        index = worker.name.rsplit("-", 1)[-1]
+        for delay in (*RESPAWN_BACKOFF_S, None):
+            if self._closed:
+                return
+            try:
+                replacement = await self._spawn(int(index))
+            except Exception as e:
+                print(f"[{self.name}] restarting worker {index} failed: {e}", file=sys.stderr)
+                if delay is None:
+                    return
+                await asyncio.sleep(delay)
+            else:
+                self._counters["restarts"] += 1
+                self._idle.put_nowait(replacement)
+                return
@@ -0,0 +1,129 @@
+"""
+Worker side of the agent service's stdio protocol (stdlib only).
+
+Each project's worker.py imports this module (it puts agent_service/ on
+sys.path) and calls serve() with its task handlers. Messages are one JSON
+object per line:
+
+    service -> worker   {"id": "...", "task": "search", "payload": {...}}
+                        {"id": "...", "cancel": true}
+    worker -> service   {"event": "ready", "tasks": [...]}                     once, after imports
+                        {"id": "...", "event": "<name>", "data": {...}}        progress, any number
+                        {"id": "...", "event": "result", "data": {...}}        last message of a request
+                        {"id": "...", "event": "error", "data": {"type", "message"}}
+
+A worker runs one request at a time. The agents print to stdout (verbose
+executors, debug prints), so the protocol keeps the real stdout for itself
+and sys.stdout is pointed at stderr.
+"""
+
+import json
+import sys
+import threading
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+
+class Cancelled(Exception):
+    """Raised by RequestContext.check() once the service has cancelled the request."""
+
+
+class InvalidRequest(ValueError):
+    """Raised by handlers for a bad payload; reported as invalid_request (HTTP 400) instead of failed."""
+
+
+def require(payload: Dict[str, Any], *names: str) -> list:
+    """The payload's values for `names`, which must be present and non-empty."""
+    missing = [name for name in names if payload.get(name) in (None, "")]
+    if missing:
+        raise InvalidRequest(f"missing field(s): {', '.join(missing)}")
+    return [payload[name] for name in names]
+
+
+class RequestContext:
+    """Handed to every task handler: emit() progress events, check() for cancellation."""
+
+    def __init__(self, request_id: str, channel: "_Channel"):
+        self.request_id = request_id
+        self._channel = channel
+        self.cancel_event = threading.Event()
+
+    def emit(self, event: str, data: Optional[Dict[str, Any]] = None) -> None:
+        self.check()
+        self._channel.send({"id": self.request_id, "event": event, "data": data or {}})
+
+    def check(self) -> None:
+        if self.cancel_event.is_set():
+            raise Cancelled()
+
+
+class _Channel:
+    def __init__(self, stream):
+        self._stream = stream
+        self._lock = threading.Lock()
+
+    def send(self, message: Dict[str, Any]) -> None:
+        line = json.dumps(message, ensure_ascii=False, default=str)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+
+Handler = Callable[[Dict[str, Any], RequestContext], Dict[str, Any]]
+
+
+def serve(handlers: Dict[str, Handler]) -> None:
+    """Answer requests from stdin until it closes. Requests are queued and run one by one on this thread."""
+    channel = _Channel(sys.stdout)
+    sys.stdout = sys.stderr
+    requests = []
+    ready = threading.Condition()
+    current: Dict[str, RequestContext] = {}
+
+    def read_stdin() -> None:
+        # Cancellations must be seen while a handler runs, so stdin is read on its own thread
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            message = json.loads(line)
+            with ready:
+                if message.get("cancel"):
+                    context = current.get(message["id"])
+                    if context is not None:
+                        context.cancel_event.set()
+                else:
+                    current[message["id"]] = RequestContext(message["id"], channel)
+                    requests.append(message)
+                    ready.notify()
+        with ready:
+            requests.append(None)
+            ready.notify()
+
+    threading.Thread(target=read_stdin, name="protocol-stdin", daemon=True).start()
+    channel.send({"event": "ready", "tasks": sorted(handlers)})
+
+    while True:
+        with ready:
+            while not requests:
+                ready.wait()
+            message = requests.pop(0)
+            if message is None:
+                return
+            context = current[message["id"]]
+        try:
+            context.check()
+            handler = handlers.get(message.get("task"))
+            if handler is None:
+                raise InvalidRequest(f"unknown task: {message.get('task')!r}")
+            result = handler(message.get("payload") or {}, context)
+            context.check()
+            channel.send({"id": context.request_id, "event": "result", "data": result})
+        except Cancelled:
+            channel.send({"id": context.request_id, "event": "error", "data": {"type": "cancelled", "message": "cancelled"}})
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            error_type = "invalid_request" if isinstance(e, InvalidRequest) else "failed"
+            channel.send({"id": context.request_id, "event": "error", "data": {"type": error_type, "message": str(e)}})
+        finally:
+            with ready:
+                current.pop(context.request_id, None)
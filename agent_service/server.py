@@ -0,0 +1,203 @@
+"""
+Headless HTTP service for the three agents.
+
+    POST /v1/search    search_agent job search   {"role", "location", "filters", "mode", "skip_known"}
+    POST /v1/react     react_search_agent        {"question", "mode"}
+    POST /v1/compose   literary_composer         {"persona", "literature", "theme", "model", "temperature", "draft"}
+    GET  /v1/stats     per-pool worker, queue and error counters
+    GET  /healthz
+
+Every POST answers with the worker's final result as JSON, or, when the
+request sends `Accept: text/event-stream` (or "stream": true), with
+Server-Sent Events: one event per agent step / token and a final `result`
+(or `error`) event. A request may pass "timeout_s" to shorten the pool's
+timeout.
+
+Status codes: 400 bad payload, 503 + Retry-After when the pool's queue is
+full, 504 on timeout, 502 when the agent run fails.
+
+Usage (from the agent_service directory):
+    uv run python server.py --port 8800
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from pool import InvalidRequest, PoolError, WorkerPool
+
+load_dotenv()
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# --- Defaults (override through .env) ---
+DEFAULT_HOST = os.getenv("AGENT_SERVICE_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.getenv("AGENT_SERVICE_PORT", "8800"))
+DEFAULT_QUEUE = int(os.getenv("AGENT_SERVICE_MAX_QUEUE", "16"))
+DEFAULT_TIMEOUT_S = float(os.getenv("AGENT_SERVICE_TIMEOUT_S", "180"))
+# First of the workers' consecutive /metrics ports (one per worker, across all pools); 0 disables them
+DEFAULT_METRICS_PORT = int(os.getenv("AGENT_SERVICE_METRICS_PORT", "9465"))
+RETRY_AFTER_S = 2
+
+
+@dataclass(frozen=True)
+class Project:
+    pool: str
+    directory: str
+    task: str
+    env_prefix: str
+    default_workers: int
+
+    @property
+    def path(self) -> Path:
+        return REPO_ROOT / self.directory
+
+    def python(self) -> str:
+        """The project's own interpreter: <PREFIX>_PYTHON, else its .venv (uv sync), else this one."""
+        configured = os.getenv(f"{self.env_prefix}_PYTHON")
+        if configured:
+            return configured
+        venv = self.path / ".venv" / ("Scripts/python.exe" if os.name == "nt" else "bin/python")
+        return str(venv) if venv.exists() else sys.executable
+
+    def workers(self) -> int:
+        return int(os.getenv(f"{self.env_prefix}_WORKERS", str(self.default_workers)))
+
+
+PROJECTS = {
+    "/v1/search": Project("search", "search_agent", "search", "SEARCH_AGENT", 2),
+    "/v1/react": Project("react", "react_search_agent", "react", "REACT_AGENT", 1),
+    "/v1/compose": Project("compose", "literary_composer", "compose", "COMPOSER", 2),
+}
+
+pools: Dict[str, WorkerPool] = {}
+
+
+def error_response(error: PoolError) -> JSONResponse:
+    headers = {"Retry-After": str(RETRY_AFTER_S)} if error.status == 503 else None
+    return JSONResponse({"error": {"type": error.error_type, "message": str(error)}}, error.status, headers=headers)
+
+
+def sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def run_task(request: Request) -> Response:
+    project = PROJECTS[request.url.path]
+    pool = pools.get(project.pool)
+    if pool is None:
+        return JSONResponse({"error": {"type": "disabled", "message": f"{project.pool} pool is disabled"}}, 404)
+    try:
+        payload = await request.json()
+        if not isinstance(payload, dict):
+            raise ValueError("body must be a JSON object")
+    except ValueError as e:
+        return error_response(InvalidRequest(f"invalid JSON body: {e}"))
+
+    timeout_s = payload.pop("timeout_s", None)
+    stream = payload.pop("stream", False) or "text/event-stream" in request.headers.get("accept", "")
+    events = pool.run(project.task, payload, float(timeout_s) if timeout_s else None)
+    # Wait for the first event before answering, so queue-full, timeout and bad-input errors keep their status code
+    try:
+        first = await events.__anext__()
+    except PoolError as e:
+        return error_response(e)
+
+    if not stream:
+        try:
+            result = first
+            async for result in events:
+                pass
+        except PoolError as e:
+            return error_response(e)
+        finally:
+            await events.aclose()
+        return JSONResponse(result["data"])
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            yield sse(first["event"], first["data"])
+            async for event in events:
+                yield sse(event["event"], event["data"])
+        except PoolError as e:
+            yield sse("error", {"type": e.error_type, "message": str(e)})
+        finally:
+            # A client that disconnects lands here too; the pool cancels the run on its worker
+            await events.aclose()
+
+    return StreamingResponse(body(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def stats(request: Request) -> JSONResponse:
+    return JSONResponse({name: pool.stats() for name, pool in pools.items()})
+
+
+async def healthz(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok", "pools": sorted(pools)})
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette):
+    metrics_port = DEFAULT_METRICS_PORT
+    for project in PROJECTS.values():
+        if project.workers() <= 0:
+            continue
+        pools[project.pool] = WorkerPool(
+            project.pool,
+            [project.python(), "worker.py"],
+            cwd=str(project.path),
+            size=project.workers(),
+            max_queue=DEFAULT_QUEUE,
+            timeout_s=DEFAULT_TIMEOUT_S,
+            metrics_port=metrics_port,
+        )
+        if metrics_port:
+            metrics_port += project.workers()
+    try:
+        # Workers import their whole agent stack before reporting ready; start every pool at once
+        await asyncio.gather(*(pool.start() for pool in pools.values()))
+        for name, pool in pools.items():
+            ports = f", /metrics on :{pool.metrics_port}-{pool.metrics_port + pool.size - 1}" if pool.metrics_port else ""
+            print(f"[agent_service] {name}: {pool.size} workers ready{ports}", file=sys.stderr)
+        yield
+    finally:
+        for pool in pools.values():
+            await pool.close()
+        pools.clear()
+
+
+app = Starlette(
+    routes=[
+        *(Route(path, run_task, methods=["POST"]) for path in PROJECTS),
+        Route("/v1/stats", stats),
+        Route("/healthz", healthz),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the agents over HTTP with per-project worker pools.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+    # One event loop process; the agent work itself runs in the worker pools
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
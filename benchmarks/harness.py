@@ -0,0 +1,141 @@
+"""
+Helpers shared by the per-project benchmark scripts (stdlib only, so every
+project's virtualenv can import it):
+
+    - add_mock_arguments / launch_mock_server: run mock_servers.py in a subprocess
+    - run_concurrent: drive N async requests at a given concurrency
+    - summarize / print_table / write_json: p50/p95, throughput and reporting
+"""
+
+import asyncio
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+MOCK_SERVER = Path(__file__).resolve().parent / "mock_servers.py"
+MOCK_FLAGS = [
+    "llm_latency_ms", "llm_jitter_ms", "token_latency_ms", "search_latency_ms",
+    "search_jitter_ms", "error_rate", "completion_tokens", "searches_per_answer",
+    "tool_calls_per_turn", "prefix_cache_ms", "page_words", "seed",
+]
+
+
+def add_mock_arguments(parser) -> None:
+    group = parser.add_argument_group("mock server")
+    group.add_argument("--llm-latency-ms", type=float, default=300.0)
+    group.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    group.add_argument("--token-latency-ms", type=float, default=5.0)
+    group.add_argument("--search-latency-ms", type=float, default=150.0)
+    group.add_argument("--search-jitter-ms", type=float, default=50.0)
+    group.add_argument("--error-rate", type=float, default=0.0)
+    group.add_argument("--completion-tokens", type=int, default=120)
+    group.add_argument("--searches-per-answer", type=int, default=1)
+    group.add_argument("--tool-calls-per-turn", type=int, default=1)
+    group.add_argument("--prefix-cache-ms", type=float, default=0.0)
+    group.add_argument("--page-words", type=int, default=0)
+    group.add_argument("--seed", type=int, default=7)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def launch_mock_server(args) -> Tuple[subprocess.Popen, str]:
+    """Start mock_servers.py with the parsed mock flags; returns (process, base_url)."""
+    port = _free_port()
+    command = [sys.executable, str(MOCK_SERVER), "--port", str(port)]
+    for flag in MOCK_FLAGS:
+        value = getattr(args, flag, None)
+        if value is not None:
+            command += [f"--{flag.replace('_', '-')}", str(value)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()  # "Mock Groq/Tavily listening on ..."
+    return process, f"http://127.0.0.1:{port}"
+
+
+async def run_concurrent(
+    request: Callable[[int], Awaitable[Dict]], total: int, concurrency: int
+) -> Dict:
+    """
+    Run `request(i)` for i in range(total) with at most `concurrency` in flight.
+    Each request returns a dict of extra metrics (e.g. {"iterations": 3}).
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[Dict] = []
+
+    async def timed(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                extra = await request(i) or {}
+                extra["ok"] = True
+            except Exception as e:
+                extra = {"ok": False, "error": repr(e)}
+            extra["latency_s"] = time.perf_counter() - started
+            samples.append(extra)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(i) for i in range(total)))
+    return summarize(samples, time.perf_counter() - started, concurrency)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100.0 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def summarize(samples: List[Dict], elapsed_s: float, concurrency: int) -> Dict:
+    ok = [s for s in samples if s["ok"]]
+    latencies = [s["latency_s"] for s in ok]
+    summary = {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p95_ms": _percentile(latencies, 95) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000 if latencies else float("nan"),
+        "throughput_rps": len(ok) / elapsed_s if elapsed_s else 0.0,
+    }
+    # Any numeric extra metric (iterations, ttft_s, tokens, ...) is averaged
+    extra_keys = {k for s in ok for k, v in s.items() if isinstance(v, (int, float)) and not isinstance(v, bool)}
+    for key in sorted(extra_keys - {"latency_s"}):
+        values = [s[key] for s in ok if key in s]
+        summary[f"mean_{key}"] = statistics.mean(values) if values else float("nan")
+    if len(ok) < len(samples):
+        summary["first_error"] = next(s["error"] for s in samples if not s["ok"])
+    return summary
+
+
+def print_table(title: str, rows: List[Dict]) -> None:
+    if not rows:
+        return
+    columns = [k for k in rows[0] if k not in ("first_error",)]
+
+    def cell(value) -> str:
+        return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+    # At least 16 wide, wider where a label (e.g. "llama-3.3-70b-versatile t=0.8") needs it
+    widths = {c: max([16, len(c)] + [len(cell(row.get(c, ""))) for row in rows]) for c in columns}
+    print(f"\n== {title} ==")
+    print("  ".join(f"{c:>{widths[c]}}" for c in columns))
+    for row in rows:
+        print("  ".join(f"{cell(row.get(c, '')):>{widths[c]}}" for c in columns))
+    for row in rows:
+        if "first_error" in row:
+            print(f"  ! {row.get('label', '')} c={row['concurrency']}: {row['first_error']}")
+
+
+def write_json(path: str, results: Dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote {path}")
@@ -0,0 +1,143 @@
+"""
+Cold-start import cost of each app.
+
+Collects the module-level imports of every app entry point (imports inside
+functions or branches such as `if search_button:` are skipped, since they are
+only paid when that path is first used), replays them in a fresh interpreter under `python -X importtime`
+and reports the wall time plus the heaviest top-level packages.
+
+Each project is run with its own virtualenv (<project>/.venv) when present;
+override with --python <project>=<interpreter>.
+
+Usage:
+    python benchmarks/importtime.py --repeat 3 --top 8
+    python benchmarks/importtime.py --python search_agent=/path/to/venv/bin/python --json importtime.json
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+APPS = {
+    "search_agent": "app.py",
+    "react_search_agent": "app.py",
+    "literary_composer": "app.py",
+}
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+\d+\s+\|\s*(\S+)")
+
+
+def startup_imports(path: Path) -> List[str]:
+    """Import statements run unconditionally at startup: module level, including try/except ImportError blocks."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    statements: List[str] = []
+
+    def visit(body):
+        for node in body:
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                statements.append(ast.unparse(node))
+            elif isinstance(node, ast.Try):
+                visit(node.body)
+
+    visit(tree.body)
+    return statements
+
+
+def interpreter_for(project: str, overrides: Dict[str, str]) -> str:
+    if project in overrides:
+        return overrides[project]
+    venv = REPO_ROOT / project / ".venv"
+    candidate = venv / ("Scripts/python.exe" if os.name == "nt" else "bin/python")
+    return str(candidate) if candidate.exists() else sys.executable
+
+
+def measure(python: str, cwd: Path, snippet: str) -> Tuple[float, Dict[str, int], str]:
+    """Run the snippet once; returns (wall seconds, self microseconds summed per top-level package, error)."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", snippet],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="0"),
+    )
+    wall = time.perf_counter() - started
+    packages: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            # Self time, so a local module that merely imports langchain is not charged for it
+            name = match.group(2).split(".")[0]
+            packages[name] = packages.get(name, 0) + int(match.group(1))
+    error = ""
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+    return wall, packages, error
+
+
+def profile_app(project: str, entry: str, python: str, repeat: int) -> Dict:
+    path = REPO_ROOT / project / entry
+    statements = startup_imports(path)
+    snippet = "\n".join(statements)
+    walls, runs, error = [], [], ""
+    # One unmeasured run so .pyc compilation is not counted as import time
+    measure(python, path.parent, snippet)
+    for _ in range(repeat):
+        wall, packages, error = measure(python, path.parent, snippet)
+        if error:
+            break
+        walls.append(wall)
+        runs.append(packages)
+    packages = {
+        name: statistics.median(run.get(name, 0) for run in runs) / 1000.0
+        for name in {n for run in runs for n in run}
+    }
+    return {
+        "app": f"{project}/{entry}",
+        "python": python,
+        "imports": statements,
+        "wall_ms": statistics.median(walls) * 1000 if walls else None,
+        "import_ms": sum(packages.values()),
+        "packages_ms": dict(sorted(packages.items(), key=lambda kv: -kv[1])),
+        "error": error,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of each app.")
+    parser.add_argument("--repeat", type=int, default=3, help="Measured runs per app (median is reported)")
+    parser.add_argument("--top", type=int, default=8, help="Heaviest packages to list per app")
+    parser.add_argument("--python", action="append", default=[], metavar="PROJECT=INTERPRETER")
+    parser.add_argument("--app", action="append", choices=sorted(APPS), help="Only profile these projects")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args()
+    overrides = dict(item.split("=", 1) for item in args.python)
+
+    results = []
+    for project in args.app or APPS:
+        result = profile_app(project, APPS[project], interpreter_for(project, overrides), args.repeat)
+        results.append(result)
+        print(f"\n== {result['app']} ({result['python']}) ==")
+        if result["error"]:
+            print(f"  ! failed: {result['error']}")
+            continue
+        print(f"  wall {result['wall_ms']:.0f} ms, imports {result['import_ms']:.0f} ms")
+        for name, ms in list(result["packages_ms"].items())[: args.top]:
+            print(f"    {ms:>8.1f} ms  {name}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Local fake Groq and Tavily endpoints for offline benchmarks.
+
+One stdlib-only HTTP server answers both APIs:
+    POST /openai/v1/chat/completions   Groq (OpenAI-compatible) chat, incl. streaming and tool calls
+    POST /search                       Tavily search
+
+The fake model plays the agent loops used in this repo:
+    - tool-calling agents: searches `--searches-per-answer` times, then calls
+      `submit_job_report` / the other offered tool (or the forced structured-output function);
+    - ReAct prompts: emits Action / Action Input, then a JSON Final Answer;
+    - anything else: a prose completion of `--completion-tokens` words.
+
+Usage:
+    python benchmarks/mock_servers.py --port 8787 --llm-latency-ms 300 --search-latency-ms 150 --error-rate 0.02
+
+Point the apps at it with GROQ_API_BASE=http://127.0.0.1:8787 and by setting
+langchain_community.utilities.tavily_search.TAVILY_API_URL to the same URL
+(the per-project benchmark scripts do both).
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+URL_PATTERN = re.compile(r"https?://[^\s\"'\\\]]+")
+SEARCH_TOOL = "tavily_search_results_json"
+SUBMIT_TOOL = "submit_job_report"
+
+
+class MockConfig:
+    def __init__(self, **overrides):
+        self.llm_latency_ms = 300.0
+        self.llm_jitter_ms = 100.0
+        self.token_latency_ms = 5.0
+        self.search_latency_ms = 150.0
+        self.search_jitter_ms = 50.0
+        self.error_rate = 0.0
+        self.completion_tokens = 120
+        self.searches_per_answer = 1
+        self.tool_calls_per_turn = 1
+        self.prefix_cache_ms = 0.0
+        self.page_words = 0
+        self.seed = None
+        for key, value in overrides.items():
+            setattr(self, key, value)
+
+
+def _sleep(base_ms: float, jitter_ms: float) -> None:
+    time.sleep(max(0.0, base_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000.0)
+
+
+BOILERPLATE = (
+    "Sign in to see more jobs and get alerts. We use cookies to improve your experience on our site. "
+    "Our company was founded in 2004 and values collaboration, diversity and inclusion across offices. "
+    "Benefits include health insurance, paid leave, a learning budget and flexible hours. "
+)
+SENIOR_POSTING = "Senior Staff Engineer, 8+ years experience, lead and manage a team. Principal track. "
+
+
+def _page(posting: str, words: int) -> str:
+    """Pad a posting with job board boilerplate to roughly `words` words, posting in the middle."""
+    filler = BOILERPLATE.split()
+    padding = (filler * (words // len(filler) + 1))[:max(0, words - len(posting.split()))]
+    half = len(padding) // 2
+    return " ".join(padding[:half]) + " " + posting + " ".join(padding[half:])
+
+
+def _fake_jobs(query: str, count: int, page_words: int = 0):
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+    jobs = []
+    for i in range(count):
+        content = (f"Entry level role, 0-2 years experience. Matches query: {query}. "
+                   "Python, React, Docker, FastAPI. Remote friendly.")
+        if page_words:
+            # Full-page snippets: every third result is a senior posting the agent should not report
+            content = _page(SENIOR_POSTING if i % 3 == 2 else content + " ", page_words)
+        jobs.append({
+            "title": f"Junior Engineer #{i} ({digest})",
+            "url": f"https://jobs.example.com/{digest}/{i}",
+            "content": content,
+            "score": round(1.0 - i * 0.05, 3),
+            "raw_content": None,
+        })
+    return jobs
+
+
+def _message_text(message) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    config = MockConfig()
+    stats = {"chat": 0, "search": 0, "errors": 0, "prefix_hits": 0}
+    stats_lock = threading.Lock()
+    seen_prefixes = set()
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- Plumbing ---
+    def _count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _maybe_fail(self) -> bool:
+        if self.config.error_rate and random.random() < self.config.error_rate:
+            self._count("errors")
+            if random.random() < 0.5:
+                self._send_json(429, {"error": {"message": "rate limited (mock)"}}, {"retry-after": "0.2"})
+            else:
+                self._send_json(503, {"error": {"message": "unavailable (mock)"}})
+            return True
+        return False
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.stats_lock:
+                self._send_json(200, dict(self.stats))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("content-length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.path.endswith("/chat/completions"):
+            self._count("chat")
+            self._chat(body)
+        elif self.path.endswith("/search"):
+            self._count("search")
+            self._search(body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    # --- Tavily ---
+    def _search(self, body):
+        _sleep(self.config.search_latency_ms, self.config.search_jitter_ms)
+        if self._maybe_fail():
+            return
+        query = body.get("query", "")
+        self._send_json(200, {
+            "query": query,
+            "answer": None,
+            "images": [],
+            "follow_up_questions": None,
+            "results": _fake_jobs(query, int(body.get("max_results") or 5), self.config.page_words),
+            "response_time": self.config.search_latency_ms / 1000.0,
+        })
+
+    # --- Groq ---
+    def _prefix_saving_ms(self, messages) -> float:
+        """Simulated provider prompt caching: a system prefix seen before is cheaper to prefill."""
+        if not self.config.prefix_cache_ms or not messages or messages[0].get("role") != "system":
+            return 0.0
+        digest = hashlib.sha1(_message_text(messages[0]).encode("utf-8")).hexdigest()
+        with self.stats_lock:
+            hit = digest in self.seen_prefixes
+            self.seen_prefixes.add(digest)
+            if hit:
+                self.stats["prefix_hits"] += 1
+        return self.config.prefix_cache_ms if hit else 0.0
+
+    def _chat(self, body):
+        messages = body.get("messages", [])
+        saving = self._prefix_saving_ms(messages)
+        _sleep(max(0.0, self.config.llm_latency_ms - saving), self.config.llm_jitter_ms)
+        if self._maybe_fail():
+            return
+        content, tool_calls = self._plan(body, messages)
+        prompt_tokens = sum(len(_message_text(m).split()) for m in messages)
+        completion_tokens = len(content.split()) + sum(len(c["function"]["arguments"]) // 4 for c in tool_calls)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+        if body.get("stream"):
+            self._stream(body, content, tool_calls, usage)
+            return
+
+        message = {"role": "assistant", "content": content or None}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _stream(self, body, content, tool_calls, usage):
+        try:
+            self._write_stream(body, content, tool_calls, usage)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client stopped reading (e.g. a TTFT probe), nothing to clean up
+
+    def _write_stream(self, body, content, tool_calls, usage):
+        self.send_response(200)
+        self.send_header("content-type", "text/event-stream")
+        self.end_headers()
+        base = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model"),
+        }
+
+        def emit(delta, finish_reason=None, extra=None):
+            chunk = dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": finish_reason}])
+            if extra:
+                chunk.update(extra)
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        emit({"role": "assistant", "content": ""})
+        for word in re.findall(r"\S+\s*", content):
+            time.sleep(self.config.token_latency_ms / 1000.0)
+            emit({"content": word})
+        for index, call in enumerate(tool_calls):
+            # Arguments arrive in fragments, like a real streamed tool call
+            arguments = call["function"]["arguments"]
+            pieces = [arguments[i:i + 48] for i in range(0, len(arguments), 48)] or [""]
+            emit({"tool_calls": [dict(call, index=index, function=dict(call["function"], arguments=pieces[0]))]})
+            for piece in pieces[1:]:
+                time.sleep(self.config.token_latency_ms / 1000.0)
+                emit({"tool_calls": [{"index": index, "function": {"arguments": piece}}]})
+        emit({}, "tool_calls" if tool_calls else "stop", {"x_groq": {"usage": usage}})
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _plan(self, body, messages):
+        """Decide what the fake model says next: (content, tool_calls)."""
+        tools = {t["function"]["name"]: t["function"] for t in body.get("tools") or []}
+        seen_urls = []
+        for m in messages:
+            if m.get("role") == "tool" or "Observation:" in _message_text(m):
+                seen_urls.extend(URL_PATTERN.findall(_message_text(m)))
+        seen_urls = list(dict.fromkeys(u.rstrip(".,") for u in seen_urls))[:5]
+        last_user = next((_message_text(m) for m in reversed(messages) if m.get("role") == "user"), "")
+
+        # Structured output: the function is forced through tool_choice
+        forced = body.get("tool_choice")
+        if isinstance(forced, dict) and forced.get("function", {}).get("name") in tools:
+            name = forced["function"]["name"]
+            if not seen_urls:
+                seen_urls = URL_PATTERN.findall(" ".join(_message_text(m) for m in messages))[:5]
+            return "", [self._call(name, self._report(tools[name], seen_urls))]
+
+        if tools:
+            calls = [c for m in messages if m.get("role") == "assistant" for c in m.get("tool_calls") or []]
+            searches = sum(1 for c in calls if c["function"]["name"] == SEARCH_TOOL)
+            # Whichever non-search tool is offered (submit_job_report, AgentResponse, ...) ends the loop
+            final_tool = SUBMIT_TOOL if SUBMIT_TOOL in tools else next((n for n in tools if n != SEARCH_TOOL), None)
+            submitted = any(c["function"]["name"] == final_tool for c in calls)
+            if SEARCH_TOOL in tools and searches < self.config.searches_per_answer:
+                per_turn = max(1, self.config.tool_calls_per_turn)
+                return "", [
+                    self._call(SEARCH_TOOL, {"query": f"{last_user[:80]} (variant {searches + i})"})
+                    for i in range(per_turn)
+                ]
+            if final_tool and not submitted:
+                return "", [self._call(final_tool, self._report(tools[final_tool], seen_urls))]
+            return "Report submitted.", []
+
+        # ReAct text protocol
+        if "Action Input" in last_user:
+            searches = last_user.count(f"Action: {SEARCH_TOOL}")
+            if searches < self.config.searches_per_answer:
+                return (
+                    "Thought: I should search for current listings.\n"
+                    f"Action: {SEARCH_TOOL}\n"
+                    f"Action Input: junior AI engineer jobs (variant {searches})"
+                ), []
+            schema = {"parameters": {"properties": {"sources": {}}}} if "sources" in last_user else {}
+            return (
+                "Thought: I now know the final answer\n"
+                f"Final Answer: {json.dumps(self._report(schema, seen_urls))}"
+            ), []
+
+        words = ("the quiet lantern hums beneath a patient sky while rivers remember "
+                 "every name the mountains forgot").split()
+        return " ".join(words[i % len(words)] for i in range(self.config.completion_tokens)), []
+
+    @staticmethod
+    def _call(name, arguments):
+        return {
+            "id": f"call_{uuid.uuid4().hex[:12]}",
+            "type": "function",
+            "function": {"name": name, "arguments": json.dumps(arguments)},
+        }
+
+    @staticmethod
+    def _report(schema, urls):
+        properties = (schema.get("parameters") or {}).get("properties") or {}
+        answer = f"Found {len(urls)} junior openings."
+        if "sources" in properties:
+            return {"answer": answer, "sources": [{"url": u} for u in urls]}
+        return {"answer": answer, "source": [{"url": u, "title": f"Junior role {i + 1}"} for i, u in enumerate(urls)]}
+
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 0, **config) -> ThreadingHTTPServer:
+    """Start the server on a background thread; the bound URL is server.url."""
+    MockHandler.config = MockConfig(**config)
+    if MockHandler.config.seed is not None:
+        random.seed(MockHandler.config.seed)
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq + Tavily endpoints for offline benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--token-latency-ms", type=float, default=5.0, help="Delay between streamed tokens")
+    parser.add_argument("--search-latency-ms", type=float, default=150.0)
+    parser.add_argument("--search-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429/503")
+    parser.add_argument("--completion-tokens", type=int, default=120)
+    parser.add_argument("--searches-per-answer", type=int, default=1)
+    parser.add_argument("--tool-calls-per-turn", type=int, default=1)
+    parser.add_argument("--prefix-cache-ms", type=float, default=0.0, help="Latency saved when the system prompt was seen before")
+    parser.add_argument("--page-words", type=int, default=0, help="Pad search result content to full-page snippets of this many words")
+    parser.add_argument("--seed", type=int, default=None)
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+
+    server = start_mock_server(host, port, **args)
+    print(f"Mock Groq/Tavily listening on {server.url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
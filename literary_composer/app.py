@@ -1,14 +1,31 @@
 import streamlit as st
 import os 
+import time
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq 
-from langchain_core.output_parsers import StrOutputParser
-from constants.templates import PERSONA_MAP, TEMPLATES
-from langchain_ollama import ChatOllama
 
+# The core modules read their settings (cache, router, refinement, ...) when imported: load .env first
 load_dotenv()
 
+from constants.templates import PERSONA_MAP, get_size_class, get_template
+# Model backends are imported on first use, see core/providers.py
+from core.providers import get_groq_llm, get_output_parser, limiter_stats
+from core.response_cache import DEFAULT_SIMILARITY_THRESHOLD, get_response_cache
+from core.refine import (
+    DEFAULT_DRAFT_MODEL,
+    REFINE_MIN_TIER,
+    REFINE_SIZE_CLASSES,
+    start_refinement,
+    start_service_refinement,
+)
+from core.router import get_model_router, get_route_llm
+from service_client import call_service, service_enabled, service_url, stream_service
+from single_flight import fingerprint, get_single_flight
+
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+MODEL_NAME = "llama-3.3-70b-versatile"
+AUTO_MODEL = "Auto (cheapest within latency SLO)"
+MODEL_OPTIONS = [MODEL_NAME, "llama-3.1-8b-instant", AUTO_MODEL]
+SIMILARITY_MIN, SIMILARITY_MAX = 0.80, 0.99
 
 # --- Page Config ---
 st.set_page_config(
@@ -20,6 +37,42 @@ st.set_page_config(
 # Initialize session state to store the result
 if "generated_work" not in st.session_state:
     st.session_state.generated_work = ""
+# Pending background refinement of a draft (see core/refine.py)
+if "refine_job" not in st.session_state:
+    st.session_state.refine_job = None
+
+
+def render_work(text, target=st):
+    """Render a (possibly partial) work in the styled output container."""
+    # The 'white-space: pre-wrap' is essential for keeping poem/prose formatting
+    target.markdown(
+        f"""
+        <div style='background-color: white; color: #333; padding: 30px; 
+                    border-radius: 8px; border-left: 6px solid #ff6b6b;
+                    box-shadow: 0 4px 12px rgba(0,0,0,0.1);
+                    font-family: "Helvetica Neue", sans-serif; font-size: 16px;
+                    line-height: 1.7; white-space: pre-wrap;'>
+            {text}
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+
+def cancel_refinement():
+    """Stop the background refinement of the current draft, which is about to be replaced."""
+    job = st.session_state.refine_job
+    if job is not None:
+        job["refinement"].cancel()
+    st.session_state.refine_job = None
+
+def service_chunks(payload):
+    """Text chunks of a composition written by the agent service; Auto's route choice is shown as a caption."""
+    for event, data in stream_service("/v1/compose", payload):
+        if event == "route":
+            st.caption(f"🧭 {data['label']}: {data['reason']}")
+        elif event == "token":
+            yield data["text"]
 
 # --- Header ---
 st.title("✍️ AI Literary Composer")
@@ -40,6 +93,13 @@ with st.sidebar:
         help="Choose the format"
     )
     
+    model_choice = st.selectbox(
+        "Model",
+        MODEL_OPTIONS,
+        help="Auto picks a model per request from the format's size, recent latency and errors, "
+             "and falls back to a local Ollama model when Groq is throttled"
+    )
+
     temp = st.slider(
         "Creativity (Temperature)", 
         min_value=0.0, 
@@ -49,10 +109,69 @@ with st.sidebar:
         help="Higher = more creative, Lower = more focused"
     )
 
+    stream_output = st.toggle(
+        "🌊 Stream output",
+        value=True,
+        help="Show the text as it is written instead of waiting for the full piece"
+    )
+
+    # Refining with the draft model itself would only rewrite the draft at the same quality
+    refine_available = (
+        get_size_class(persona, literature) in REFINE_SIZE_CLASSES and model_choice != DEFAULT_DRAFT_MODEL
+    )
+    draft_then_refine = st.toggle(
+        "🚀 Draft, then refine",
+        value=False,
+        disabled=not refine_available,
+        help=f"{DEFAULT_DRAFT_MODEL} writes a quick draft; the selected model (Auto: a large one) then "
+             "revises it in the background and the result replaces the draft "
+             f"(longer formats only, and not with {DEFAULT_DRAFT_MODEL} selected)"
+    ) and refine_available
+
+    st.markdown("---")
+
+    use_cache = st.toggle(
+        "⚡ Reuse cached responses",
+        value=False,
+        help="Return a previous result for the same persona, literature, theme and temperature"
+    )
+    use_semantic_cache = st.toggle(
+        "🧲 Match similar themes",
+        value=False,
+        disabled=not use_cache,
+        help="Also reuse results for near-duplicate themes (needs a local Ollama embedding model)"
+    )
+    similarity_threshold = st.slider(
+        "Similarity threshold",
+        min_value=SIMILARITY_MIN,
+        max_value=SIMILARITY_MAX,
+        # RESPONSE_CACHE_SIMILARITY may lie outside the slider's range
+        value=min(max(DEFAULT_SIMILARITY_THRESHOLD, SIMILARITY_MIN), SIMILARITY_MAX),
+        step=0.01,
+        disabled=not (use_cache and use_semantic_cache)
+    )
+
     st.markdown("---")
 
     st.info(f"**Active Style**\n\n{persona} → {literature}")
 
+    if model_choice == AUTO_MODEL:
+        size_class = get_size_class(persona, literature)
+        route = get_model_router().choose(size_class)
+        st.caption(f"Auto → {route.label} ({size_class} form)")
+        for name, stats in get_model_router().stats().items():
+            p95 = f"{stats['p95_s']:.1f}s" if stats["p95_s"] is not None else "n/a"
+            st.caption(f"{name}: p95 {p95} / {stats['error_rate']:.0%} errors over {stats['samples']}")
+
+    for name, stats in limiter_stats().items():
+        st.caption(
+            f"{name}: {stats['throttled']} throttled / {stats['retried']} retried"
+            f" / breaker {stats['breaker']}"
+        )
+
+    if service_enabled():
+        st.caption(f"Writing on the agent service at {service_url()}")
+
 # --- Main UI ---
 theme_input = st.text_area(
     "What should it be about?", 
@@ -72,55 +191,187 @@ if generate_button:
     if theme_input.strip():
         with st.spinner(f"✨ The {persona} is consulting the muse..."):
             try:
-                # Initialize LLM
-                # llm = ChatOllama(
-                #     model="gemma3",
-                #     temperature=temp
-                # )
-                llm = ChatGroq(
-                    api_key=os.getenv("GROQ_API_KEY"),
-                    model="llama-3.3-70b-versatile",
-                    temperature=temp
-                )
-                
-                # Get the specific template
-                selected_template = TEMPLATES[persona][literature]
+                # Initialize LLM (one client per model/temperature per process)
+                # llm = get_ollama_llm("gemma3", temp)
+                auto_route = model_choice == AUTO_MODEL
+                # With AGENT_SERVICE_URL set the service writes the piece; this process only renders it
+                remote = service_enabled()
+                service_model = "auto" if auto_route else model_choice
+                if not auto_route and not remote:
+                    llm = get_groq_llm(model_choice, temp)
+                router = get_model_router()
+                size_class = get_size_class(persona, literature)
+                refine_llm = None
+                refine_model = service_model
+                if draft_then_refine:
+                    # The selected model refines; the fast draft model writes the first pass
+                    if not remote:
+                        refine_route = router.choose(size_class, min_tier=REFINE_MIN_TIER) if auto_route else None
+                        refine_llm = get_route_llm(refine_route, temp) if auto_route else llm
+                        llm = get_groq_llm(DEFAULT_DRAFT_MODEL, temp)
+                    auto_route = False
+                    service_model = DEFAULT_DRAFT_MODEL
+                cache_model = f"{DEFAULT_DRAFT_MODEL}>{model_choice}" if draft_then_refine else model_choice
                 
-                # Create chain
-                chain = selected_template | llm | StrOutputParser()
+                # Get the specific template (compiled once; its system prefix never changes)
+                selected_template = get_template(persona, literature)
                 
-                # Generate response
-                response = chain.invoke({"theme": theme_input})
+                # Check the response cache before calling the model
+                cache = get_response_cache()
+                messages = selected_template.format_messages(theme=theme_input)
+                response = None
+                if use_cache:
+                    response = cache.lookup(
+                        messages, cache_model, temp,
+                        semantic=use_semantic_cache,
+                        threshold=similarity_threshold
+                    )
                 
-                # Store in session state
-                st.session_state.generated_work = response
-                
-                st.success("✅ Masterpiece generated!")
+                if response is not None:
+                    st.session_state.generated_work = response
+                    cancel_refinement()
+                    st.success("⚡ Served from cache!")
+                else:
+                    def generate():
+                        # Create chain (for Auto, one per candidate route; the router handles failover)
+                        def route_chain(route):
+                            return selected_template | get_route_llm(route, temp) | get_output_parser()
+
+                        if not auto_route and not remote:
+                            chain = selected_template | llm | get_output_parser()
+                        compose_request = {
+                            "persona": persona,
+                            "literature": literature,
+                            "theme": theme_input,
+                            "model": service_model,
+                            "temperature": temp,
+                        }
+
+                        # Generate response
+                        if stream_output:
+                            # Render tokens as they arrive, then hand over to the display section below
+                            stream_holder = st.empty()
+                            with stream_holder.container():
+                                st.markdown("---")
+                                st.subheader("📜 Your Masterpiece")
+                                stream_body = st.empty()
+                            response = ""
+                            last_render = 0.0
+                            if remote:
+                                chunks = service_chunks(compose_request)
+                            elif auto_route:
+                                chunks = router.stream(
+                                    size_class,
+                                    lambda route: route_chain(route).stream({"theme": theme_input}),
+                                    on_route=lambda route, reason: st.caption(f"🧭 {route.label}: {reason}")
+                                )
+                            else:
+                                chunks = chain.stream({"theme": theme_input})
+                            for chunk in chunks:
+                                response += chunk
+                                # Throttle redraws; re-sending the whole container per token is wasteful
+                                if time.monotonic() - last_render > 0.05:
+                                    render_work(response + "▌", stream_body)
+                                    last_render = time.monotonic()
+                            stream_holder.empty()
+                        elif remote:
+                            result = call_service("/v1/compose", compose_request)
+                            response = result["text"]
+                            if auto_route:
+                                st.caption(f"🧭 {result['model']}")
+                        elif auto_route:
+                            response, route = router.invoke(
+                                size_class, lambda route: route_chain(route).invoke({"theme": theme_input})
+                            )
+                            st.caption(f"🧭 {route.label}")
+                        else:
+                            response = chain.invoke({"theme": theme_input})
+
+                        return response
+
+                    if temp == 0:
+                        # Deterministic output: identical requests from other sessions share this generation
+                        flight = get_single_flight()
+                        request_key = fingerprint(persona, literature, theme_input, cache_model, temp)
+                        waiting = st.empty()
+                        if flight.in_flight(request_key):
+                            waiting.info("🤝 The same piece is already being written for another session; sharing it...")
+                        response, _ = flight.do(request_key, generate)
+                        waiting.empty()
+                    else:
+                        response = generate()
+
+                    # Store in session state
+                    st.session_state.generated_work = response
+                    cancel_refinement()
+                    if draft_then_refine:
+                        # Show the draft now; the refined version replaces it (and is cached) when ready
+                        if remote:
+                            refinement = start_service_refinement(
+                                persona, literature, theme_input, response, refine_model, temp
+                            )
+                        else:
+                            refinement = start_refinement(persona, literature, theme_input, response, refine_llm)
+                        st.session_state.refine_job = {
+                            "refinement": refinement,
+                            "draft": response,
+                            "started": time.monotonic(),
+                            "messages": messages,
+                            "cache_model": cache_model,
+                            "temperature": temp,
+                            "use_cache": use_cache,
+                            "semantic": use_semantic_cache,
+                        }
+                        st.success("📝 Draft ready, refining in the background...")
+                    else:
+                        if use_cache:
+                            cache.store(messages, cache_model, temp, response, semantic=use_semantic_cache)
+                        st.success("✅ Masterpiece generated!")
                 
             except Exception as e:
                 st.error(f"❌ An error occurred: {str(e)}")
     else:
         st.warning("⚠️ Please enter a theme first!")
 
+@st.fragment(run_every=1.0)
+def refinement_status():
+    """Polls the background refinement and swaps the draft for the refined work once it is done."""
+    job = st.session_state.refine_job
+    if job is None:
+        return
+    refinement = job["refinement"]
+    if not refinement.done():
+        st.caption(f"🔁 Refining the draft... {time.monotonic() - job['started']:.0f}s")
+        return
+    st.session_state.refine_job = None
+    if st.session_state.generated_work != job["draft"]:
+        # The draft was replaced while this ran; its refinement no longer applies
+        return
+    try:
+        refined = refinement.result()
+    except Exception as e:
+        st.session_state.refine_error = f"Refinement failed, keeping the draft: {e}"
+    else:
+        st.session_state.generated_work = refined
+        if job["use_cache"]:
+            get_response_cache().store(
+                job["messages"], job["cache_model"], job["temperature"], refined, semantic=job["semantic"]
+            )
+    st.rerun()
+
+
 # Display and Download
 if st.session_state.generated_work:
     st.markdown("---")
     st.subheader("📜 Your Masterpiece")
     
+    if st.session_state.refine_job is not None:
+        refinement_status()
+    if st.session_state.get("refine_error"):
+        st.warning(st.session_state.pop("refine_error"))
+
     # Display in a clean, professional container
-    # The 'white-space: pre-wrap' is essential for keeping poem/prose formatting
-    st.markdown(
-        f"""
-        <div style='background-color: white; color: #333; padding: 30px; 
-                    border-radius: 8px; border-left: 6px solid #ff6b6b;
-                    box-shadow: 0 4px 12px rgba(0,0,0,0.1);
-                    font-family: "Helvetica Neue", sans-serif; font-size: 16px;
-                    line-height: 1.7; white-space: pre-wrap;'>
-            {st.session_state.generated_work}
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+    render_work(st.session_state.generated_work)
     
     st.markdown("---")
     
@@ -148,4 +399,5 @@ if st.session_state.generated_work:
         # Clear Button
         if st.button("🗑️ Clear", use_container_width=True):
             st.session_state.generated_work = ""
+            cancel_refinement()
             st.rerun()
\ No newline at end of file
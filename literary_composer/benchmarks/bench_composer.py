@@ -0,0 +1,81 @@
+"""
+Offline latency/throughput benchmark for the literary composer chain.
+
+Starts the local mock Groq server (../benchmarks/mock_servers.py), streams
+`get_template(persona, literature) | llm | StrOutputParser()` against it and
+reports p50/p95 latency, time-to-first-token and throughput at several
+concurrency levels, cycling through every persona/literature pair.
+
+Usage (from the literary_composer directory):
+    uv run python -m benchmarks.bench_composer --requests 30 --concurrency 1 4 16
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+sys.path.insert(0, str(REPO_ROOT / "shared"))
+
+import harness  # noqa: E402
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+
+MODEL_NAME = "llama-3.3-70b-versatile"
+
+
+async def run_benchmarks(args, base_url: str) -> list:
+    os.environ["GROQ_API_BASE"] = base_url
+    from langchain_core.output_parsers import StrOutputParser
+
+    from constants.templates import PERSONA_MAP, get_template
+    from rate_limit import RateLimitedChatGroq, configure_limits
+
+    if not args.rate_limited:
+        configure_limits(groq=0, groq_total=0)
+    llm = RateLimitedChatGroq(model=MODEL_NAME, temperature=0.8)
+    pairs = [(p, l) for p, formats in PERSONA_MAP.items() for l in formats]
+
+    async def request(i: int) -> dict:
+        persona, literature = pairs[i % len(pairs)]
+        chain = get_template(persona, literature) | llm | StrOutputParser()
+        started = time.perf_counter()
+        ttft, text = None, ""
+        async for chunk in chain.astream({"theme": f"a lighthouse keeper's last night (run {i})"}):
+            if ttft is None and chunk:
+                ttft = time.perf_counter() - started
+            text += chunk
+        return {"ttft_ms": (ttft or 0.0) * 1000, "words": len(text.split())}
+
+    rows = []
+    for concurrency in args.concurrency:
+        row = await harness.run_concurrent(request, args.requests, concurrency)
+        rows.append(dict(label="compose", **row))
+    harness.print_table("literary_composer", rows)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the literary composer chain against a local mock.")
+    parser.add_argument("--requests", type=int, default=30, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--rate-limited", action="store_true", help="Keep the client-side rate limits on")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    harness.add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = harness.launch_mock_server(args)
+    try:
+        results = asyncio.run(run_benchmarks(args, base_url))
+    finally:
+        server.terminate()
+    if args.json:
+        harness.write_json(args.json, {"app": "literary_composer", "results": results})
+
+
+if __name__ == "__main__":
+    main()
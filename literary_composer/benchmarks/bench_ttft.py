@@ -0,0 +1,122 @@
+"""
+Time-to-first-token over every persona/literature pair, cold vs warm prefix.
+
+For each pair the first request carries a system prompt the backend has not
+seen yet (cold); the following rounds reuse the same byte-identical system
+prefix with new themes (warm), which is what provider-side prompt caching and
+Ollama's keep-alive KV cache can speed up.
+
+Backends:
+    mock    local fake Groq (../benchmarks/mock_servers.py); --prefix-cache-ms simulates caching
+    groq    the real Groq API (needs GROQ_API_KEY)
+    ollama  a local Ollama server; compare --keep-alive 0 against the default
+
+Usage (from the literary_composer directory):
+    uv run python -m benchmarks.bench_ttft --backend mock --prefix-cache-ms 150
+    uv run python -m benchmarks.bench_ttft --backend ollama --model gemma3 --keep-alive 0
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+sys.path.insert(0, str(REPO_ROOT / "shared"))
+
+import harness  # noqa: E402
+
+THEMES = [
+    "a lighthouse keeper's last night",
+    "the first rain after a long drought",
+    "a city that forgets one word every day",
+    "two rivals stuck in an elevator",
+    "the ethics of teaching machines to dream",
+]
+
+
+def build_llm(args):
+    from core.providers import get_groq_llm, get_ollama_llm
+
+    if args.backend == "ollama":
+        if args.keep_alive is not None:
+            os.environ["OLLAMA_KEEP_ALIVE"] = args.keep_alive
+        return get_ollama_llm(args.model or "gemma3", args.temperature)
+    from rate_limit import configure_limits
+
+    if args.backend == "mock":
+        configure_limits(groq=0, groq_total=0)
+    return get_groq_llm(args.model or "llama-3.3-70b-versatile", args.temperature)
+
+
+async def first_token_ms(chain, theme: str) -> float:
+    started = time.perf_counter()
+    async for chunk in chain.astream({"theme": theme}):
+        if chunk:
+            return (time.perf_counter() - started) * 1000
+    return (time.perf_counter() - started) * 1000
+
+
+async def run_benchmark(args) -> list:
+    from constants.templates import PERSONA_MAP, get_template, system_prefix_digest
+    from core.providers import get_output_parser
+
+    llm = build_llm(args)
+    rows = []
+    for persona, formats in PERSONA_MAP.items():
+        for literature in formats:
+            chain = get_template(persona, literature) | llm | get_output_parser()
+            samples = []
+            for round_no in range(args.rounds):
+                theme = f"{THEMES[round_no % len(THEMES)]} ({args.run_tag} {round_no})"
+                samples.append(await first_token_ms(chain, theme))
+            warm = samples[1:]
+            rows.append({
+                "label": f"{persona}/{literature}",
+                "prefix": system_prefix_digest(persona, literature),
+                "cold_ttft_ms": samples[0],
+                "warm_ttft_ms": statistics.median(warm) if warm else float("nan"),
+            })
+    return rows
+
+
+def print_summary(rows: list) -> None:
+    harness.print_table("TTFT per persona/literature", rows)
+    cold = statistics.median(r["cold_ttft_ms"] for r in rows)
+    warm = statistics.median(r["warm_ttft_ms"] for r in rows)
+    print(f"\nmedian cold {cold:.1f} ms, median warm {warm:.1f} ms ({(cold - warm) / cold * 100:+.1f}% faster warm)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm-prefix TTFT over all persona/literature pairs.")
+    parser.add_argument("--backend", choices=["mock", "groq", "ollama"], default="mock")
+    parser.add_argument("--model", help="Defaults to llama-3.3-70b-versatile (groq/mock) or gemma3 (ollama)")
+    parser.add_argument("--temperature", type=float, default=0.8)
+    parser.add_argument("--rounds", type=int, default=3, help="Requests per pair; the first one is the cold prefix")
+    parser.add_argument("--keep-alive", help="Ollama keep_alive override, e.g. 0 to unload after every request")
+    parser.add_argument("--run-tag", default=str(int(time.time())), help="Makes themes unique per run")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    harness.add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.backend == "mock":
+        server, base_url = harness.launch_mock_server(args)
+        os.environ["GROQ_API_BASE"] = base_url
+        os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+    try:
+        rows = asyncio.run(run_benchmark(args))
+    finally:
+        if server is not None:
+            server.terminate()
+    print_summary(rows)
+    if args.json:
+        harness.write_json(args.json, {"app": "literary_composer", "backend": args.backend, "results": rows})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Concurrent model comparison.
+
+Sends the same prompt to every (model, temperature) pair at once, streams
+each response to the terminal as it arrives (lines are prefixed with the
+pair they belong to), and reports latency, time-to-first-token, tokens and
+cost per pair as a table and optionally JSON. Wall time is the slowest pair,
+not the sum of all of them.
+
+Backends:
+    groq      the real Groq API (needs GROQ_API_KEY); "ollama:<model>" entries run on a local Ollama
+    mock      local fake Groq (../benchmarks/mock_servers.py)
+    exercise  the mock ChatGroq from compare_model.py (no network, no streaming)
+
+Usage (from the literary_composer directory):
+    uv run python compare_engine.py --models llama-3.1-8b-instant llama-3.3-70b-versatile --temperatures 0 0.8
+    uv run python compare_engine.py --persona Poet --literature Haiku --theme "first snow" --json compare.json
+    uv run python compare_engine.py --backend exercise
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "shared"))
+
+import harness  # noqa: E402
+
+DEFAULT_PROMPT = "Explain the concept of machine learning in one sentence."
+
+
+@dataclass
+class ComparisonResult:
+    model: str
+    temperature: float
+    latency_s: float = 0.0
+    ttft_s: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    tokens_estimated: bool = False
+    cost_usd: Optional[float] = None
+    response: str = ""
+    error: str = ""
+
+    @property
+    def label(self) -> str:
+        return f"{self.model} t={self.temperature:g}"
+
+
+def price_per_mtok(model: str) -> Optional[tuple]:
+    """(input, output) USD per million tokens, from the router's route table."""
+    from core.router import GROQ_ROUTES
+
+    if model.startswith("ollama:"):
+        return (0.0, 0.0)
+    for route in GROQ_ROUTES:
+        if route.model == model:
+            return (route.usd_per_mtok_in, route.usd_per_mtok_out)
+    return None
+
+
+class LinePrinter:
+    """Prints streamed text line by line, each line prefixed with its pair, so concurrent streams stay readable."""
+
+    def __init__(self, label: str, quiet: bool = False):
+        self.prefix = f"[{label}] "
+        self.quiet = quiet
+        self._pending = ""
+
+    def feed(self, text: str) -> None:
+        if self.quiet:
+            return
+        self._pending += text
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            print(self.prefix + line, flush=True)
+
+    def close(self) -> None:
+        if self._pending and not self.quiet:
+            print(self.prefix + self._pending, flush=True)
+        self._pending = ""
+
+
+def build_messages(args):
+    if args.persona and args.literature:
+        from constants.templates import get_template
+
+        return get_template(args.persona, args.literature).format_messages(theme=args.theme or DEFAULT_PROMPT)
+    from langchain_core.messages import HumanMessage
+
+    return [HumanMessage(content=args.prompt)]
+
+
+def build_llm(model: str, temperature: float):
+    from core.providers import get_groq_llm, get_ollama_llm
+
+    if model.startswith("ollama:"):
+        return get_ollama_llm(model.split(":", 1)[1], temperature)
+    return get_groq_llm(model, temperature)
+
+
+async def run_streaming(model: str, temperature: float, messages, quiet: bool) -> ComparisonResult:
+    result = ComparisonResult(model, temperature)
+    printer = LinePrinter(result.label, quiet)
+    started = time.perf_counter()
+    usage = None
+    try:
+        llm = build_llm(model, temperature)
+        async for chunk in llm.astream(messages):
+            if chunk.content and result.ttft_s is None:
+                result.ttft_s = time.perf_counter() - started
+            result.response += chunk.content
+            printer.feed(chunk.content)
+            if chunk.usage_metadata:
+                usage = chunk.usage_metadata
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    printer.close()
+    result.latency_s = time.perf_counter() - started
+    if usage:
+        result.prompt_tokens = usage.get("input_tokens", 0)
+        result.completion_tokens = usage.get("output_tokens", 0)
+    else:
+        # Backend did not report usage: rough 4-characters-per-token estimate
+        result.prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        result.completion_tokens = len(result.response) // 4
+        result.tokens_estimated = True
+    return result
+
+
+async def run_exercise(model: str, temperature: float, prompt: str, quiet: bool) -> ComparisonResult:
+    from compare_model import ChatGroq, implement_query_model
+
+    result = ComparisonResult(model, temperature, tokens_estimated=True)
+    started = time.perf_counter()
+    try:
+        # The exercise mock is synchronous; run it off the event loop like a blocking client
+        result.response = await asyncio.to_thread(implement_query_model, ChatGroq(model, temperature), prompt)
+        result.ttft_s = time.perf_counter() - started
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.latency_s = time.perf_counter() - started
+    result.prompt_tokens = len(prompt) // 4
+    result.completion_tokens = len(result.response) // 4
+    LinePrinter(result.label, quiet).feed(result.response + "\n")
+    return result
+
+
+async def compare(args) -> List[ComparisonResult]:
+    semaphore = asyncio.Semaphore(args.concurrency) if args.concurrency else None
+    if args.backend == "exercise":
+        prompt = args.theme or args.prompt
+
+        def start(model, temperature):
+            return run_exercise(model, temperature, prompt, args.quiet)
+    else:
+        messages = build_messages(args)
+
+        def start(model, temperature):
+            return run_streaming(model, temperature, messages, args.quiet)
+
+    async def bounded(model, temperature):
+        if semaphore is None:
+            return await start(model, temperature)
+        async with semaphore:
+            return await start(model, temperature)
+
+    results = await asyncio.gather(*(
+        bounded(model, temperature) for model in args.models for temperature in args.temperatures
+    ))
+    for result in results:
+        price = price_per_mtok(result.model)
+        if price is not None and not result.error:
+            result.cost_usd = (result.prompt_tokens * price[0] + result.completion_tokens * price[1]) / 1e6
+    return list(results)
+
+
+def print_report(results: List[ComparisonResult], wall_s: float) -> None:
+    rows = []
+    for r in results:
+        row: Dict[str, object] = {
+            "label": r.label,
+            "latency_s": r.latency_s,
+            "ttft_s": r.ttft_s if r.ttft_s is not None else float("nan"),
+            "prompt_tokens": r.prompt_tokens,
+            "completion_tokens": r.completion_tokens,
+            # Per-request costs are fractions of a cent; the table's 2-decimal floats would show 0.00
+            "cost_usd": f"{r.cost_usd:.6f}" if r.cost_usd is not None else "n/a",
+        }
+        rows.append(row)
+    harness.print_table("Model comparison", rows)
+    for r in results:
+        if r.error:
+            print(f"  ! {r.label}: {r.error}")
+    sequential = sum(r.latency_s for r in results)
+    print(f"\nwall {wall_s:.2f} s vs {sequential:.2f} s if run one after another")
+    if any(r.tokens_estimated for r in results):
+        print("token counts for some pairs are estimated (backend reported no usage)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one prompt against several models/temperatures concurrently.")
+    parser.add_argument("--backend", choices=["groq", "mock", "exercise"], default="groq")
+    parser.add_argument("--models", nargs="+", help="Groq model names or ollama:<model>")
+    parser.add_argument("--temperatures", nargs="+", type=float, default=[0.0, 0.8])
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT, help="Plain user prompt (ignored with --persona/--literature)")
+    parser.add_argument("--persona", help="Use this persona's template, e.g. Poet")
+    parser.add_argument("--literature", help="Literature type of --persona, e.g. Haiku")
+    parser.add_argument("--theme", help="Theme for the persona template")
+    parser.add_argument("--concurrency", type=int, default=0, help="Max pairs in flight (0 = all at once)")
+    parser.add_argument("--quiet", action="store_true", help="Do not echo the streamed responses")
+    parser.add_argument("--json", help="Write the report (including full responses) to this JSON file")
+    harness.add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    if not args.models:
+        if args.backend == "exercise":
+            from compare_model import ChatGroq
+
+            args.models = ChatGroq("llama-3.1-8b-instant").valid_models
+        else:
+            args.models = ["llama-3.1-8b-instant", "llama-3.3-70b-versatile"]
+
+    server = None
+    if args.backend == "mock":
+        server, base_url = harness.launch_mock_server(args)
+        os.environ["GROQ_API_BASE"] = base_url
+        os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+        from rate_limit import configure_limits
+
+        configure_limits(groq=0, groq_total=0)
+    try:
+        started = time.perf_counter()
+        results = asyncio.run(compare(args))
+        wall_s = time.perf_counter() - started
+    finally:
+        if server is not None:
+            server.terminate()
+    print_report(results, wall_s)
+    if args.json:
+        harness.write_json(args.json, {
+            "app": "literary_composer",
+            "backend": args.backend,
+            "wall_s": wall_s,
+            "results": [asdict(r) for r in results],
+        })
+
+
+if __name__ == "__main__":
+    main()
@@ -1,137 +1,69 @@
-from langchain_core.prompts import ChatPromptTemplate
-
-PERSONA_MAP = {
-    "Poet": ["Sonnet", "Haiku", "Free Verse"],
-    "Manga Writer": ["Manga Script", "Character Profile", "World Building Guide"],
-    "Novelist": ["Short Story", "Novel Chapter", "Plot Outline"],
-    "Academic": ["Thesis Abstract", "Research Summary"],
-    "Journalist": ["News Article", "Editorial", "Interview Script"]
+"""
+Persona/literature prompt table.
+
+The prompt texts live in templates.json; this module only reads that file
+(stdlib json) at import so the sidebar can be rendered without LangChain.
+Each ChatPromptTemplate is compiled on first use and reused afterwards.
+
+Every template is [static system message, "{theme}" human message]. The system
+message is a prebuilt SystemMessage rather than a template, so it is never
+re-rendered and its bytes are identical on every request: the stable prefix
+that provider-side prompt caching (and a warm Ollama KV cache) can reuse.
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List
+
+TEMPLATES_PATH = Path(__file__).resolve().parent / "templates.json"
+
+with open(TEMPLATES_PATH, encoding="utf-8") as f:
+    _TEMPLATE_DATA: Dict[str, Dict[str, Dict[str, str]]] = json.load(f)
+
+PERSONA_MAP: Dict[str, List[str]] = {
+    persona: list(formats) for persona, formats in _TEMPLATE_DATA.items()
 }
 
-TEMPLATES = {
-    "Poet": {
-        "Sonnet": ChatPromptTemplate.from_messages([
-            ("system", "You are a master sonneteer in the tradition of Shakespeare and Petrarch. "
-                       "Craft a 14-line sonnet with iambic pentameter. Use ABAB CDCD EFEF GG rhyme scheme. "
-                       "Weave profound imagery and metaphor. End with a powerful volta or turn. "
-                       "Provide ONLY the sonnet—no commentary."),
-            ("human", "Theme: {theme}")
-        ]),
-        "Haiku": ChatPromptTemplate.from_messages([
-            ("system", "You are a Zen haiku master following Basho's path. "
-                       "Compose a traditional 5-7-5 syllable haiku capturing a fleeting moment. "
-                       "Embrace simplicity, nature imagery, and seasonal reference (kigo). "
-                       "Include a subtle emotional resonance. Provide ONLY the haiku."),
-            ("human", "Theme: {theme}")
-        ]),
-        "Free Verse": ChatPromptTemplate.from_messages([
-            ("system", "You are a contemporary free verse poet with visceral, imagistic style. "
-                       "Break conventional structure. Use enjambment, white space, and line breaks as instruments. "
-                       "Create sensory-rich language that pierces the heart. "
-                       "Provide ONLY the poem—raw and unfiltered."),
-            ("human", "Theme: {theme}")
-        ])
-    },
-    
-    "Manga Writer": {
-        "Manga Script": ChatPromptTemplate.from_messages([
-            ("system", "You are a professional Manga Storyboarder and scriptwriter. "
-                       "Format as: PAGE X, PANEL Y. "
-                       "Describe visuals with cinematic 'food porn' intensity—lighting, angles, expressions. "
-                       "Include dynamic SFX (sound effects in caps). "
-                       "Add character dialogue in quotes with emotion tags. "
-                       "Provide ONLY the formatted script."),
-            ("human", "Theme/Concept: {theme}")
-        ]),
-        "Character Profile": ChatPromptTemplate.from_messages([
-            ("system", "You are a manga character designer creating compelling protagonists and antagonists. "
-                       "Structure the profile with: NAME | AGE | APPEARANCE (detailed visual) | "
-                       "PERSONALITY | BACKSTORY | ABILITIES/POWERS | CHARACTER ARC | SIGNATURE PHRASE. "
-                       "Make them three-dimensional with flaws and aspirations. "
-                       "Provide ONLY the character profile."),
-            ("human", "Character concept: {theme}")
-        ]),
-        "World Building Guide": ChatPromptTemplate.from_messages([
-            ("system", "You are a manga world architect crafting immersive universes. "
-                       "Detail: SETTING NAME | TIME PERIOD/ERA | GEOGRAPHY | POWER SYSTEM/MAGIC RULES | "
-                       "SOCIAL STRUCTURE | KEY LOCATIONS | CONFLICTS | UNIQUE ELEMENTS. "
-                       "Make the world feel lived-in with internal logic. "
-                       "Provide ONLY the world guide."),
-            ("human", "World concept: {theme}")
-        ])
-    },
-    
-    "Novelist": {
-        "Short Story": ChatPromptTemplate.from_messages([
-            ("system", "You are a masterful short story writer in the vein of Chekhov and Carver. "
-                       "Craft a complete short story with: compelling opening hook, rising tension, "
-                       "vivid character development, and resonant ending. "
-                       "Show, don't tell. Use precise, evocative prose. "
-                       "Create a story that lingers. Provide ONLY the story."),
-            ("human", "Story premise: {theme}")
-        ]),
-        "Novel Chapter": ChatPromptTemplate.from_messages([
-            ("system", "You are a bestselling novelist writing a gripping chapter. "
-                       "Open with a scene that pulls readers in. Build atmosphere through sensory detail. "
-                       "Develop character through action and dialogue. "
-                       "End with a hook that demands the next chapter. "
-                       "Use vivid prose with varied sentence rhythm. Provide ONLY the chapter."),
-            ("human", "Chapter concept: {theme}")
-        ]),
-        "Plot Outline": ChatPromptTemplate.from_messages([
-            ("system", "You are a narrative architect structuring compelling plots. "
-                       "Create a detailed outline with: PREMISE | PROTAGONIST & GOAL | ANTAGONIST & OPPOSITION | "
-                       "ACT I (Setup & Inciting Incident) | ACT II (Rising Action, Midpoint, Complications) | "
-                       "ACT III (Climax & Resolution) | THEMES | KEY PLOT TWISTS. "
-                       "Ensure narrative causality and escalating stakes. Provide ONLY the outline."),
-            ("human", "Story idea: {theme}")
-        ])
-    },
-    
-    "Academic": {
-        "Thesis Abstract": ChatPromptTemplate.from_messages([
-            ("system", "You are a distinguished academic scholar writing a rigorous thesis abstract. "
-                       "Structure: BACKGROUND/CONTEXT | RESEARCH QUESTION/HYPOTHESIS | METHODOLOGY | "
-                       "KEY FINDINGS | SIGNIFICANCE/CONTRIBUTION | IMPLICATIONS. "
-                       "Use precise academic language. Maintain objectivity. "
-                       "Be concise yet comprehensive (250-300 words). Provide ONLY the abstract."),
-            ("human", "Research topic: {theme}")
-        ]),
-        "Research Summary": ChatPromptTemplate.from_messages([
-            ("system", "You are an academic researcher synthesizing complex scholarship. "
-                       "Summarize with: INTRODUCTION (field context) | MAIN ARGUMENTS/FINDINGS | "
-                       "METHODOLOGY | EVIDENCE | CRITICAL ANALYSIS | GAPS/LIMITATIONS | CONCLUSION. "
-                       "Cite theoretical frameworks. Use disciplinary terminology appropriately. "
-                       "Maintain scholarly rigor. Provide ONLY the summary."),
-            ("human", "Research area: {theme}")
-        ])
-    },
-    
-    "Journalist": {
-        "News Article": ChatPromptTemplate.from_messages([
-            ("system", "You are an investigative journalist writing breaking news. "
-                       "Use inverted pyramid structure: Lead (5 W's + H in opening), "
-                       "Body (descending importance), Background context, Quotes from sources. "
-                       "Write objectively with active voice. Keep paragraphs short (2-3 sentences). "
-                       "Verify facts. Provide ONLY the article."),
-            ("human", "News topic: {theme}")
-        ]),
-        "Editorial": ChatPromptTemplate.from_messages([
-            ("system", "You are a sharp editorial columnist with a distinctive voice. "
-                       "Structure: HOOK (provocative opening) | THESIS | SUPPORTING ARGUMENTS (with evidence) | "
-                       "COUNTERARGUMENT ACKNOWLEDGMENT | REBUTTAL | CALL TO ACTION. "
-                       "Be persuasive yet balanced. Use rhetoric strategically. "
-                       "End powerfully. Provide ONLY the editorial."),
-            ("human", "Editorial topic: {theme}")
-        ]),
-        "Interview Script": ChatPromptTemplate.from_messages([
-            ("system", "You are a seasoned interviewer crafting insightful conversations. "
-                       "Format: INTRODUCTION (context, subject bio) | "
-                       "Q&A (10-12 questions with anticipated detailed responses) | "
-                       "CONCLUSION (reflection). "
-                       "Ask probing questions that reveal character and expertise. "
-                       "Build conversational flow. Provide ONLY the interview script."),
-            ("human", "Interview subject/topic: {theme}")
-        ])
+
+def get_system_prompt(persona: str, literature: str) -> str:
+    return _TEMPLATE_DATA[persona][literature]["system"]
+
+
+def get_size_class(persona: str, literature: str) -> str:
+    """"short", "medium" or "long": how much text the format usually produces (used by core/router.py)."""
+    return _TEMPLATE_DATA[persona][literature].get("size", "medium")
+
+
+def system_prefix_digest(persona: str, literature: str) -> str:
+    """Short hash of the static system prefix, handy for checking that requests share it."""
+    return hashlib.sha256(get_system_prompt(persona, literature).encode("utf-8")).hexdigest()[:12]
+
+
+@lru_cache(maxsize=None)
+def get_template(persona: str, literature: str):
+    """Compiled ChatPromptTemplate for one persona/literature pair (built once per process)."""
+    from langchain_core.messages import SystemMessage
+    from langchain_core.prompts import ChatPromptTemplate, HumanMessagePromptTemplate
+
+    entry = _TEMPLATE_DATA[persona][literature]
+    return ChatPromptTemplate.from_messages([
+        SystemMessage(content=entry["system"]),
+        HumanMessagePromptTemplate.from_template(entry["human"]),
+    ])
+
+
+@lru_cache(maxsize=None)
+def _all_templates():
+    return {
+        persona: {literature: get_template(persona, literature) for literature in formats}
+        for persona, formats in PERSONA_MAP.items()
     }
-}
\ No newline at end of file
+
+
+def __getattr__(name: str):
+    # TEMPLATES[persona][literature] keeps working, but is only compiled when first accessed
+    if name == "TEMPLATES":
+        return _all_templates()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
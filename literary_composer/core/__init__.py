@@ -0,0 +1,12 @@
+"""
+Building blocks of the literary composer. Modules shared with the repo's other projects
+(rate limiting, ...) live in ../../shared; importing any core module puts that
+directory on sys.path, the way the workers add ../agent_service.
+"""
+
+import sys
+from pathlib import Path
+
+_SHARED = str(Path(__file__).resolve().parents[2] / "shared")
+if _SHARED not in sys.path:
+    sys.path.insert(0, _SHARED)
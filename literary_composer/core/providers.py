@@ -0,0 +1,53 @@
+"""
+Lazy access to the chat model backends for app.py.
+
+langchain_groq (and the Groq SDK) or langchain_ollama are imported the first
+time a model of that backend is requested, not when the Streamlit script starts.
+"""
+
+import os
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+
+@lru_cache(maxsize=None)
+def get_groq_llm(model: str, temperature: float):
+    from rate_limit import RateLimitedChatGroq
+
+    return RateLimitedChatGroq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        model=model,
+        temperature=temperature,
+    )
+
+
+# --- Defaults (override through .env) ---
+# How long Ollama keeps the model (and the KV cache of the shared system prefix) loaded between requests
+# (a duration such as "30m", or seconds; -1 keeps it loaded indefinitely)
+DEFAULT_OLLAMA_KEEP_ALIVE = "30m"
+
+
+def ollama_keep_alive():
+    # Read when a client is built, so a value from .env applies whenever load_dotenv() ran
+    keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", DEFAULT_OLLAMA_KEEP_ALIVE)
+    return int(keep_alive) if keep_alive.lstrip("-").isdigit() else keep_alive
+
+
+@lru_cache(maxsize=None)
+def get_ollama_llm(model: str, temperature: float):
+    from langchain_ollama import ChatOllama
+
+    return ChatOllama(model=model, temperature=temperature, keep_alive=ollama_keep_alive())
+
+
+def get_output_parser():
+    from langchain_core.output_parsers import StrOutputParser
+
+    return StrOutputParser()
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    # Nothing has been rate limited until Groq has been loaded, so do not import it just to report that
+    rate_limit: Optional[Any] = sys.modules.get("rate_limit")
+    return rate_limit.limiter_stats() if rate_limit is not None else {}
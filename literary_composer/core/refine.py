@@ -0,0 +1,129 @@
+"""
+Draft-then-refine generation for the longer formats.
+
+A small, fast model writes a draft that is streamed to the page right away;
+the large model then revises that draft on a background thread and its
+version replaces the draft when it is ready. The refinement prompt keeps the
+persona's static system message as its first message, so it shares the
+cached prefix with the normal single-pass prompt.
+
+A refinement whose draft has been replaced (the user regenerated or cleared
+it) is cancelled: it is streamed, and stops at its next chunk.
+"""
+
+import os
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Iterator, Optional
+
+# --- Defaults (override through .env) ---
+DEFAULT_DRAFT_MODEL = os.getenv("REFINE_DRAFT_MODEL", "llama-3.1-8b-instant")
+DEFAULT_REFINE_WORKERS = int(os.getenv("REFINE_WORKERS", "4"))
+# Size classes (templates.json "size") for which a draft is worth it; short forms are fast enough already
+REFINE_SIZE_CLASSES = ("medium", "long")
+# Auto routing floor for the refining model (core/router.py tiers): above the draft model's tier 1,
+# so a refinement is never the small model rewriting its own draft
+REFINE_MIN_TIER = int(os.getenv("REFINE_MIN_TIER", "2"))
+
+REFINE_INSTRUCTION = (
+    "Above is a first draft of this piece. Rewrite it into the finished work: keep what works, "
+    "fix structure, pacing and continuity, deepen the imagery and voice, and follow every format "
+    "rule of your role. Provide ONLY the final work."
+)
+
+
+@lru_cache(maxsize=None)
+def get_refine_template(persona: str, literature: str):
+    """The persona template followed by the draft (as the assistant's turn) and a fixed revision request."""
+    from langchain_core.messages import HumanMessage
+    from langchain_core.prompts import AIMessagePromptTemplate, ChatPromptTemplate
+
+    from constants.templates import get_template
+
+    return ChatPromptTemplate.from_messages([
+        *get_template(persona, literature).messages,
+        AIMessagePromptTemplate.from_template("{draft}"),
+        HumanMessage(content=REFINE_INSTRUCTION),
+    ])
+
+
+@lru_cache(maxsize=1)
+def _executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=DEFAULT_REFINE_WORKERS, thread_name_prefix="refine")
+
+
+class Refinement:
+    """A refinement running in the background pool; result() is the refined text."""
+
+    def __init__(self, stream: Callable[[], Iterator[str]]):
+        self._cancelled = threading.Event()
+        self._future: "Future[str]" = _executor().submit(self._run, stream)
+
+    def _run(self, stream: Callable[[], Iterator[str]]) -> str:
+        chunks = stream()
+        parts = []
+        try:
+            for chunk in chunks:
+                if self._cancelled.is_set():
+                    raise CancelledError("refinement superseded by a newer draft")
+                parts.append(chunk)
+        finally:
+            # Closing the stream ends the model's (or the service's) generation
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+        return "".join(parts)
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> str:
+        return self._future.result(timeout)
+
+    def cancel(self) -> None:
+        """Drop the refinement if it has not started yet, or stop it at its next chunk."""
+        self._cancelled.set()
+        self._future.cancel()
+
+
+def start_refinement(persona: str, literature: str, theme: str, draft: str, llm) -> Refinement:
+    """Start refining `draft` in the background pool."""
+    messages = get_refine_template(persona, literature).format_messages(theme=theme, draft=draft)
+
+    # The model's own stream, not a chain's: closing a streamed chain waits for the model to finish
+    def stream() -> Iterator[str]:
+        chunks = llm.stream(messages)
+        try:
+            for chunk in chunks:
+                yield chunk.content
+        finally:
+            chunks.close()
+
+    return Refinement(stream)
+
+
+def start_service_refinement(persona: str, literature: str, theme: str, draft: str, model: str, temperature: float) -> Refinement:
+    """The same on the agent service (AGENT_SERVICE_URL); `model` is a Groq model name or "auto"."""
+    from service_client import stream_service
+
+    payload = {
+        "persona": persona,
+        "literature": literature,
+        "theme": theme,
+        "draft": draft,
+        "model": model,
+        "temperature": temperature,
+    }
+
+    def stream() -> Iterator[str]:
+        events = stream_service("/v1/compose", payload)
+        try:
+            for event, data in events:
+                if event == "token":
+                    yield data["text"]
+        finally:
+            # Drops the connection, so the service cancels the run on its worker
+            events.close()
+
+    return Refinement(stream)
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    # Annotations only: the app imports this module at startup, before LangChain is needed
+    from langchain_core.messages import BaseMessage
+
+# --- Defaults (override through .env) ---
+DEFAULT_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", ".cache/responses.sqlite")
+DEFAULT_MEMORY_ENTRIES = int(os.getenv("RESPONSE_CACHE_MEMORY_ENTRIES", "128"))
+DEFAULT_DISK_ENTRIES = int(os.getenv("RESPONSE_CACHE_DISK_ENTRIES", "2000"))
+DEFAULT_EMBEDDING_MODEL = os.getenv("RESPONSE_CACHE_EMBEDDING_MODEL", "nomic-embed-text")
+DEFAULT_SIMILARITY_THRESHOLD = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.92"))
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(payload) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _serialize(messages: Sequence["BaseMessage"]) -> List[Tuple[str, str]]:
+    return [(m.type, m.content) for m in messages]
+
+
+def _cosine(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache:
+    """
+    Cache for generated works.
+
+    Exact tier: keyed on the rendered prompt messages + model + temperature.
+    Semantic tier (opt-in per call): a miss falls back to the most similar earlier
+    theme that used the same system prompt, model and temperature, provided its
+    cosine similarity clears the threshold. Embeddings come from a local Ollama model;
+    when it is unavailable the semantic tier is skipped and only exact matches are served.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_CACHE_PATH,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_disk_entries: int = DEFAULT_DISK_ENTRIES,
+        embedder=None,
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.embedder = embedder
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        # scope -> {key: embedding}, loaded from disk lazily per scope
+        self._vectors: Dict[str, Dict[str, List[float]]] = {}
+        self._lock = threading.Lock()
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "embedding_errors": 0}
+
+        self._db = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " scope TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " embedding TEXT,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_responses_scope ON responses(scope)")
+            self._db.commit()
+
+    @staticmethod
+    def _keys(messages: Sequence["BaseMessage"], model: str, temperature: float) -> Tuple[str, str]:
+        serialized = _serialize(messages)
+        temperature = round(float(temperature), 2)
+        key = _digest([serialized, model, temperature])
+        # Everything but the user's theme: the static system prompt and settings
+        scope = _digest([serialized[:-1], model, temperature])
+        return key, scope
+
+    def lookup(
+        self,
+        messages: Sequence["BaseMessage"],
+        model: str,
+        temperature: float,
+        semantic: bool = False,
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ) -> Optional[str]:
+        key, scope = self._keys(messages, model, temperature)
+        with self._lock:
+            response = self._get(key)
+            if response is not None:
+                self._stats["exact_hits"] += 1
+                return response
+
+        vector = self._embed(messages[-1].content) if semantic else None
+        if vector is not None:
+            with self._lock:
+                best_key, best_score = None, threshold
+                for candidate, candidate_vector in self._scope_vectors(scope).items():
+                    score = _cosine(vector, candidate_vector)
+                    if score >= best_score:
+                        best_key, best_score = candidate, score
+                if best_key is not None:
+                    response = self._get(best_key)
+                    if response is not None:
+                        self._stats["semantic_hits"] += 1
+                        return response
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return None
+
+    def store(
+        self,
+        messages: Sequence["BaseMessage"],
+        model: str,
+        temperature: float,
+        response: str,
+        semantic: bool = False,
+    ) -> None:
+        key, scope = self._keys(messages, model, temperature)
+        # Without an embedding the response is still cached for exact matches
+        vector = self._embed(messages[-1].content) if semantic else None
+
+        with self._lock:
+            self._remember(key, response)
+            if vector is not None:
+                self._scope_vectors(scope)[key] = vector
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, scope, response, embedding, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, scope, response, json.dumps(vector) if vector else None, time.time()),
+                )
+                self._evict_disk()
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hits"] = stats["exact_hits"] + stats["semantic_hits"]
+            return stats
+
+    def _get_embedder(self):
+        if self.embedder is None:
+            from langchain_ollama import OllamaEmbeddings
+
+            self.embedder = OllamaEmbeddings(model=DEFAULT_EMBEDDING_MODEL)
+        return self.embedder
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        """The theme's embedding, or None (logged) when the embedding model cannot be reached."""
+        try:
+            return self._get_embedder().embed_query(text)
+        except Exception as e:
+            with self._lock:
+                self._stats["embedding_errors"] += 1
+            logger.warning("Response cache: embedding failed, using exact matches only: %s", e)
+            return None
+
+    # --- Internal helpers (caller holds the lock) ---
+    def _get(self, key: str) -> Optional[str]:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        self._remember(key, row[0])
+        return row[0]
+
+    def _remember(self, key: str, response: str) -> None:
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _scope_vectors(self, scope: str) -> Dict[str, List[float]]:
+        if scope not in self._vectors:
+            vectors = {}
+            if self._db is not None:
+                rows = self._db.execute(
+                    "SELECT key, embedding FROM responses WHERE scope = ? AND embedding IS NOT NULL",
+                    (scope,),
+                ).fetchall()
+                vectors = {key: json.loads(embedding) for key, embedding in rows}
+            self._vectors[scope] = vectors
+        return self._vectors[scope]
+
+    def _evict_disk(self) -> None:
+        count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow <= 0:
+            return
+        evicted = self._db.execute(
+            "SELECT key, scope FROM responses ORDER BY accessed_at ASC LIMIT ?", (overflow,)
+        ).fetchall()
+        self._db.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k, _ in evicted])
+        for key, scope in evicted:
+            self._vectors.get(scope, {}).pop(key, None)
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache shared by every session."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
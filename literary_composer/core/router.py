@@ -0,0 +1,305 @@
+"""
+Per-request model routing across Groq and a local Ollama model.
+
+Each template has a size class (templates.json "size"). A size class sets a
+latency SLO for the whole piece and the smallest model tier that writes it
+well. For every request the router walks the Groq routes allowed for that
+class from cheapest to most expensive and takes the first one that is
+healthy:
+
+    * its circuit breaker (../shared/rate_limit.py) is not open,
+    * its rate-limit buckets would not hold the call back longer than the SLO,
+    * its recent error rate is under ROUTER_MAX_ERROR_RATE,
+    * its rolling p95 latency for this size class is within the SLO.
+
+If no Groq route qualifies, the request goes to the local Ollama model,
+provided that model passes the same error-rate and SLO checks (it is only
+exempt from the tier floor, since it is there for degraded mode). When
+nothing is healthy, the degraded candidates are tried anyway, the one
+closest to its SLO first. Failures before the first token (429s that outlast the retries, an open
+breaker) move on to the next candidate too. Every attempt's outcome and
+latency is fed back into the rolling window.
+
+The module is stdlib-only; backends are created through core/providers.py
+on first use.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+# --- Defaults (override through .env) ---
+DEFAULT_OLLAMA_MODEL = os.getenv("ROUTER_OLLAMA_MODEL", "gemma3")
+DEFAULT_ENABLE_OLLAMA = os.getenv("ROUTER_ENABLE_OLLAMA", "1") not in ("0", "false", "False")
+DEFAULT_WINDOW = int(os.getenv("ROUTER_WINDOW", "50"))
+DEFAULT_WINDOW_SECONDS = float(os.getenv("ROUTER_WINDOW_SECONDS", "600"))
+DEFAULT_MAX_ERROR_RATE = float(os.getenv("ROUTER_MAX_ERROR_RATE", "0.3"))
+# Samples needed before latency / error rate are trusted over the optimistic default
+DEFAULT_MIN_SAMPLES = 3
+
+
+@dataclass(frozen=True)
+class Route:
+    backend: str  # "groq" or "ollama"
+    model: str
+    tier: int  # 1 = small/fast, 2 = large
+    usd_per_mtok_in: float
+    usd_per_mtok_out: float
+
+    @property
+    def label(self) -> str:
+        return f"{self.backend}:{self.model}"
+
+    def cost(self, prompt_tokens: int, completion_tokens: int) -> float:
+        return (prompt_tokens * self.usd_per_mtok_in + completion_tokens * self.usd_per_mtok_out) / 1e6
+
+
+@dataclass(frozen=True)
+class SizePolicy:
+    slo_s: float  # p95 latency for the full piece
+    min_tier: int
+    max_tokens: int  # rough completion size, for cost estimates
+
+
+# Groq on-demand pricing (USD per million tokens)
+GROQ_ROUTES = [
+    Route("groq", "llama-3.1-8b-instant", tier=1, usd_per_mtok_in=0.05, usd_per_mtok_out=0.08),
+    Route("groq", "llama-3.3-70b-versatile", tier=2, usd_per_mtok_in=0.59, usd_per_mtok_out=0.79),
+]
+
+# Profiles, outlines, summaries and articles are well within the 8B model; long fiction needs the 70B one
+SIZE_POLICIES = {
+    "short": SizePolicy(
+        slo_s=float(os.getenv("ROUTER_SLO_SHORT_S", "4")),
+        min_tier=int(os.getenv("ROUTER_MIN_TIER_SHORT", "1")),
+        max_tokens=200,
+    ),
+    "medium": SizePolicy(
+        slo_s=float(os.getenv("ROUTER_SLO_MEDIUM_S", "10")),
+        min_tier=int(os.getenv("ROUTER_MIN_TIER_MEDIUM", "1")),
+        max_tokens=800,
+    ),
+    "long": SizePolicy(
+        slo_s=float(os.getenv("ROUTER_SLO_LONG_S", "25")),
+        min_tier=int(os.getenv("ROUTER_MIN_TIER_LONG", "2")),
+        max_tokens=2000,
+    ),
+}
+
+
+class LatencyWindow:
+    """Last `size` outcomes (within `max_age` seconds) of one route for one size class."""
+
+    def __init__(self, size: int = DEFAULT_WINDOW, max_age: float = DEFAULT_WINDOW_SECONDS):
+        self.max_age = max_age
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=size)
+
+    def add(self, latency_s: float, ok: bool) -> None:
+        self._samples.append((time.monotonic(), latency_s, ok))
+
+    def _recent(self) -> List[Tuple[float, float, bool]]:
+        cutoff = time.monotonic() - self.max_age
+        return [s for s in self._samples if s[0] >= cutoff]
+
+    def snapshot(self) -> Dict[str, Any]:
+        recent = self._recent()
+        latencies = sorted(latency for _, latency, ok in recent if ok)
+        errors = sum(1 for _, _, ok in recent if not ok)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] if latencies else None
+        return {
+            "samples": len(recent),
+            "p95_s": p95,
+            "error_rate": errors / len(recent) if recent else 0.0,
+        }
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        routes: List[Route] = GROQ_ROUTES,
+        fallback: Optional[Route] = None,
+        policies: Dict[str, SizePolicy] = SIZE_POLICIES,
+        max_error_rate: float = DEFAULT_MAX_ERROR_RATE,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+    ):
+        self.routes = sorted(routes, key=lambda r: r.cost(1000, 1000))
+        self.fallback = fallback
+        self.policies = policies
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self._windows: Dict[Tuple[str, str], LatencyWindow] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, route: Route, size_class: str) -> LatencyWindow:
+        with self._lock:
+            key = (route.label, size_class)
+            if key not in self._windows:
+                self._windows[key] = LatencyWindow()
+            return self._windows[key]
+
+    def record(self, route: Route, size_class: str, latency_s: float, ok: bool) -> None:
+        self._window(route, size_class).add(latency_s, ok)
+
+    @staticmethod
+    def _limiter(route: Route):
+        # Only consult limiters that exist; importing rate_limit here would load langchain_groq
+        rate_limit = sys.modules.get("rate_limit")
+        if route.backend != "groq" or rate_limit is None:
+            return None
+        return rate_limit.get_limiter("groq", route.model)
+
+    def _breaker_state(self, route: Route) -> str:
+        limiter = self._limiter(route)
+        return limiter.breaker.state if limiter is not None else "closed"
+
+    def _throttle_wait(self, route: Route) -> float:
+        """Seconds the route's token buckets would hold the next call back; the limiter sleeps it off silently."""
+        limiter = self._limiter(route)
+        return limiter.wait_time() if limiter is not None else 0.0
+
+    def _snapshot(self, route: Route, size_class: str) -> Dict[str, Any]:
+        with self._lock:
+            window = self._windows.get((route.label, size_class))
+        return window.snapshot() if window is not None else {"samples": 0}
+
+    def health(self, route: Route, size_class: str) -> Tuple[bool, str]:
+        """(usable, reason) for one route and size class."""
+        if self._breaker_state(route) == "open":
+            return False, "circuit open"
+        slo = self.policies.get(size_class, self.policies["medium"]).slo_s
+        wait = self._throttle_wait(route)
+        if wait > slo:
+            return False, f"rate limited, {wait:.1f}s wait > SLO {slo:g}s"
+        stats = self._snapshot(route, size_class)
+        if stats["samples"] >= self.min_samples:
+            if stats["error_rate"] > self.max_error_rate:
+                return False, f"error rate {stats['error_rate']:.0%}"
+            if stats["p95_s"] is not None and stats["p95_s"] > slo:
+                return False, f"p95 {stats['p95_s']:.1f}s > SLO {slo:g}s"
+        return True, "ok"
+
+    def plan(self, size_class: str, min_tier: Optional[int] = None) -> List[Tuple[Route, str]]:
+        """
+        Candidate routes in the order they should be tried, each with the reason
+        it is in that position. The first entry is the routing decision.
+        `min_tier` raises the size class's tier floor (a refinement must beat
+        its draft model); a raised floor applies to the local fallback too.
+        """
+        policy = self.policies.get(size_class, self.policies["medium"])
+        floor = max(policy.min_tier, min_tier or 0)
+        eligible = [r for r in self.routes if r.tier >= floor]
+        healthy, degraded = [], []
+        for route in eligible:
+            ok, reason = self.health(route, size_class)
+            (healthy if ok else degraded).append((route, "cheapest within SLO" if ok else reason))
+        plan = healthy
+        if self.fallback is not None and self.fallback.tier >= (min_tier or 0):
+            # The fallback skips the tier floor, not the SLO: a slow local model is no escape from a slow Groq
+            ok, reason = self.health(self.fallback, size_class)
+            if ok:
+                plan = plan + [(self.fallback, "Groq degraded, local fallback" if not healthy else "fallback")]
+            else:
+                degraded.append((self.fallback, f"local fallback, {reason}"))
+        # Last resort: a degraded route still beats no answer (but not one with an open breaker)
+        last_resort = [(route, reason) for route, reason in degraded if reason != "circuit open"]
+        last_resort.sort(key=lambda candidate: self._degraded_rank(candidate[0], size_class))
+        return plan + last_resort
+
+    def _degraded_rank(self, route: Route, size_class: str) -> Tuple[bool, float]:
+        # Routes that are only slow come before failing ones; among them, the lowest p95 first
+        stats = self._snapshot(route, size_class)
+        failing = stats.get("error_rate", 0.0) > self.max_error_rate
+        p95 = stats.get("p95_s")
+        return failing, p95 if p95 is not None else float("inf")
+
+    def choose(self, size_class: str, min_tier: Optional[int] = None) -> Route:
+        plan = self.plan(size_class, min_tier)
+        if plan:
+            return plan[0][0]
+        # Everything open and no fallback: report the cheapest route allowed, which will fail fast with CircuitOpenError
+        floor = max(self.policies.get(size_class, self.policies["medium"]).min_tier, min_tier or 0)
+        return next((route for route in self.routes if route.tier >= floor), self.routes[-1])
+
+    def estimate_cost(self, route: Route, size_class: str, prompt_tokens: int = 300) -> float:
+        return route.cost(prompt_tokens, self.policies.get(size_class, self.policies["medium"]).max_tokens)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            windows = dict(self._windows)
+        return {f"{label} [{size}]": window.snapshot() for (label, size), window in windows.items()}
+
+    # --- Execution with failover ---
+
+    def stream(
+        self,
+        size_class: str,
+        run: Callable[[Route], Iterator[str]],
+        on_route: Optional[Callable[[Route, str], None]] = None,
+    ) -> Iterator[str]:
+        """
+        Stream from the first candidate that produces a chunk. `run(route)` returns
+        the chunk iterator for that route; failures before the first chunk fall
+        through to the next candidate, later ones propagate. `on_route` is told
+        which route is answering.
+        """
+        last_error: Optional[BaseException] = None
+        for route, reason in self.plan(size_class):
+            started = time.monotonic()
+            try:
+                # Inside the try: building the chain or opening the stream can fail before any chunk too
+                iterator = run(route)
+                first = next(iterator)
+            except StopIteration:
+                self.record(route, size_class, time.monotonic() - started, True)
+                return
+            except Exception as e:
+                self.record(route, size_class, time.monotonic() - started, False)
+                last_error = e
+                continue
+            if on_route is not None:
+                on_route(route, reason)
+            try:
+                yield first
+                yield from iterator
+            except Exception:
+                self.record(route, size_class, time.monotonic() - started, False)
+                raise
+            self.record(route, size_class, time.monotonic() - started, True)
+            return
+        raise last_error or RuntimeError("no model route available")
+
+    def invoke(self, size_class: str, run: Callable[[Route], str]) -> Tuple[str, Route]:
+        """Non-streaming variant of stream(); returns (result, route that produced it)."""
+        last_error: Optional[BaseException] = None
+        for route, _ in self.plan(size_class):
+            started = time.monotonic()
+            try:
+                result = run(route)
+            except Exception as e:
+                self.record(route, size_class, time.monotonic() - started, False)
+                last_error = e
+                continue
+            self.record(route, size_class, time.monotonic() - started, True)
+            return result, route
+        raise last_error or RuntimeError("no model route available")
+
+
+def get_route_llm(route: Route, temperature: float):
+    from core.providers import get_groq_llm, get_ollama_llm
+
+    if route.backend == "ollama":
+        return get_ollama_llm(route.model, temperature)
+    return get_groq_llm(route.model, temperature)
+
+
+@lru_cache(maxsize=1)
+def get_model_router() -> ModelRouter:
+    fallback = None
+    if DEFAULT_ENABLE_OLLAMA:
+        fallback = Route("ollama", DEFAULT_OLLAMA_MODEL, tier=1, usd_per_mtok_in=0.0, usd_per_mtok_out=0.0)
+    return ModelRouter(fallback=fallback)
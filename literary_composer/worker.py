@@ -0,0 +1,77 @@
+"""
+Agent service worker for the literary composer.
+
+Started by ../agent_service (compose pool) with this project's interpreter
+and working directory; answers "compose" requests over stdio and streams
+the text as it is written (see ../agent_service/protocol.py).
+
+Payload: {"persona", "literature", "theme", "model" (a Groq model or "auto"),
+          "temperature", "draft" (optional: revise this draft, core/refine.py)}
+Events:  route {"label", "reason"} (auto only), token {"text"}
+Result:  {"text", "model"}
+"""
+
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agent_service"))
+
+from protocol import InvalidRequest, RequestContext, require, serve  # noqa: E402
+
+from constants.templates import PERSONA_MAP, get_size_class, get_template  # noqa: E402
+from core.providers import get_groq_llm, get_output_parser  # noqa: E402
+from core.refine import REFINE_MIN_TIER, get_refine_template  # noqa: E402
+from core.router import get_model_router, get_route_llm  # noqa: E402
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+AUTO_MODEL = "auto"
+
+
+def compose(payload: dict, context: RequestContext) -> dict:
+    persona, literature, theme = require(payload, "persona", "literature", "theme")
+    if literature not in PERSONA_MAP.get(persona, []):
+        raise InvalidRequest(f"unknown persona/literature: {persona} / {literature}")
+    model = payload.get("model") or DEFAULT_MODEL
+    temperature = float(payload.get("temperature", 0.8))
+    draft = payload.get("draft")
+    size_class = get_size_class(persona, literature)
+    router = get_model_router()
+    used = {"model": model}
+
+    if draft:
+        # Refinement is a single call on the chosen model; Auto picks its route up front, above the draft tier
+        route = router.choose(size_class, min_tier=REFINE_MIN_TIER) if model == AUTO_MODEL else None
+        llm = get_route_llm(route, temperature) if route else get_groq_llm(model, temperature)
+        used["model"] = route.label if route else model
+        template, inputs = get_refine_template(persona, literature), {"theme": theme, "draft": draft}
+    else:
+        llm = None if model == AUTO_MODEL else get_groq_llm(model, temperature)
+        template, inputs = get_template(persona, literature), {"theme": theme}
+
+    def route_chain(route):
+        return template | get_route_llm(route, temperature) | get_output_parser()
+
+    def on_route(route, reason):
+        used["model"] = route.label
+        context.emit("route", {"label": route.label, "reason": reason})
+
+    if llm is None:
+        chunks = router.stream(size_class, lambda route: route_chain(route).stream(inputs), on_route=on_route)
+    else:
+        chunks = (template | llm | get_output_parser()).stream(inputs)
+    text = ""
+    try:
+        for chunk in chunks:
+            text += chunk
+            # emit() raises Cancelled once the client has gone, which abandons the generation
+            context.emit("token", {"text": chunk})
+    finally:
+        chunks.close()
+    return {"text": text, "model": used["model"]}
+
+
+if __name__ == "__main__":
+    serve({"compose": compose})
@@ -0,0 +1,64 @@
+from functools import lru_cache
+
+from langchain_core.prompts import PromptTemplate
+from langchain.agents import create_react_agent
+from langchain_core.output_parsers import PydanticOutputParser
+from schemas import AgentResponse
+from cached_search import CachedTavilySearchResults
+from rate_limit import RateLimitedChatGroq
+from budget import (
+    DEFAULT_MAX_TOKENS,
+    DEFAULT_MAX_WALL_TIME_S,
+    DEFAULT_MIN_SOURCES,
+    BudgetedAgentExecutor,
+    LenientReActOutputParser,
+)
+from prompt_registry import get_prompt
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+
+
+@lru_cache(maxsize=None)
+def get_react_prompt() -> PromptTemplate:
+    """The versioned ReAct prompt with the AgentResponse format instructions filled in, built once."""
+    output_parser = PydanticOutputParser(pydantic_object=AgentResponse)
+    return get_prompt("react_json").partial(format_instructions=output_parser.get_format_instructions())
+
+
+def build_react_agent_executor(
+    model: str = DEFAULT_MODEL,
+    temperature: float = 0.1,
+    max_results: int = 5,
+    verbose: bool = True,
+    min_sources: int = DEFAULT_MIN_SOURCES,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    max_wall_time_s: float = DEFAULT_MAX_WALL_TIME_S,
+) -> BudgetedAgentExecutor:
+    #brain
+    llm = RateLimitedChatGroq(model=model, temperature=temperature)
+
+    #tools
+    search_tool = CachedTavilySearchResults(max_results=max_results)
+
+    #prompt
+    react_prompt_with_format_instructions = get_react_prompt()
+
+    #agent
+    react_agent=create_react_agent(
+        llm=llm,
+        tools=[search_tool],
+        prompt=react_prompt_with_format_instructions,
+        # Repairs near-valid Final Answer JSON locally and stops once enough sources are in
+        output_parser=LenientReActOutputParser(min_sources=min_sources),
+    )
+
+    return BudgetedAgentExecutor(
+        agent=react_agent,
+        tools=[search_tool],
+        verbose=verbose,
+        handle_parsing_errors=True,
+        max_iterations=5,
+        max_execution_time=max_wall_time_s,
+        max_tokens=max_tokens,
+        return_intermediate_steps=True,
+    )
@@ -1,51 +1,69 @@
+import argparse
+import sys
+from pathlib import Path
+
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain_core.prompts import PromptTemplate
-from langchain import hub
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_groq import ChatGroq
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_core.output_parsers import PydanticOutputParser
-from schemas import AgentResponse
-
-#brain
-llm = ChatGroq(model="llama-3.3-70b-versatile", temperature=0.1)
-
-#tools
-search_tool = TavilySearchResults(max_results=5)
-
-from prompt import REACT_PROMPT_WITH_FORMAT_INSTRUCTIONS
-
-#prompt
-react_prompt = hub.pull("hwchase17/react")
-output_parser = PydanticOutputParser(pydantic_object=AgentResponse)
-react_prompt_with_format_instructions = PromptTemplate(
-    template=REACT_PROMPT_WITH_FORMAT_INSTRUCTIONS,
-    input_variables=["input","agent_scratchpad","tool_names"]
-).partial(format_instructions=output_parser.get_format_instructions())
-
-#agent
-react_agent=create_react_agent(
-    llm=llm,
-    tools=[search_tool],
-    prompt=react_prompt_with_format_instructions,
-)
+# Modules shared with the other projects (rate limiting, caching, ...)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "shared"))
 
-react_agent_executor = AgentExecutor(
-    agent=react_agent,
-    tools=[search_tool],
-    verbose=True,
-    handle_parsing_errors=True,
-    max_iterations=5
-)
+from instrumentation import RunInstrumentation
+from rate_limit import limiter_stats
+from search_cache import get_search_cache
+
+QUESTION = "Find the latest AI Engineer job openings and provide links to apply."
 
-#test_run
-result=react_agent_executor.invoke(
-    {"input": "Find the latest AI Engineer job openings and provide links to apply."}
+parser = argparse.ArgumentParser(description="Run the job search agent once.")
+parser.add_argument(
+    "--mode",
+    choices=["react", "structured"],
+    default="react",
+    help="react: ReAct text loop with a JSON Final Answer; structured: native tool calling returning AgentResponse",
 )
+args = parser.parse_args()
+
+instrumentation = RunInstrumentation(f"{args.mode}_agent")
+if args.mode == "structured":
+    #agent (each mode imports only its own backend)
+    from structured import StructuredSearchAgent
+    structured_agent = StructuredSearchAgent()
+
+    #test_run
+    output = None
+    shown = 0
+    for event in structured_agent.stream(QUESTION, {"callbacks": [instrumentation]}):
+        if event["type"] == "search":
+            print(f"Searching: {event['query']}")
+        elif event["type"] == "sources":
+            # Sources are printed as soon as they are parsed from the streaming tool call
+            for url in event["sources"][shown:]:
+                print(f"  source: {url}")
+            shown = len(event["sources"])
+        else:
+            # Its loop runs outside AgentExecutor, so it reports its own steps
+            instrumentation.record_steps(event["iterations"])
+            if event["response"] is not None:
+                output = event["response"].model_dump_json(indent=2)
+else:
+    #agent
+    from agent import build_react_agent_executor
+    react_agent_executor = build_react_agent_executor()
+
+    #test_run
+    result=react_agent_executor.invoke(
+        {"input": QUESTION},
+        {"callbacks": [instrumentation]},
+    )
+    output = result["output"]
+instrumentation.finish()
 
 print("\n" + "="*50)
 print("FINAL ANSWER:")
 print("="*50)
-print(result["output"])
\ No newline at end of file
+print(output)
+print(f"Search cache stats: {get_search_cache().stats()}")
+print(f"Rate limiter stats: {limiter_stats()}")
+print(f"Run breakdown: {instrumentation.summary()}")
+for step in instrumentation.steps():
+    print(f"  {step['offset_ms']:>8.1f} ms  {step['step']:<40} {step['latency_ms']:>8.1f} ms")
@@ -0,0 +1,102 @@
+"""
+Offline latency/throughput benchmark for the ReAct search agent.
+
+Starts the local mock Groq + Tavily server (../benchmarks/mock_servers.py),
+points the agents at it and reports p50/p95 latency, throughput, iterations
+and prompt tokens per answer at several concurrency levels, for the ReAct
+loop and the native structured-output agent.
+
+Usage (from the react_search_agent directory):
+    uv run python benchmark.py --mode all --requests 20 --concurrency 1 4 8 --searches-per-answer 2
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+# Modules shared with the other projects (rate limiting, caching, ...)
+sys.path.insert(0, str(REPO_ROOT / "shared"))
+
+import harness  # noqa: E402
+
+# Search results must not be served from cache, otherwise we only measure the cache
+os.environ["SEARCH_CACHE_PATH"] = ""
+os.environ["SEARCH_CACHE_TTL_SECONDS"] = "0"
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+os.environ.setdefault("TAVILY_API_KEY", "benchmark-placeholder")
+
+
+async def run_benchmarks(args, base_url: str) -> list:
+    os.environ["GROQ_API_BASE"] = base_url
+    from langchain_community.utilities import tavily_search
+
+    tavily_search.TAVILY_API_URL = base_url
+
+    from agent import build_react_agent_executor
+    from instrumentation import RunInstrumentation
+    from rate_limit import configure_limits
+    from structured import StructuredSearchAgent
+
+    if not args.rate_limited:
+        configure_limits(groq=0, groq_total=0, tavily=0)
+    executor = build_react_agent_executor(verbose=False)
+    structured_agent = StructuredSearchAgent()
+
+    async def react_request(i: int) -> dict:
+        instrumentation = RunInstrumentation("react")
+        await executor.ainvoke(
+            {"input": f"Find the latest AI Engineer job openings and provide links to apply. (run {i})"},
+            {"callbacks": [instrumentation]},
+        )
+        summary = instrumentation.summary()
+        return {"iterations": summary["iterations"], "prompt_tokens": summary["prompt_tokens"]}
+
+    async def structured_request(i: int) -> dict:
+        instrumentation = RunInstrumentation("structured")
+        async for event in structured_agent.astream(
+            f"Find the latest AI Engineer job openings and provide links to apply. (run {i})",
+            {"callbacks": [instrumentation]},
+        ):
+            if event["type"] == "final":
+                instrumentation.record_steps(event["iterations"])
+        summary = instrumentation.summary()
+        return {"iterations": summary["iterations"], "prompt_tokens": summary["prompt_tokens"]}
+
+    modes = {"react": react_request, "structured": structured_request}
+    selected = list(modes) if args.mode == "all" else [args.mode]
+    all_rows = []
+    for mode in selected:
+        rows = []
+        for concurrency in args.concurrency:
+            row = await harness.run_concurrent(modes[mode], args.requests, concurrency)
+            rows.append(dict(label=mode, **row))
+        harness.print_table(f"react_search_agent / {mode}", rows)
+        all_rows.extend(rows)
+    return all_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ReAct search agent against local mocks.")
+    parser.add_argument("--mode", choices=["react", "structured", "all"], default="all")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--rate-limited", action="store_true", help="Keep the client-side rate limits on")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    harness.add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = harness.launch_mock_server(args)
+    try:
+        results = asyncio.run(run_benchmarks(args, base_url))
+    finally:
+        server.terminate()
+    if args.json:
+        harness.write_json(args.json, {"app": "react_search_agent", "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import json
+import os
+import re
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+
+from langchain.agents import AgentExecutor
+from langchain.agents.output_parsers import ReActSingleInputOutputParser
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+from langchain_core.exceptions import OutputParserException
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig, ensure_config
+from langchain_core.utils.json import parse_partial_json
+from pydantic import ValidationError
+
+from instrumentation import token_usage
+from schemas import AgentResponse, Source
+
+# --- Defaults (override through .env) ---
+DEFAULT_MAX_WALL_TIME_S = float(os.getenv("REACT_MAX_WALL_TIME_S", "60"))
+DEFAULT_MAX_TOKENS = int(os.getenv("REACT_MAX_TOKENS", "12000"))
+DEFAULT_MIN_SOURCES = int(os.getenv("REACT_MIN_SOURCES", "3"))
+
+FINAL_ANSWER_ACTION = "Final Answer:"
+URL_PATTERN = re.compile(r"https?://[^\s\"'<>\]\)]+")
+_CODE_FENCE = re.compile(r"```(?:json)?\s*(.*?)(?:```|$)", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_ACTION = re.compile(r"\n?\s*Action\s*\d*\s*:")
+_SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+# The "answer" string with its closing quote, i.e. fully written even if the JSON is cut off later
+_CLOSED_ANSWER = re.compile(r'"answer"\s*:\s*"(?:[^"\\]|\\.)*"')
+INCOMPLETE_ANSWER_MESSAGE = (
+    "Your Final Answer was cut off before the JSON object was complete. "
+    "Reply again with Final Answer: followed by the complete JSON object."
+)
+
+
+# --- Lenient Final Answer parsing ---
+def repair_json(text: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """
+    Best-effort parse of near-valid JSON from an LLM: strips code fences and
+    surrounding prose, fixes smart quotes and trailing commas, and closes
+    truncated strings/brackets. Returns the object (None if no JSON object can
+    be recovered) and whether it was complete, i.e. nothing had to be closed.
+    """
+    fenced = _CODE_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = text.find("{")
+    if start < 0:
+        return None, False
+    text = _TRAILING_COMMA.sub(r"\1", text[start:].translate(_SMART_QUOTES).strip())
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text)
+        complete = True
+    except json.JSONDecodeError:
+        value, complete = parse_partial_json(text), False
+    return (value, complete) if isinstance(value, dict) else (None, False)
+
+
+def parse_agent_response(text: str) -> Optional[AgentResponse]:
+    """
+    The AgentResponse in `text`, or None. Truncated JSON only counts once its
+    "answer" string is closed, and then keeps only the sources whose URL was
+    written in full: `{"answer": "Here are` is not an answer yet.
+    """
+    data, complete = repair_json(text)
+    if data is None:
+        return None
+    if not complete and not _CLOSED_ANSWER.search(text.translate(_SMART_QUOTES)):
+        return None
+    # Models sometimes answer with "source" (singular) or bare URL strings
+    sources = data.get("sources", data.get("source")) or []
+    sources = [{"url": s} if isinstance(s, str) else s for s in sources]
+    if not complete:
+        written = text.translate(_SMART_QUOTES)
+        sources = [s for s in sources if isinstance(s, dict) and _written_in_full(s.get("url"), written)]
+    data["sources"] = sources
+    try:
+        return AgentResponse.model_validate(data)
+    except ValidationError:
+        return None
+
+
+def _written_in_full(value: Any, text: str) -> bool:
+    return isinstance(value, str) and json.dumps(value, ensure_ascii=False) in text
+
+
+class LenientReActOutputParser(ReActSingleInputOutputParser):
+    """
+    ReAct parser that repairs the Final Answer JSON locally instead of sending a
+    parse error back to the model, and finishes as soon as an AgentResponse with
+    at least `min_sources` sources can be read from the output, even if the model
+    also asked for another search. A Final Answer that was cut off before its
+    answer was complete is a parse error, so the model is asked to answer again.
+    """
+
+    min_sources: int = DEFAULT_MIN_SOURCES
+
+    def parse(self, text: str) -> Union[AgentAction, AgentFinish]:
+        answer_text = text.split(FINAL_ANSWER_ACTION, 1)[1] if FINAL_ANSWER_ACTION in text else text
+        # Keep "Final Answer: {...}\nAction: ..." from leaking the action into the JSON
+        response = parse_agent_response(_ACTION.split(answer_text)[0])
+        if response is not None and (len(response.sources) >= self.min_sources or not _ACTION.search(text)):
+            return AgentFinish({"output": response.model_dump_json()}, text)
+        # A JSON answer that was cut off (e.g. at the completion token limit) is not an answer yet
+        if response is None and FINAL_ANSWER_ACTION in text and "{" in answer_text and not _ACTION.search(text):
+            raise OutputParserException(
+                f"Incomplete Final Answer: `{text}`",
+                observation=INCOMPLETE_ANSWER_MESSAGE,
+                llm_output=text,
+                send_to_llm=True,
+            )
+        return super().parse(text)
+
+    @property
+    def _type(self) -> str:
+        return "react-single-input-lenient"
+
+
+# --- Budgets ---
+class TokenBudget(BaseCallbackHandler):
+    """Counts the tokens of every LLM call made under one agent run."""
+
+    def __init__(self, max_tokens: Optional[int]):
+        self.max_tokens = max_tokens
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def exhausted(self) -> bool:
+        return self.max_tokens is not None and self.total_tokens >= self.max_tokens
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        prompt, completion = token_usage(response)
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+
+
+# The executor is shared between concurrent requests, so the per-run budget lives in the context
+_current_budget: ContextVar[Optional[TokenBudget]] = ContextVar("react_token_budget", default=None)
+
+
+def salvage_response(intermediate_steps: List[Tuple[AgentAction, Any]], reason: str) -> AgentResponse:
+    """Build an answer from the search results gathered so far when a budget runs out."""
+    urls = []
+    for _, observation in intermediate_steps:
+        if isinstance(observation, list):
+            urls.extend(item.get("url") for item in observation if isinstance(item, dict) and item.get("url"))
+        else:
+            urls.extend(URL_PATTERN.findall(str(observation)))
+    urls = list(dict.fromkeys(urls))
+    return AgentResponse(
+        answer=f"Stopped early ({reason}); returning the {len(urls)} sources found so far.",
+        sources=[Source(url=url) for url in urls],
+    )
+
+
+class BudgetedAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor that also stops when the run's token budget is spent
+    (wall time uses the built-in max_execution_time). Instead of the generic
+    "Agent stopped" message, a stopped run returns the sources found so far.
+    The same applies to stream()/astream(), which step through an
+    AgentExecutorIterator and never reach _call/_acall.
+    """
+
+    max_tokens: Optional[int] = DEFAULT_MAX_TOKENS
+
+    def _should_continue(self, iterations: int, time_elapsed: float) -> bool:
+        budget = _current_budget.get()
+        if budget is not None and budget.exhausted:
+            return False
+        return super()._should_continue(iterations, time_elapsed)
+
+    def _start_budget(self, run_manager) -> Tuple[TokenBudget, Any]:
+        budget = TokenBudget(self.max_tokens)
+        if run_manager is not None:
+            # Inheritable, so the LLM calls made by the agent report to it
+            run_manager.inheritable_handlers.append(budget)
+        return budget, _current_budget.set(budget)
+
+    def _finish(self, outputs: Dict[str, Any], budget: TokenBudget, started: float) -> Dict[str, Any]:
+        if isinstance(outputs.get("output"), str) and outputs["output"].startswith("Agent stopped"):
+            if budget.exhausted:
+                reason = f"token budget of {budget.max_tokens} reached"
+            elif self.max_execution_time and time.monotonic() - started >= self.max_execution_time:
+                reason = f"time budget of {self.max_execution_time:g}s reached"
+            else:
+                reason = f"iteration limit of {self.max_iterations} reached"
+            steps = outputs.get("intermediate_steps") or []
+            outputs["output"] = salvage_response(steps, reason).model_dump_json()
+        outputs["token_usage"] = {"prompt_tokens": budget.prompt_tokens, "completion_tokens": budget.completion_tokens}
+        return outputs
+
+    def _call(self, inputs, run_manager=None):
+        budget, token = self._start_budget(run_manager)
+        started = time.monotonic()
+        try:
+            return self._finish(super()._call(inputs, run_manager), budget, started)
+        finally:
+            _current_budget.reset(token)
+
+    async def _acall(self, inputs, run_manager=None):
+        budget, token = self._start_budget(run_manager)
+        started = time.monotonic()
+        try:
+            return self._finish(await super()._acall(inputs, run_manager), budget, started)
+        finally:
+            _current_budget.reset(token)
+
+    @staticmethod
+    def _with_budget(config: Optional[RunnableConfig], budget: TokenBudget) -> RunnableConfig:
+        """`config` with the budget added to its callbacks, inheritable like in _start_budget."""
+        config = ensure_config(config)
+        callbacks = config.get("callbacks")
+        if isinstance(callbacks, BaseCallbackManager):
+            callbacks = callbacks.copy()
+            callbacks.add_handler(budget, inherit=True)
+        else:
+            callbacks = [*(callbacks or []), budget]
+        return {**config, "callbacks": callbacks}
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        budget = TokenBudget(self.max_tokens)
+        token = _current_budget.set(budget)
+        started = time.monotonic()
+        try:
+            for chunk in super().stream(input, self._with_budget(config, budget), **kwargs):
+                # The last chunk carries the output (and the intermediate steps the salvage needs)
+                yield self._finish(chunk, budget, started) if "output" in chunk else chunk
+        finally:
+            _current_budget.reset(token)
+
+    async def astream(
+        self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any
+    ) -> AsyncIterator[Dict[str, Any]]:
+        budget = TokenBudget(self.max_tokens)
+        token = _current_budget.set(budget)
+        started = time.monotonic()
+        try:
+            async for chunk in super().astream(input, self._with_budget(config, budget), **kwargs):
+                yield self._finish(chunk, budget, started) if "output" in chunk else chunk
+        finally:
+            _current_budget.reset(token)
@@ -0,0 +1,73 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForToolRun,
+)
+from pydantic import Field
+
+from context_compression import compress_results
+from rate_limit import get_limiter
+from search_cache import SearchCache, get_search_cache, make_cache_key
+
+
+class CachedTavilySearchResults(TavilySearchResults):
+    """
+    Drop-in replacement for TavilySearchResults that serves repeated queries
+    from the shared SearchCache instead of calling the Tavily API again.
+    The cache holds the raw Tavily response, keyed on the query and every search
+    parameter, in the shape search_agent's tool uses too.
+    Cache misses go through the shared Tavily rate limiter. The content
+    returned to the agent is compressed to its most relevant passages
+    (../shared/context_compression.py); the raw artifact is left untouched.
+    """
+
+    cache: SearchCache = Field(default_factory=get_search_cache, exclude=True)
+
+    def _search_kwargs(self) -> Dict:
+        return dict(
+            max_results=self.max_results,
+            search_depth=self.search_depth,
+            include_domains=self.include_domains,
+            exclude_domains=self.exclude_domains,
+            include_answer=self.include_answer,
+            include_raw_content=self.include_raw_content,
+            include_images=self.include_images,
+        )
+
+    def _run(
+        self,
+        query: str,
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ) -> Tuple[Union[List[Dict[str, str]], str], Dict]:
+        search_kwargs = self._search_kwargs()
+        key = make_cache_key(query, **search_kwargs)
+        raw_results = self.cache.get(key)
+        if raw_results is None:
+            try:
+                raw_results = get_limiter("tavily").call(self.api_wrapper.raw_results, query, **search_kwargs)
+            except Exception as e:
+                return repr(e), {}
+            self.cache.set(key, raw_results)
+        results = self.api_wrapper.clean_results(raw_results["results"])
+        return compress_results(results, query), raw_results
+
+    async def _arun(
+        self,
+        query: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> Tuple[Union[List[Dict[str, str]], str], Dict]:
+        search_kwargs = self._search_kwargs()
+        key = make_cache_key(query, **search_kwargs)
+        raw_results = self.cache.get(key)
+        if raw_results is None:
+            try:
+                raw_results = await get_limiter("tavily").acall(
+                    self.api_wrapper.raw_results_async, query, **search_kwargs
+                )
+            except Exception as e:
+                return repr(e), {}
+            self.cache.set(key, raw_results)
+        results = self.api_wrapper.clean_results(raw_results["results"])
+        return compress_results(results, query), raw_results
@@ -1,19 +1,6 @@
-REACT_PROMPT_WITH_FORMAT_INSTRUCTIONS="""Answer the following questions as best you can. You have access to the following tools:
+# Prompt texts live in prompts/<name>/v<N>.txt and are loaded through prompt_registry
+from prompt_registry import get_prompt_text
 
-{tools}
+REACT_PROMPT_WITH_FORMAT_INSTRUCTIONS = get_prompt_text("react_json")
 
-Use the following format:
-
-Question: the input question you must answer
-Thought: you should always think about what to do
-Action: the action to take, should be one of [{tool_names}]
-Action Input: the input to the action
-Observation: the result of the action
-... (this Thought/Action/Action Input/Observation can repeat N times)
-Thought: I now know the final answer
-Final Answer: the final answer to the original input question formatted according to the instructions given:{format_instructions}
-
-Begin!
-
-Question: {input}
-Thought:{agent_scratchpad}"""
\ No newline at end of file
+STRUCTURED_SYSTEM_PROMPT = get_prompt_text("structured_system")
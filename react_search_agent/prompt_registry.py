@@ -0,0 +1,94 @@
+"""
+Local prompt registry: prompts ship as versioned files under prompts/<name>/v<N>.txt
+and are compiled into PromptTemplates once per process. LangChain Hub is only
+contacted on an explicit refresh, never at startup.
+
+Refresh a hub-backed prompt (writes a new version only if the text changed):
+    uv run python prompt_registry.py refresh react
+"""
+
+import argparse
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from langchain_core.prompts import PromptTemplate
+
+PROMPTS_DIR = Path(__file__).resolve().parent / "prompts"
+
+# Prompts that were vendored from LangChain Hub and can be refreshed from it
+HUB_SOURCES: Dict[str, str] = {
+    "react": "hwchase17/react",
+}
+
+_VERSION_FILE = re.compile(r"^v(\d+)\.txt$")
+
+
+def list_versions(name: str) -> List[int]:
+    directory = PROMPTS_DIR / name
+    if not directory.is_dir():
+        return []
+    return sorted(int(m.group(1)) for m in map(_VERSION_FILE.match, (p.name for p in directory.iterdir())) if m)
+
+
+def _resolve(name: str, version: Optional[int]) -> Path:
+    versions = list_versions(name)
+    if not versions:
+        raise KeyError(f"Unknown prompt '{name}' (no files in {PROMPTS_DIR / name})")
+    version = versions[-1] if version is None else version
+    if version not in versions:
+        raise KeyError(f"Prompt '{name}' has no version {version} (available: {versions})")
+    return PROMPTS_DIR / name / f"v{version}.txt"
+
+
+@lru_cache(maxsize=None)
+def get_prompt_text(name: str, version: Optional[int] = None) -> str:
+    """Raw template text; the file's trailing newline is not part of the prompt."""
+    return _resolve(name, version).read_text(encoding="utf-8").rstrip("\n")
+
+
+@lru_cache(maxsize=None)
+def get_prompt(name: str, version: Optional[int] = None) -> PromptTemplate:
+    """Compiled PromptTemplate for `name` (latest version unless one is pinned)."""
+    return PromptTemplate.from_template(get_prompt_text(name, version))
+
+
+def refresh_from_hub(name: str) -> int:
+    """Pull `name` from LangChain Hub and store it as a new version if it changed; returns the current version."""
+    if name not in HUB_SOURCES:
+        raise KeyError(f"Prompt '{name}' is not backed by LangChain Hub")
+    from langchain import hub  # network access only happens here
+
+    template = hub.pull(HUB_SOURCES[name]).template
+    versions = list_versions(name)
+    if versions and get_prompt_text(name) == template.rstrip("\n"):
+        return versions[-1]
+    version = (versions[-1] if versions else 0) + 1
+    path = PROMPTS_DIR / name / f"v{version}.txt"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(template.rstrip("\n") + "\n", encoding="utf-8")
+    get_prompt_text.cache_clear()
+    get_prompt.cache_clear()
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or refresh the local prompt registry.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Show every prompt and its versions")
+    refresh = sub.add_parser("refresh", help="Pull a hub-backed prompt and store it as a new version")
+    refresh.add_argument("name", choices=sorted(HUB_SOURCES))
+    args = parser.parse_args()
+
+    if args.command == "refresh":
+        print(f"{args.name}: v{refresh_from_hub(args.name)}")
+    else:
+        for directory in sorted(p for p in PROMPTS_DIR.iterdir() if p.is_dir()):
+            versions = ", ".join(f"v{v}" for v in list_versions(directory.name))
+            source = f"  (hub: {HUB_SOURCES[directory.name]})" if directory.name in HUB_SOURCES else ""
+            print(f"{directory.name}: {versions}{source}")
+
+
+if __name__ == "__main__":
+    main()
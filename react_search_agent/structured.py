@@ -0,0 +1,154 @@
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.messages import AIMessageChunk, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.utils.json import parse_partial_json
+from pydantic import ValidationError
+
+from budget import URL_PATTERN
+from cached_search import CachedTavilySearchResults
+from prompt import STRUCTURED_SYSTEM_PROMPT
+from rate_limit import RateLimitedChatGroq
+from schemas import AgentResponse, Source
+
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+FINAL_TOOL = AgentResponse.__name__
+
+
+class StructuredSearchAgent:
+    """
+    Search agent that returns AgentResponse through native tool calling instead
+    of a ReAct "Final Answer" with schema instructions in every prompt. The
+    model either calls the search tool or the AgentResponse tool; the latter's
+    arguments are parsed incrementally while they stream, so sources can be
+    shown before the answer is complete.
+
+    stream()/astream() yield events:
+        {"type": "search", "query": ...}           a search was issued
+        {"type": "sources", "sources": [url, ...]} sources parsed so far
+        {"type": "final", "response": AgentResponse, "iterations": n}
+    """
+
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        temperature: float = 0.1,
+        max_results: int = 5,
+        max_iterations: int = 5,
+    ):
+        self.search_tool = CachedTavilySearchResults(max_results=max_results)
+        self.max_iterations = max_iterations
+        llm = RateLimitedChatGroq(model=model, temperature=temperature)
+        self.llm = llm.bind_tools([self.search_tool, AgentResponse])
+        # Last turn: the answer tool is forced so the loop always ends with an AgentResponse
+        self.final_llm = llm.bind_tools([self.search_tool, AgentResponse], tool_choice=FINAL_TOOL)
+
+    def _initial_messages(self, question: str) -> List[BaseMessage]:
+        return [SystemMessage(STRUCTURED_SYSTEM_PROMPT), HumanMessage(question)]
+
+    def _llm_for(self, iteration: int):
+        return self.final_llm if iteration == self.max_iterations - 1 else self.llm
+
+    @staticmethod
+    def _partial_sources(message: AIMessageChunk) -> List[str]:
+        """URLs of the AgentResponse call's sources that are already complete in the stream."""
+        for chunk in message.tool_call_chunks:
+            if chunk.get("name") == FINAL_TOOL and chunk.get("args"):
+                parsed = parse_partial_json(chunk["args"]) or {}
+                sources = parsed.get("sources") if isinstance(parsed, dict) else None
+                # The last entry may still be mid-string, so only report it once another one starts
+                return [s.get("url") for s in (sources or [])[:-1] if isinstance(s, dict) and s.get("url")]
+        return []
+
+    @staticmethod
+    def _final_response(message: AIMessageChunk, seen_urls: List[str]) -> Optional[AgentResponse]:
+        for call in message.tool_calls:
+            if call["name"] == FINAL_TOOL:
+                try:
+                    return AgentResponse.model_validate(call["args"])
+                except ValidationError:
+                    return None
+        if not message.tool_calls:
+            # Plain-text answer: keep it rather than paying for another round trip
+            return AgentResponse(
+                answer=str(message.content),
+                sources=[Source(url=url) for url in seen_urls],
+            )
+        return None
+
+    @staticmethod
+    def _observed_urls(observation: ToolMessage) -> List[str]:
+        artifact = getattr(observation, "artifact", None) or {}
+        results = artifact.get("results") if isinstance(artifact, dict) else None
+        if results:
+            return [r["url"] for r in results if r.get("url")]
+        return URL_PATTERN.findall(str(observation.content))
+
+    def stream(self, question: str, config: Optional[RunnableConfig] = None) -> Iterator[Dict[str, Any]]:
+        messages = self._initial_messages(question)
+        seen_urls: List[str] = []
+        for iteration in range(self.max_iterations):
+            message: Optional[AIMessageChunk] = None
+            reported: List[str] = []
+            for chunk in self._llm_for(iteration).stream(messages, config):
+                message = chunk if message is None else message + chunk
+                sources = self._partial_sources(message)
+                if len(sources) > len(reported):
+                    reported = sources
+                    yield {"type": "sources", "sources": sources}
+            response = self._final_response(message, seen_urls)
+            if response is not None:
+                yield {"type": "final", "response": response, "iterations": iteration + 1}
+                return
+            messages.append(message)
+            for call in message.tool_calls:
+                if call["name"] == FINAL_TOOL:
+                    # Invalid AgentResponse arguments: report the error so the model can fix them
+                    messages.append(ToolMessage("Invalid arguments for AgentResponse, try again.", tool_call_id=call["id"]))
+                    continue
+                yield {"type": "search", "query": call["args"].get("query")}
+                observation = self.search_tool.invoke(call, config)
+                seen_urls.extend(self._observed_urls(observation))
+                messages.append(observation)
+        yield {"type": "final", "response": None, "iterations": self.max_iterations}
+
+    async def astream(self, question: str, config: Optional[RunnableConfig] = None) -> AsyncIterator[Dict[str, Any]]:
+        messages = self._initial_messages(question)
+        seen_urls: List[str] = []
+        for iteration in range(self.max_iterations):
+            message: Optional[AIMessageChunk] = None
+            reported: List[str] = []
+            async for chunk in self._llm_for(iteration).astream(messages, config):
+                message = chunk if message is None else message + chunk
+                sources = self._partial_sources(message)
+                if len(sources) > len(reported):
+                    reported = sources
+                    yield {"type": "sources", "sources": sources}
+            response = self._final_response(message, seen_urls)
+            if response is not None:
+                yield {"type": "final", "response": response, "iterations": iteration + 1}
+                return
+            messages.append(message)
+            for call in message.tool_calls:
+                if call["name"] == FINAL_TOOL:
+                    messages.append(ToolMessage("Invalid arguments for AgentResponse, try again.", tool_call_id=call["id"]))
+                    continue
+                yield {"type": "search", "query": call["args"].get("query")}
+                observation = await self.search_tool.ainvoke(call, config)
+                seen_urls.extend(self._observed_urls(observation))
+                messages.append(observation)
+        yield {"type": "final", "response": None, "iterations": self.max_iterations}
+
+    def invoke(self, question: str, config: Optional[RunnableConfig] = None) -> Optional[AgentResponse]:
+        final = None
+        for event in self.stream(question, config):
+            if event["type"] == "final":
+                final = event["response"]
+        return final
+
+    async def ainvoke(self, question: str, config: Optional[RunnableConfig] = None) -> Optional[AgentResponse]:
+        final = None
+        async for event in self.astream(question, config):
+            if event["type"] == "final":
+                final = event["response"]
+        return final
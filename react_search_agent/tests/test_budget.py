@@ -0,0 +1,90 @@
+"""
+The token budget of BudgetedAgentExecutor, through invoke() and through stream()
+(the agent service's path, which steps through AgentExecutorIterator instead of _call).
+
+Run from react_search_agent/: python -m unittest discover -s tests
+"""
+
+import asyncio
+import json
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT))
+sys.path.insert(0, str(PROJECT.parent / "shared"))
+
+from langchain.agents import create_react_agent  # noqa: E402
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+from langchain_core.tools import tool  # noqa: E402
+
+from agent import get_react_prompt  # noqa: E402
+from budget import BudgetedAgentExecutor, LenientReActOutputParser  # noqa: E402
+
+TOKENS_PER_CALL = 100
+SEARCH_STEP = "Thought: I need more postings.\nAction: search\nAction Input: ai engineer jobs"
+
+
+@tool
+def search(query: str) -> list:
+    """Search job postings."""
+    return [{"url": "https://jobs.example.com/ai-engineer", "content": "AI Engineer, junior"}]
+
+
+class SearchForeverChatModel(BaseChatModel):
+    """Never gives a Final Answer; reports TOKENS_PER_CALL tokens per call, as Groq reports usage."""
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        usage = {"input_tokens": TOKENS_PER_CALL - 10, "output_tokens": 10, "total_tokens": TOKENS_PER_CALL}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=SEARCH_STEP, usage_metadata=usage))])
+
+    @property
+    def _llm_type(self) -> str:
+        return "search-forever"
+
+
+def build_executor(max_tokens: int) -> BudgetedAgentExecutor:
+    agent = create_react_agent(
+        SearchForeverChatModel(), [search], get_react_prompt(), output_parser=LenientReActOutputParser()
+    )
+    return BudgetedAgentExecutor(
+        agent=agent,
+        tools=[search],
+        max_iterations=20,
+        max_tokens=max_tokens,
+        handle_parsing_errors=True,
+        return_intermediate_steps=True,
+    )
+
+
+class TokenBudgetTest(unittest.TestCase):
+    max_tokens = 2 * TOKENS_PER_CALL
+
+    def assert_salvaged(self, outputs: dict) -> None:
+        response = json.loads(outputs["output"])
+        self.assertIn(f"token budget of {self.max_tokens} reached", response["answer"])
+        self.assertEqual(response["sources"], [{"url": "https://jobs.example.com/ai-engineer"}])
+        # Stopped after the call that spent the budget, far below max_iterations
+        self.assertEqual(len(outputs["intermediate_steps"]), 2)
+        self.assertEqual(outputs["token_usage"], {"prompt_tokens": 180, "completion_tokens": 20})
+
+    def test_invoke(self):
+        self.assert_salvaged(build_executor(self.max_tokens).invoke({"input": "Find AI Engineer jobs"}))
+
+    def test_stream(self):
+        chunks = list(build_executor(self.max_tokens).stream({"input": "Find AI Engineer jobs"}))
+        self.assert_salvaged(chunks[-1])
+
+    def test_astream(self):
+        async def last_chunk():
+            chunks = [chunk async for chunk in build_executor(self.max_tokens).astream({"input": "Find AI Engineer jobs"})]
+            return chunks[-1]
+
+        self.assert_salvaged(asyncio.run(last_chunk()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Agent service worker for the ReAct search agent.
+
+Started by ../agent_service (react pool) with this project's interpreter and
+working directory; answers "react" requests over stdio (see
+../agent_service/protocol.py).
+
+Payload: {"question", "mode": "react" | "structured", "model", "temperature"}
+Events:  search {"query"}, sources {"sources": [url, ...]} (structured only)
+Result:  {"output": str} for react, {"response": AgentResponse dict} for structured
+"""
+
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agent_service"))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "shared"))
+
+from protocol import InvalidRequest, RequestContext, require, serve  # noqa: E402
+
+from agent import DEFAULT_MODEL, build_react_agent_executor  # noqa: E402
+from structured import StructuredSearchAgent  # noqa: E402
+
+MODES = ("react", "structured")
+
+
+@lru_cache(maxsize=None)
+def get_react_executor(model: str, temperature: float):
+    return build_react_agent_executor(model=model, temperature=temperature, verbose=False)
+
+
+@lru_cache(maxsize=None)
+def get_structured_agent(model: str, temperature: float) -> StructuredSearchAgent:
+    return StructuredSearchAgent(model=model, temperature=temperature)
+
+
+def react(payload: dict, context: RequestContext) -> dict:
+    (question,) = require(payload, "question")
+    mode = payload.get("mode", "react")
+    if mode not in MODES:
+        raise InvalidRequest(f"mode must be one of {', '.join(MODES)}")
+    model = payload.get("model") or DEFAULT_MODEL
+    temperature = float(payload.get("temperature", 0.1))
+
+    if mode == "structured":
+        response = None
+        events = get_structured_agent(model, temperature).stream(question)
+        try:
+            for event in events:
+                if event["type"] == "final":
+                    response = event["response"]
+                else:
+                    context.emit(event["type"], {k: v for k, v in event.items() if k != "type"})
+        finally:
+            events.close()
+        return {"response": response.model_dump() if response is not None else None}
+
+    output = None
+    stream = get_react_executor(model, temperature).stream({"input": question})
+    try:
+        for chunk in stream:
+            # emit() raises Cancelled once the client has gone; closing the stream stops the agent
+            for action in chunk.get("actions", []):
+                context.emit("search", {"query": str(action.tool_input)})
+            if "output" in chunk:
+                output = chunk["output"]
+    finally:
+        stream.close()
+    return {"output": output}
+
+
+if __name__ == "__main__":
+    get_react_executor(DEFAULT_MODEL, 0.1)
+    serve({"react": react})
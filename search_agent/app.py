@@ -1,28 +1,50 @@
 import streamlit as st
 import os
 from dotenv import load_dotenv
+
+# The core modules read their settings (cache, index, single-flight, ...) when imported: load .env first
+load_dotenv()
+
 from constants.data import RESUME_CONTEXT
 
 # --- LangChain Imports ---
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_community.tools.tavily_search import TavilySearchResults
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.tools import StructuredTool, tool, BaseTool
-from typing import Type, List
 # from tavily import TavilyClient
 # from langchain_tavily import TavilySearch
-from models.schema import AgentResponse, Source
-
-load_dotenv()
+from constants.prompts import build_user_query
+# Heavy backends (agents, Tavily, Groq) are imported on first use, see core/providers.py
+from core.providers import (
+    get_agent_executor,
+    iter_agent_events,
+    iter_service_events,
+    limiter_stats,
+    run_fanout_search,
+    start_run_instrumentation,
+    to_agent_response,
+)
+from components.job_results import render_index_browser, render_run_results
+from core.job_index import IndexUpdate, get_job_index, skipping_known_postings
+from search_cache import get_search_cache
+from service_client import call_service, service_enabled, service_url, stream_service
+from single_flight import fingerprint, get_single_flight
 
 # --- Setup Session State for Results ---
 if "agent_result" not in st.session_state:
     st.session_state.agent_result = None
-if not os.getenv("GROQ_API_KEY"):
+if "last_run" not in st.session_state:
+    st.session_state.last_run = None
+if "index_update" not in st.session_state:
+    st.session_state.index_update = None
+# Postings found so far by the agent run in flight, so a Stop click can keep them
+if "live_run" not in st.session_state:
+    st.session_state.live_run = None
+# Search snippet per posting URL, used for the resume match scores
+if "snippets" not in st.session_state:
+    st.session_state.snippets = {}
+# As a thin client of the agent service (AGENT_SERVICE_URL) the API keys live on the service
+if not service_enabled() and not os.getenv("GROQ_API_KEY"):
     st.error("⚠️ GROQ_API_KEY is missing from your .env file!")
     st.stop()
-if not os.getenv("TAVILY_API_KEY"):
+if not service_enabled() and not os.getenv("TAVILY_API_KEY"):
     st.error("⚠️ TAVILY_API_KEY is missing. Get one at tavily.com!")
     st.stop()
 
@@ -65,9 +87,40 @@ with st.sidebar:
         placeholder="e.g., 'Series A startup', 'Must use LangChain'"
     )
 
+    search_mode = st.radio(
+        "Search Mode",
+        ["Agent (iterative)", "Fan-out (parallel)"],
+        help="Fan-out runs several query variants at once and summarizes them in a single LLM call"
+    )
+
+    skip_known = st.toggle(
+        "⏭️ Skip postings seen before",
+        value=False,
+        help="Drop search results that are already in the local job index, so only new postings are summarized"
+    )
+
     st.markdown("---")
     search_button = st.button("🔍 Find Opportunities", type="primary", use_container_width=True)
 
+    if service_enabled():
+        # The search cache, job index and rate limiters in use are the service's, not this process's
+        st.caption(f"Runs go to the agent service at {service_url()}")
+    else:
+        cache_stats = get_search_cache().stats()
+        st.caption(
+            f"Search cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses"
+        )
+        index_stats = get_job_index().stats()
+        st.caption(f"Job index: {index_stats['jobs']} postings over {index_stats['runs']} runs")
+        for name, stats in limiter_stats().items():
+            st.caption(
+                f"{name}: {stats['throttled']} throttled / {stats['retried']} retried"
+                f" / breaker {stats['breaker']}"
+            )
+    flight_stats = get_single_flight().stats()
+    if flight_stats["shared"]:
+        st.caption(f"Shared runs: {flight_stats['shared']} requests joined one already in flight")
+
 # --- Final Answer Tool ---
 # @tool
 # def save_search_results(answer:str, source:list):
@@ -82,95 +135,149 @@ with st.sidebar:
 #     except Exception as e:
 #         return f"Error saving results: {str(e)}"
 
-class SubmitJobReportTool(BaseTool):
-    name: str = "submit_job_report"
-    description: str = "Submit the final job search results including the summary and list of sources."
-    args_schema: Type[AgentResponse] = AgentResponse
-
-    def _run(self, answer: str, source: List):
-        """
-        The method that runs when the agent calls the tool.
-        """
-        try:
-            # 'source' usually comes in as a list of dictionaries. 
-            # We convert them to Source objects for consistency if needed.
-            validated_sources = []
-            for s in source:
-                if isinstance(s, dict):
-                    validated_sources.append(Source(**s))
+# ---  Main Logic ---
+def record_run(instrumentation, run_error=None):
+    instrumentation.finish(run_error)
+    st.session_state.last_run = {
+        "summary": instrumentation.summary(),
+        "steps": instrumentation.steps(),
+    }
+
+
+def index_postings(response, role, place):
+    """Remember every reported posting; the update tells this run's new postings apart from earlier ones."""
+    if response is None:
+        return None
+    return get_job_index().add_sources(response.source, role, place)
+
+
+def stream_agent_run(events):
+    """
+    Show an agent run step by step: every tool call and each posting as soon as a search finds it.
+    Returns the closing report / finish event.
+    """
+    live = st.session_state.live_run
+    stop_slot = st.empty()
+    # Clicking reruns the script, which interrupts this loop; the rerun keeps live["jobs"] (see below)
+    stop_slot.button("✋ Stop and keep what was found", key="stop_run")
+    status = st.status(f"Searching active listings for {target_role}...", expanded=True)
+    found = st.empty()
+    final = None
+    for event in events:
+        if event.kind == "tool_start":
+            status.write(f"🔎 Searching: {event.query}" if event.query else f"🛠️ Calling {event.tool}")
+        elif event.kind == "results":
+            live["searches"] += 1
+            fresh = [job for job in event.jobs if job["url"] not in live["jobs"]]
+            live["jobs"].update((job["url"], job) for job in fresh)
+            status.write(f"📄 {len(event.jobs)} results, {len(fresh)} new postings")
+            found.markdown(
+                f"**{len(live['jobs'])} postings found so far**\n\n"
+                + "\n".join(f"- [{job['title']}]({job['url']})" for job in live["jobs"].values())
+            )
+        elif event.kind == "tool_end":
+            status.write(f"⚠️ {event.tool}: {event.text[:200]}")
+        else:
+            final = event
+            response = event.response
+            label = f"✅ Report submitted with {len(response.source)} postings" if response else "Agent finished"
+            status.update(label=label, state="complete" if response else "error", expanded=False)
+    stop_slot.empty()
+    found.empty()
+    return final
+
+
+# A Stop click reruns the script and interrupts the run in flight: report what it had found
+if st.session_state.get("stop_run") and st.session_state.live_run is not None:
+    live = st.session_state.live_run
+    st.session_state.live_run = None
+    jobs = list(live["jobs"].values())
+    st.session_state.snippets = {job["url"]: job.get("snippet", "") for job in jobs}
+    st.session_state.agent_result = to_agent_response(
+        f"Stopped early (searches completed: {live['searches']}). The {len(jobs)} postings below come straight "
+        "from the search results and have not been checked against your resume yet.",
+        jobs,
+    )
+    st.session_state.index_update = index_postings(st.session_state.agent_result, live["role"], live["location"])
+    record_run(live["instrumentation"])
+
+def run_search():
+    """
+    One search for the sidebar's request: (response, snippets, index update).
+    Identical requests from other sessions that arrive while it runs share its
+    result instead of starting their own agent run (../shared/single_flight.py).
+    With AGENT_SERVICE_URL set the run happens on the agent service, which
+    also keeps the job index (../shared/service_client.py).
+    """
+    snippets = {}
+    remote = service_enabled()
+    payload = {"role": target_role, "location": location, "filters": additional_filters, "skip_known": skip_known}
+    index = None
+    # Known postings are dropped from search results for this run only (the tool is shared)
+    with skipping_known_postings(skip_known):
+        if search_mode == "Fan-out (parallel)":
+            with st.spinner(f"Searching active listings for {target_role}..."):
+                if remote:
+                    result = call_service("/v1/search", dict(payload, mode="fanout"))
+                    report, index = result["response"], result["index"]
+                    response = to_agent_response(report["answer"], report["source"]) if report else None
                 else:
-                    validated_sources.append(s)
-            
-            response_obj = AgentResponse(answer=answer, source=validated_sources)
-            
-            # SAVE TO SESSION STATE
-            st.session_state.agent_result = response_obj
-            return "Results submitted successfully."
-        except Exception as e:
-            return f"Error saving results: {str(e)}"
-
-# Instantiate the tool
-submit_tool = SubmitJobReportTool()
+                    # One concurrent search wave + one structured-output LLM call
+                    response = run_fanout_search(
+                        target_role, location, additional_filters,
+                        config={"callbacks": [instrumentation]},
+                    )
+        else:
+            st.session_state.live_run = {
+                "jobs": {}, "searches": 0, "role": target_role, "location": location,
+                "instrumentation": instrumentation,
+            }
+            if remote:
+                events = iter_service_events(stream_service("/v1/search", dict(payload, mode="agent")))
+            else:
+                query_str = build_user_query(target_role, location, additional_filters)
+                # LLM, tools, prompt and executor are built once per process (see core/resources.py)
+                events = iter_agent_events(get_agent_executor(), {
+                    "resume_data": RESUME_CONTEXT,
+                    "role": target_role,
+                    "location": location,
+                    "user_query": query_str
+                }, {"callbacks": [instrumentation]})
+            final = stream_agent_run(events)
+            response, index = (final.response, final.index) if final is not None else (None, None)
+            snippets = {url: job["snippet"] for url, job in st.session_state.live_run["jobs"].items()}
+            st.session_state.live_run = None
+    update = (IndexUpdate(**index) if index else None) if remote else index_postings(response, target_role, location)
+    return response, snippets, update
+
 
-# ---  Main Logic ---
 if search_button:
-    with st.spinner(f"Searching active listings for {target_role}..."):
-        try:
-            search_tool=TavilySearchResults(max_results=5)
-            tools=[search_tool, submit_tool]
-            llm = ChatGroq(
-                api_key=os.getenv("GROQ_API_KEY"),
-                model="llama-3.3-70b-versatile",
-                temperature=0.1,
-            )
+    # Also starts the Prometheus text endpoint (GET /metrics) aggregated over every run in this process
+    instrumentation = start_run_instrumentation(search_mode, role=target_role, location=location)
+    run_error = None
+    st.session_state.agent_result = None
+    st.session_state.index_update = None
+    st.session_state.snippets = {}
+    try:
+        flight = get_single_flight()
+        request_key = fingerprint(search_mode, target_role, location, additional_filters, skip_known)
+        waiting = st.empty()
+        if flight.in_flight(request_key):
+            waiting.info("🤝 The same search is already running in another session; sharing its results...")
+        (response, snippets, update), _ = flight.do(request_key, run_search)
+        waiting.empty()
+        st.session_state.agent_result = response
+        st.session_state.snippets = snippets
+        st.session_state.index_update = update
+        if st.session_state.agent_result is None:
+            st.warning("⚠️ The agent finished without submitting a job report.")
+
+    except Exception as e:
+        st.session_state.live_run = None
+        run_error = e
+        st.error(f"❌ An error occurred: {str(e)}")
+    record_run(instrumentation, run_error)
 
-            prompt = ChatPromptTemplate.from_messages([
-            ("system", """
-                You are a junior-tech job search assistant.
-
-                TASK:
-                - Find 5 junior (0–2 years) job listings matching the user's role and location.
-                - Prefer "Junior", "Entry Level", or "Associate" titles.
-
-                RULES:
-                - Exclude Senior, Lead, or 3+ years roles.
-                - Once 5 jobs are found, submit the report immediately.
-            """),
-                ("human", "{user_query}"),
-                ("placeholder", "{agent_scratchpad}"),
-            ])
-
-            agent =create_tool_calling_agent(llm, tools, prompt)
-            agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True,    max_iterations=5)
-
-            query_str = (
-              f"Find active job postings for '{target_role}' in '{location}'. "
-              f"Focus on 'Junior', 'Entry Level', or 'Associate' roles. "
-              f"Search for '0-2 years experience' or 'max 2 years experience'. "
-              f"Exclude roles requiring 'Senior', 'Lead', or '5+ years'. "
-              f"{additional_filters}"
-            )
-            # response= agent_executor.invoke({
-            #     "resume_data": RESUME_CONTEXT,
-            #     "role": target_role,
-            #     "location": location,
-            #     "user_query": query_str
-            # })
-            
-            agent_executor.invoke({
-                "resume_data": RESUME_CONTEXT,
-                "role": target_role,
-                "location": location,
-                "user_query": query_str
-            })
-
-            # st.success("✅ Search Complete!")
-            # st.markdown("### Here are the job postings I found for you:")
-            # st.markdown(response['output'])
-
-        except Exception as e:
-            st.error(f"❌ An error occurred: {str(e)}")
-            
 if st.session_state.agent_result:
     result = st.session_state.agent_result
     
@@ -183,15 +290,40 @@ if st.session_state.agent_result:
     # Render the jobs as specific UI elements (Cards/Expanders)
     st.markdown("### 🔗 Found Opportunities")
     
-    # Now we can iterate programmatically!
-    for idx, src in enumerate(result.source):
-        with st.expander(f"Job {idx+1}: {src.title or 'View Job'}"):
-            st.write(f"**Source URL:** {src.url}")
-            st.link_button("Apply Now 🚀", src.url)
+    update = st.session_state.index_update
+    sources = result.source
+    if update is not None:
+        st.caption(f"🆕 {len(update.new)} new / {len(update.known)} already seen in earlier runs")
+        if st.toggle("Only new since last run", value=False):
+            sources = [src for src in sources if src.url in update.new_urls]
+            if not sources:
+                st.info("No new postings since the last run.")
+
+    # Ranked by resume match (TF-IDF, no LLM call); only the visible page is rendered
+    render_run_results(sources, update.new_urls if update is not None else (), st.session_state.snippets)
 
 else:
     st.info("👈 Select a role in the sidebar and click **Find Opportunities** to start.")
 
+# --- Job Index Browser ---
+# A thin client has no index of its own: the service keeps it
+if not service_enabled() and get_job_index().stats()["jobs"] and st.toggle("🗂️ Browse all indexed postings", value=False):
+    render_index_browser(get_job_index())
+
+# --- Last Run Breakdown ---
+if st.session_state.last_run:
+    summary = st.session_state.last_run["summary"]
+    with st.expander("📊 Last run breakdown"):
+        cols = st.columns(5)
+        cols[0].metric("Total", f"{summary['total_s']:.2f}s")
+        cols[1].metric("LLM", f"{summary['llm_s']:.2f}s", f"{summary['llm_calls']} calls", delta_color="off")
+        cols[2].metric("Tools", f"{summary['tool_s']:.2f}s", f"{summary['tool_calls']} calls", delta_color="off")
+        cols[3].metric("Tokens", f"{summary['prompt_tokens']} / {summary['completion_tokens']}", "prompt / completion", delta_color="off")
+        cols[4].metric("Iterations", summary["iterations"], f"{summary['parse_retries']} parse retries", delta_color="off")
+        if summary["mean_ttft_s"] is not None:
+            st.caption(f"Mean time to first token: {summary['mean_ttft_s'] * 1000:.0f} ms")
+        st.dataframe(st.session_state.last_run["steps"], use_container_width=True)
+
 # tavily = TavilyClient()
 
 # @tool
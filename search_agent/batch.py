@@ -0,0 +1,146 @@
+"""
+Headless batch runner for the job search agent.
+
+Reads a JSONL file of {"target_role", "location", "additional_filters"} records,
+runs them concurrently through the agent (or the fan-out pipeline) and appends
+one JSON line per record to the output file as soon as it completes.
+
+Usage (from the search_agent directory):
+    uv run python batch.py queries.jsonl results.jsonl --concurrency 4 --groq-rpm 30 --tavily-rpm 60
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from constants.data import RESUME_CONTEXT  # noqa: E402
+from constants.prompts import build_user_query  # noqa: E402
+from core.fanout import arun_fanout_search  # noqa: E402
+from core.job_index import IndexUpdate, get_job_index, skipping_known_postings  # noqa: E402
+from core.match_scoring import rank_sources  # noqa: E402
+from rate_limit import configure_limits, limiter_stats  # noqa: E402
+from core.resources import DEFAULT_MODEL, DEFAULT_TEMPERATURE, get_agent_executor  # noqa: E402
+from single_flight import fingerprint, get_single_flight  # noqa: E402
+from models.schema import AgentResponse  # noqa: E402
+from tools.submit_report import extract_agent_response  # noqa: E402
+
+
+def load_queries(path: str) -> List[Dict]:
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if not record.get("target_role") or not record.get("location"):
+                raise ValueError(f"{path}:{line_no}: 'target_role' and 'location' are required")
+            record.setdefault("additional_filters", "")
+            queries.append(record)
+    return queries
+
+
+async def run_one(record: Dict, args) -> Optional[AgentResponse]:
+    if args.mode == "fanout":
+        return await arun_fanout_search(
+            record["target_role"],
+            record["location"],
+            record["additional_filters"],
+            model=args.model,
+            temperature=args.temperature,
+        )
+    executor = get_agent_executor(args.model, args.temperature)
+    result = await executor.ainvoke(
+        {
+            "resume_data": RESUME_CONTEXT,
+            "role": record["target_role"],
+            "location": record["location"],
+            "user_query": build_user_query(
+                record["target_role"], record["location"], record["additional_filters"]
+            ),
+        }
+    )
+    return extract_agent_response(result)
+
+
+async def run_and_index(record: Dict, args) -> Tuple[Optional[AgentResponse], Optional[IndexUpdate]]:
+    """run_one() and the job index update for its postings, so coalesced records share one new/known split."""
+    response = await run_one(record, args)
+    if response is None:
+        return None, None
+    return response, get_job_index().add_sources(response.source, record["target_role"], record["location"])
+
+
+async def run_batch(args) -> None:
+    queries = load_queries(args.input)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    # Every Groq and Tavily request goes through the shared limiters in ../shared/rate_limit.py
+    configure_limits(groq=args.groq_rpm, tavily=args.tavily_rpm)
+
+    async def guarded(record: Dict) -> Dict:
+        async with semaphore:
+            started = time.perf_counter()
+            output = dict(record)
+            try:
+                key = fingerprint(
+                    args.mode, record["target_role"], record["location"], record["additional_filters"],
+                    args.model, args.temperature, args.skip_known,
+                )
+                with skipping_known_postings(args.skip_known):
+                    # Duplicate records that are in flight together share one run
+                    (response, update), output["shared"] = await get_single_flight().ado(
+                        key, lambda: run_and_index(record, args)
+                    )
+                output["status"] = "ok" if response is not None else "no_report"
+                output["response"] = response.dict() if response is not None else None
+                if response is not None:
+                    output["new_sources"] = update.new
+                    output["known_sources"] = len(update.known)
+                    output["matches"] = [
+                        {"url": src.url, "score": round(match.score, 3), "terms": match.terms}
+                        for src, match in rank_sources(response.source)
+                    ]
+            except Exception as e:
+                output["status"] = "error"
+                output["error"] = str(e)
+            output["elapsed_s"] = round(time.perf_counter() - started, 3)
+            return output
+
+    done = failed = 0
+    with open(args.output, "a", encoding="utf-8") as out:
+        for finished in asyncio.as_completed([guarded(q) for q in queries]):
+            output = await finished
+            out.write(json.dumps(output, ensure_ascii=False) + "\n")
+            out.flush()
+            done += 1
+            failed += output["status"] != "ok"
+            new = f" ({len(output['new_sources'])} new)" if "new_sources" in output else ""
+            print(f"[{done}/{len(queries)}] {output['status']:<9} {output['target_role']} @ {output['location']}{new}")
+
+    print(f"Finished {done} queries ({failed} failed or without a report) -> {args.output}")
+    for name, stats in limiter_stats().items():
+        print(f"  {name}: {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the job search agent over a JSONL file of queries.")
+    parser.add_argument("input", help="JSONL file of {target_role, location, additional_filters}")
+    parser.add_argument("output", help="JSONL file to append results to")
+    parser.add_argument("--mode", choices=["agent", "fanout"], default="agent")
+    parser.add_argument("--concurrency", type=int, default=4, help="Max queries in flight")
+    parser.add_argument("--groq-rpm", type=float, default=30, help="Groq requests per minute (0 = unlimited)")
+    parser.add_argument("--tavily-rpm", type=float, default=60, help="Tavily requests per minute (0 = unlimited)")
+    parser.add_argument("--skip-known", action="store_true", help="Drop search results already in the job index")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--temperature", type=float, default=DEFAULT_TEMPERATURE)
+    asyncio.run(run_batch(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
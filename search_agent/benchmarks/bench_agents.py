@@ -0,0 +1,140 @@
+"""
+Offline latency/throughput benchmark for the job search agent.
+
+Starts the local mock Groq + Tavily server (../benchmarks/mock_servers.py),
+points the agent at it and reports p50/p95 latency, throughput and
+iterations and prompt tokens per answer for the iterative agent and the fan-out pipeline at
+several concurrency levels.
+
+Usage (from the search_agent directory):
+    uv run python -m benchmarks.bench_agents --requests 20 --concurrency 1 4 8
+    uv run python -m benchmarks.bench_agents --mode fanout --error-rate 0.05 --json bench.json
+    uv run python -m benchmarks.bench_agents --mode agent stream --tool-calls-per-turn 3
+
+"agent" drives the executor with ainvoke (as batch.py does), "stream" with
+the synchronous stream() the app and the service worker use, one thread per
+request.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+sys.path.insert(0, str(REPO_ROOT / "shared"))
+
+import harness  # noqa: E402
+
+# Search results must not be served from cache, otherwise we only measure the cache
+os.environ["SEARCH_CACHE_PATH"] = ""
+os.environ["SEARCH_CACHE_TTL_SECONDS"] = "0"
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+os.environ.setdefault("TAVILY_API_KEY", "benchmark-placeholder")
+
+
+async def run_benchmarks(args, base_url: str) -> dict:
+    os.environ["GROQ_API_BASE"] = base_url
+    from langchain_community.utilities import tavily_search
+
+    tavily_search.TAVILY_API_URL = base_url
+
+    from constants.data import RESUME_CONTEXT
+    from constants.prompts import build_user_query
+    from core.fanout import arun_fanout_search
+    from instrumentation import RunInstrumentation
+    from core.resources import get_agent_executor
+    from rate_limit import configure_limits
+    from tools.submit_report import extract_agent_response
+
+    if not args.rate_limited:
+        configure_limits(groq=0, groq_total=0, tavily=0)
+    # The shared executor prints every step with verbose=True; that is console noise here
+    get_agent_executor().verbose = False
+
+    roles = ["Full Stack Engineer", "GenAI Application Developer", "QA Automation Specialist"]
+
+    async def agent_request(i: int) -> dict:
+        role = roles[i % len(roles)]
+        instrumentation = RunInstrumentation("agent")
+        result = await get_agent_executor().ainvoke(
+            {
+                "resume_data": RESUME_CONTEXT,
+                "role": role,
+                "location": "Remote",
+                "user_query": build_user_query(role, "Remote", f"run {i}"),
+            },
+            {"callbacks": [instrumentation]},
+        )
+        if extract_agent_response(result) is None:
+            raise RuntimeError("agent finished without a report")
+        return {
+            "iterations": len(result["intermediate_steps"]),
+            "prompt_tokens": instrumentation.summary()["prompt_tokens"],
+        }
+
+    def stream_request(i: int) -> dict:
+        role = roles[i % len(roles)]
+        instrumentation = RunInstrumentation("stream")
+        steps = 0
+        response = None
+        for chunk in get_agent_executor().stream(
+            {
+                "resume_data": RESUME_CONTEXT,
+                "role": role,
+                "location": "Remote",
+                "user_query": build_user_query(role, "Remote", f"run {i}"),
+            },
+            {"callbacks": [instrumentation]},
+        ):
+            steps += len(chunk.get("steps", []))
+            if "output" in chunk:
+                response = extract_agent_response(chunk)
+        if response is None:
+            raise RuntimeError("agent finished without a report")
+        return {"iterations": steps, "prompt_tokens": instrumentation.summary()["prompt_tokens"]}
+
+    async def fanout_request(i: int) -> dict:
+        await arun_fanout_search(roles[i % len(roles)], "Remote", f"run {i}")
+        return {"iterations": 1}
+
+    async def threaded_stream_request(i: int) -> dict:
+        return await asyncio.to_thread(stream_request, i)
+
+    modes = {"agent": agent_request, "stream": threaded_stream_request, "fanout": fanout_request}
+    selected = list(modes) if "all" in args.mode else args.mode
+    results = {}
+    for mode in selected:
+        rows = []
+        for concurrency in args.concurrency:
+            row = await harness.run_concurrent(modes[mode], args.requests, concurrency)
+            row = dict(label=mode, **row)
+            rows.append(row)
+        harness.print_table(f"search_agent / {mode}", rows)
+        results[mode] = rows
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the job search agent against local mocks.")
+    parser.add_argument("--mode", choices=["agent", "stream", "fanout", "all"], nargs="+", default=["all"])
+    parser.add_argument("--requests", type=int, default=20, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--rate-limited", action="store_true", help="Keep the client-side rate limits on")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    harness.add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = harness.launch_mock_server(args)
+    try:
+        results = asyncio.run(run_benchmarks(args, base_url))
+    finally:
+        server.terminate()
+    if args.json:
+        harness.write_json(args.json, {"app": "search_agent", "results": results})
+
+
+if __name__ == "__main__":
+    main()
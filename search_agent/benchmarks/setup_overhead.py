@@ -0,0 +1,65 @@
+"""
+Measure per-request setup overhead of the job search agent.
+
+Compares building ChatGroq, the search tools, the prompt and the AgentExecutor
+from scratch (what app.py used to do on every click) with fetching them from the
+memoized factories in core/resources.py. No network calls are made.
+
+Usage (from the search_agent directory):
+    uv run python -m benchmarks.setup_overhead --runs 200
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+os.environ.setdefault("TAVILY_API_KEY", "benchmark-placeholder")
+
+from core import resources  # noqa: E402
+
+
+def build_uncached():
+    # Bypass lru_cache through __wrapped__ to reproduce the old per-click construction
+    tools = [
+        resources.get_search_tool.__wrapped__(resources.DEFAULT_MAX_RESULTS),
+        resources.get_submit_tool.__wrapped__(),
+    ]
+    llm = resources.get_llm.__wrapped__(resources.DEFAULT_MODEL, resources.DEFAULT_TEMPERATURE)
+    prompt = resources.get_prompt.__wrapped__()
+    agent = resources.create_tool_calling_agent(llm, tools, prompt)
+    return resources.AgentExecutor(agent=agent, tools=tools, max_iterations=5)
+
+
+def build_cached():
+    return resources.get_agent_executor()
+
+
+def measure(fn, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<10} mean={statistics.mean(timings):8.3f} ms  p50={statistics.median(timings):8.3f} ms  p95={p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=100)
+    args = parser.parse_args()
+
+    build_cached()  # warm the registry once, as the first request of a process would
+    report("per-click", measure(build_uncached, args.runs))
+    report("cached", measure(build_cached, args.runs))
+
+
+if __name__ == "__main__":
+    main()
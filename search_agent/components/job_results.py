@@ -0,0 +1,128 @@
+"""
+Paginated job result views for app.py.
+
+Only the visible page is turned into Streamlit elements, so the cost of a
+rerun grows with the page size, not with the number of postings. The index
+browser also leaves filtering, sorting and paging to SQLite
+(JobIndex.page), so only one page of rows is ever read.
+"""
+
+import time
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+import streamlit as st
+
+from core.providers import rank_sources
+
+PAGE_SIZES = [10, 25, 50, 100]
+SORT_LABELS = {
+    "Newest first": "recent",
+    "Best resume match": "match",
+    "Recently seen again": "last_seen",
+    "Role": "role",
+    "Location": "location",
+    "Title": "title",
+}
+SEEN_WITHIN = {"Any time": None, "Last 24 hours": 86400, "Last 7 days": 7 * 86400, "Last 30 days": 30 * 86400}
+
+
+def _pager(total: int, key: str, signature: Optional[tuple] = None) -> tuple:
+    """Page size + page number controls; returns (offset, limit). Changing `signature` jumps back to page 1."""
+    if signature is not None and st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_page"] = 1
+    cols = st.columns([1, 1, 2])
+    page_size = cols[0].selectbox("Per page", PAGE_SIZES, key=f"{key}_page_size")
+    pages = max(1, -(-total // page_size))
+    # Keep the stored page valid when the result set or page size shrinks
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page = cols[1].number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    offset = (page - 1) * page_size
+    if total:
+        cols[2].caption(f"Showing {offset + 1}–{min(offset + page_size, total)} of {total}")
+    return offset, page_size
+
+
+def _match_caption(match) -> str:
+    terms = f" · {', '.join(match.terms)}" if match.terms else ""
+    return f"🎯 {match.percent}% resume match{terms}"
+
+
+def _job_card(number: int, title: str, url: str, new: bool = False, details: str = "") -> None:
+    badge = "🆕 " if new else ""
+    with st.expander(f"{badge}Job {number}: {title or 'View Job'}"):
+        st.write(f"**Source URL:** {url}")
+        if details:
+            st.caption(details)
+        st.link_button("Apply Now 🚀", url)
+
+
+def render_run_results(
+    sources: Sequence,
+    new_urls: Iterable[str] = (),
+    snippets: Optional[Mapping[str, str]] = None,
+    key: str = "run",
+) -> None:
+    """
+    This run's report, best resume match first, one page at a time (the report
+    is already in memory, so it is sliced rather than queried).
+    """
+    new_urls = set(new_urls)
+    ranked = rank_sources(sources, snippets)
+    offset, limit = _pager(len(ranked), key, signature=(len(ranked), tuple(sorted(new_urls))))
+    for idx, (src, match) in enumerate(ranked[offset:offset + limit], start=offset + 1):
+        _job_card(idx, src.title, src.url, new=src.url in new_urls, details=_match_caption(match))
+
+
+def _age(timestamp: float) -> str:
+    seconds = time.time() - timestamp
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min ago"
+    if seconds < 86400:
+        return f"{seconds / 3600:.0f} h ago"
+    return f"{seconds / 86400:.0f} days ago"
+
+
+def render_index_browser(index, key: str = "index") -> None:
+    """
+    Every indexed posting with role/location/text/recency filters; sorting and
+    paging run in SQL, except "Best resume match", which scores every filtered
+    title in one NumPy pass and slices the page from the ranking.
+    """
+    cols = st.columns(4)
+    text = cols[0].text_input("Search titles", key=f"{key}_text")
+    role = cols[1].selectbox("Role", ["All"] + index.distinct("role"), key=f"{key}_role")
+    location = cols[2].selectbox("Location", ["All"] + index.distinct("location"), key=f"{key}_location")
+    sort_label = cols[3].selectbox("Sort by", list(SORT_LABELS), key=f"{key}_sort")
+    seen_within = st.radio("First seen", list(SEEN_WITHIN), horizontal=True, key=f"{key}_seen")
+
+    filters: Dict = {
+        "role": None if role == "All" else role,
+        "location": None if location == "All" else location,
+        "text": text,
+        "since": time.time() - SEEN_WITHIN[seen_within] if SEEN_WITHIN[seen_within] else None,
+    }
+    total = index.count(**filters)
+    signature = (text, role, location, sort_label, seen_within)
+    offset, limit = _pager(total, key, signature=signature)
+    sort = SORT_LABELS[sort_label]
+    matches: Dict[str, object] = {}
+    if not total:
+        rows: List[Dict] = []
+    elif sort == "match":
+        ranked = rank_sources(index.page("recent", 0, total, **filters))[offset:offset + limit]
+        rows = [row for row, _ in ranked]
+        matches = {row["url"]: match for row, match in ranked}
+    else:
+        rows = index.page(sort, offset, limit, **filters)
+    if not rows:
+        st.info("No indexed postings match these filters.")
+    for idx, row in enumerate(rows, start=offset + 1):
+        details = (
+            f"{row['role']} · {row['location']} · first seen {_age(row['first_seen'])}"
+            f" · seen {row['times_seen']}x"
+        )
+        if row["url"] in matches:
+            details += f" · {_match_caption(matches[row['url']])}"
+        _job_card(idx, row["title"], row["url"], details=details)
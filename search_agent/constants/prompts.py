@@ -0,0 +1,47 @@
+JOB_SEARCH_SYSTEM_PROMPT = """
+    You are a junior-tech job search assistant.
+
+    TASK:
+    - Find 5 junior (0–2 years) job listings matching the user's role and location.
+    - Prefer "Junior", "Entry Level", or "Associate" titles.
+
+    RULES:
+    - Exclude Senior, Lead, or 3+ years roles.
+    - Once 5 jobs are found, submit the report immediately.
+"""
+
+
+def build_user_query(target_role: str, location: str, additional_filters: str = "") -> str:
+    return (
+        f"Find active job postings for '{target_role}' in '{location}'. "
+        f"Focus on 'Junior', 'Entry Level', or 'Associate' roles. "
+        f"Search for '0-2 years experience' or 'max 2 years experience'. "
+        f"Exclude roles requiring 'Senior', 'Lead', or '5+ years'. "
+        f"{additional_filters}"
+    )
+
+
+FANOUT_SYSTEM_PROMPT = """
+    You are a junior-tech job search assistant.
+
+    TASK:
+    - From the search results below, pick up to 5 junior (0–2 years) job listings
+      matching the user's role and location.
+    - Prefer "Junior", "Entry Level", or "Associate" titles.
+
+    RULES:
+    - Exclude Senior, Lead, or 3+ years roles.
+    - Only use URLs that appear in the search results.
+
+    SEARCH RESULTS:
+    {search_results}
+"""
+
+# Each variant targets one phrasing of the junior-role constraints in build_user_query
+QUERY_VARIANT_TEMPLATES = [
+    "Junior {role} jobs {location}",
+    "Entry Level {role} {location} 0-2 years experience",
+    "Associate {role} openings {location}",
+    "{role} {location} hiring max 2 years experience",
+    "{role} graduate program {location}",
+]
@@ -0,0 +1,123 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+
+from models.schema import AgentResponse
+from tools.submit_report import (
+    SUBMIT_SUCCESS_MESSAGE,
+    SUBMIT_TOOL_NAME,
+    extract_agent_response,
+    to_agent_response,
+)
+
+if TYPE_CHECKING:
+    # Only for the annotation: a thin client (iter_service_events) never loads the agent stack
+    from langchain.agents import AgentExecutor
+
+MAX_TITLE_CHARS = 90
+MAX_SNIPPET_CHARS = 1000
+
+
+@dataclass
+class AgentEvent:
+    """
+    One step of an agent run, in the order it happens:
+
+    tool_start  the agent called a tool (`tool`, `query`)
+    results     a search returned (`query`, `jobs` as {"url", "title", "snippet"} dicts)
+    tool_end    any other tool observation (`text`)
+    report      submit_job_report succeeded (`response`); the run ends here
+    finish      the agent stopped without a successful report (`text`, `response` may be None)
+
+    Runs on the agent service also carry the service's job index update
+    (`index`, the fields of an IndexUpdate) on their report / finish event.
+    """
+
+    kind: str
+    tool: str = ""
+    query: str = ""
+    jobs: List[Dict[str, str]] = field(default_factory=list)
+    text: str = ""
+    response: Optional[AgentResponse] = None
+    index: Optional[Dict[str, Any]] = None
+
+
+def search_hits(observation: Any) -> List[Dict[str, str]]:
+    """Search results as {"url", "title", "snippet"} postings (Tavily gives content, not always a title)."""
+    if not isinstance(observation, list):
+        return []
+    hits = []
+    for item in observation:
+        url = item.get("url") if isinstance(item, dict) else None
+        if not url:
+            continue
+        content = (item.get("content") or "").strip()
+        title = item.get("title") or content.split("\n")[0]
+        hits.append({"url": url, "title": title[:MAX_TITLE_CHARS] or url, "snippet": content[:MAX_SNIPPET_CHARS]})
+    return hits
+
+
+def _query(tool_input: Any) -> str:
+    if isinstance(tool_input, dict):
+        return str(tool_input.get("query", ""))
+    return str(tool_input)
+
+
+def iter_agent_events(
+    executor: "AgentExecutor",
+    inputs: Dict[str, Any],
+    config: Optional[RunnableConfig] = None,
+) -> Iterator[AgentEvent]:
+    """
+    Drive the executor step by step and translate its stream into AgentEvents.
+
+    The run is closed as soon as the report is submitted, which skips the
+    agent's closing LLM turn ("Report submitted."). A caller that stops
+    iterating early (e.g. the user has seen enough postings) closes the
+    executor stream too, so no further LLM or search calls are made.
+    """
+    stream = executor.stream(inputs, config)
+    try:
+        for chunk in stream:
+            for action in chunk.get("actions", []):
+                yield AgentEvent("tool_start", tool=action.tool, query=_query(action.tool_input))
+            for step in chunk.get("steps", []):
+                action, observation = step.action, step.observation
+                if action.tool == SUBMIT_TOOL_NAME and observation == SUBMIT_SUCCESS_MESSAGE:
+                    response = to_agent_response(
+                        action.tool_input.get("answer", ""), action.tool_input.get("source", [])
+                    )
+                    yield AgentEvent("report", tool=action.tool, response=response)
+                    return
+                hits = search_hits(observation)
+                if hits or isinstance(observation, list):
+                    yield AgentEvent("results", tool=action.tool, query=_query(action.tool_input), jobs=hits)
+                else:
+                    yield AgentEvent("tool_end", tool=action.tool, text=str(observation))
+            if "output" in chunk:
+                yield AgentEvent("finish", text=str(chunk["output"]), response=extract_agent_response(chunk))
+    finally:
+        stream.close()
+
+
+def iter_service_events(events: Iterable[Tuple[str, Dict[str, Any]]]) -> Iterator[AgentEvent]:
+    """
+    The AgentEvents of a run on the agent service, from its "search" stream
+    (service_client.stream_service in ../shared, see ../worker.py). The service's
+    result becomes the closing report (or finish) event.
+    """
+    for kind, data in events:
+        if kind == "tool_start":
+            yield AgentEvent("tool_start", tool=data["tool"], query=data["query"])
+        elif kind == "results":
+            yield AgentEvent("results", tool=data["tool"], query=data["query"], jobs=data["jobs"])
+        elif kind == "tool_end":
+            yield AgentEvent("tool_end", tool=data["tool"], text=data["text"])
+        elif kind == "result":
+            report = data.get("response")
+            if report is None:
+                yield AgentEvent("finish", index=data.get("index"))
+            else:
+                response = to_agent_response(report["answer"], report["source"])
+                yield AgentEvent("report", tool=SUBMIT_TOOL_NAME, response=response, index=data.get("index"))
@@ -0,0 +1,154 @@
+"""
+AgentExecutor that runs all tool calls of one agent step concurrently.
+
+Tool-calling models often ask for several searches in a single turn.
+AgentExecutor runs them one after another on the sync path (invoke /
+stream, which the app and the service worker use), and gathers them
+without any limit on the async path. Here both paths dispatch a step's
+tool calls with asyncio.gather, at most `max_concurrent_tools` at a time
+and each bounded by `tool_timeout_s`, so a step with three searches takes
+about as long as the slowest one. Observations keep the order of the
+calls, so the scratchpad is the same as with sequential execution.
+
+Sync tools run on a small thread pool, in a copy of the caller's context
+(ContextVars such as skipping_known_postings() still apply). A call that
+times out is answered with an observation saying so, and the agent can
+try again. Its thread is left to finish in the background.
+"""
+
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Union
+
+from langchain.agents import AgentExecutor
+from langchain_core.agents import AgentAction, AgentFinish, AgentStep
+from langchain_core.tools import BaseTool
+
+# --- Defaults (override through .env) ---
+DEFAULT_TOOL_CONCURRENCY = int(os.getenv("AGENT_TOOL_CONCURRENCY", "4"))
+# 0 disables the per-call timeout
+DEFAULT_TOOL_TIMEOUT_S = float(os.getenv("AGENT_TOOL_TIMEOUT_S", "30"))
+TOOL_THREADS = 16
+
+TIMEOUT_OBSERVATION = "{tool} did not answer within {seconds:g}s; try again or use a different query."
+
+
+class _PendingCall:
+    """Stands in for an AgentStep until the whole step's tool calls have been collected."""
+
+    def __init__(self, action: AgentAction):
+        self.action = action
+
+
+@lru_cache(maxsize=1)
+def _tool_threads() -> ThreadPoolExecutor:
+    # Not the event loop's default executor: asyncio.run() would wait for timed-out calls on shutdown
+    return ThreadPoolExecutor(max_workers=TOOL_THREADS, thread_name_prefix="agent-tool")
+
+
+class ConcurrentAgentExecutor(AgentExecutor):
+    max_concurrent_tools: int = DEFAULT_TOOL_CONCURRENCY
+    tool_timeout_s: Optional[float] = DEFAULT_TOOL_TIMEOUT_S or None
+
+    async def _gather_steps(
+        self, actions: List[AgentAction], perform: Callable[[AgentAction], Awaitable[AgentStep]]
+    ) -> List[AgentStep]:
+        slots = asyncio.Semaphore(max(1, self.max_concurrent_tools))
+
+        async def run(action: AgentAction) -> AgentStep:
+            async with slots:
+                try:
+                    return await asyncio.wait_for(perform(action), self.tool_timeout_s)
+                except asyncio.TimeoutError:
+                    observation = TIMEOUT_OBSERVATION.format(tool=action.tool, seconds=self.tool_timeout_s)
+                    return AgentStep(action=action, observation=observation)
+
+        # gather() returns results in call order, whatever order the calls finish in
+        return await asyncio.gather(*(run(action) for action in actions))
+
+    # --- sync path (invoke / stream) ---
+
+    def _perform_agent_action(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        agent_action: AgentAction,
+        run_manager=None,
+    ) -> AgentStep:
+        # Called by AgentExecutor._iter_next_step once per action; the calls are made in _iter_next_step below
+        return _PendingCall(agent_action)
+
+    def _iter_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps,
+        run_manager=None,
+    ) -> Iterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        pending: List[AgentAction] = []
+        for item in super()._iter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager):
+            if isinstance(item, _PendingCall):
+                pending.append(item.action)
+            else:
+                yield item
+        if not pending:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # Sync invoke from inside an event loop cannot start another one: fall back to one call at a time
+            for action in pending:
+                yield AgentExecutor._perform_agent_action(self, name_to_tool_map, color_mapping, action, run_manager)
+            return
+
+        async def perform(action: AgentAction) -> AgentStep:
+            call = contextvars.copy_context().run
+            return await asyncio.get_running_loop().run_in_executor(
+                _tool_threads(),
+                call,
+                AgentExecutor._perform_agent_action,
+                self, name_to_tool_map, color_mapping, action, run_manager,
+            )
+
+        # asyncio.run() copies this thread's context into the loop, and every call copies it onto its thread
+        yield from asyncio.run(self._gather_steps(pending, perform))
+
+    # --- async path (ainvoke / astream) ---
+
+    async def _aperform_agent_action(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        agent_action: AgentAction,
+        run_manager=None,
+    ) -> AgentStep:
+        return _PendingCall(agent_action)
+
+    async def _aiter_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps,
+        run_manager=None,
+    ) -> AsyncIterator[Union[AgentFinish, AgentAction, AgentStep]]:
+        pending: List[AgentAction] = []
+        async for item in super()._aiter_next_step(name_to_tool_map, color_mapping, inputs, intermediate_steps, run_manager):
+            if isinstance(item, _PendingCall):
+                pending.append(item.action)
+            else:
+                yield item
+        if not pending:
+            return
+
+        def perform(action: AgentAction) -> Awaitable[AgentStep]:
+            return AgentExecutor._aperform_agent_action(self, name_to_tool_map, color_mapping, action, run_manager)
+
+        for step in await self._gather_steps(pending, perform):
+            yield step
@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional
+from urllib.parse import urldefrag
+
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from constants.prompts import FANOUT_SYSTEM_PROMPT, QUERY_VARIANT_TEMPLATES, build_user_query
+from core.resources import (
+    DEFAULT_MAX_RESULTS,
+    DEFAULT_MODEL,
+    DEFAULT_TEMPERATURE,
+    get_llm,
+    get_search_tool,
+)
+from models.schema import AgentResponse
+
+DEFAULT_FANOUT_QUERIES = 4
+DEFAULT_FANOUT_CONCURRENCY = 4
+MAX_CONTENT_CHARS = 600
+
+
+def build_query_variants(
+    target_role: str,
+    location: str,
+    additional_filters: str = "",
+    limit: int = DEFAULT_FANOUT_QUERIES,
+) -> List[str]:
+    """Expand one search request into distinct Tavily queries."""
+    queries = []
+    for template in QUERY_VARIANT_TEMPLATES[:limit]:
+        query = template.format(role=target_role, location=location)
+        if additional_filters:
+            query = f"{query} {additional_filters}"
+        queries.append(query)
+    return queries
+
+
+def _url_key(url: str) -> str:
+    return urldefrag(url)[0].rstrip("/").lower()
+
+
+def _merge(batches: List) -> List[Dict]:
+    """Merge search batches; the first occurrence of a URL wins."""
+    merged, seen = [], set()
+    for batch in batches:
+        # The tool reports API failures as a string; skip those and keep the rest
+        if not isinstance(batch, list):
+            continue
+        for item in batch:
+            key = _url_key(item.get("url", ""))
+            if key and key not in seen:
+                seen.add(key)
+                merged.append(item)
+    return merged
+
+
+def fan_out_search(
+    queries: List[str],
+    max_results: int = DEFAULT_MAX_RESULTS,
+    concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    config: Optional[RunnableConfig] = None,
+) -> List[Dict]:
+    """Run every query on a bounded thread pool (used from the Streamlit script thread)."""
+    search_tool = get_search_tool(max_results)
+    # Each worker runs in a copy of the caller's context so run-scoped settings (e.g. skipping known postings) apply
+    contexts = [contextvars.copy_context() for _ in queries]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        batches = list(pool.map(
+            lambda ctx, q: ctx.run(search_tool.invoke, {"query": q}, config), contexts, queries
+        ))
+    return _merge(batches)
+
+
+async def afan_out_search(
+    queries: List[str],
+    max_results: int = DEFAULT_MAX_RESULTS,
+    concurrency: int = DEFAULT_FANOUT_CONCURRENCY,
+    config: Optional[RunnableConfig] = None,
+) -> List[Dict]:
+    """Async counterpart of fan_out_search for callers that already run an event loop."""
+    search_tool = get_search_tool(max_results)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def search(query: str):
+        async with semaphore:
+            return await search_tool.ainvoke({"query": query}, config)
+
+    return _merge(await asyncio.gather(*(search(q) for q in queries)))
+
+
+def format_search_results(results: List[Dict]) -> str:
+    lines = []
+    for idx, item in enumerate(results, start=1):
+        content = (item.get("content") or "")[:MAX_CONTENT_CHARS]
+        lines.append(f"[{idx}] {item.get('url')}\n{content}")
+    return "\n\n".join(lines) if lines else "No results found."
+
+
+@lru_cache(maxsize=None)
+def get_fanout_chain(model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE) -> Runnable:
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", FANOUT_SYSTEM_PROMPT),
+        ("human", "{user_query}"),
+    ])
+    return prompt | get_llm(model, temperature).with_structured_output(AgentResponse)
+
+
+def _chain_inputs(target_role: str, location: str, additional_filters: str, results: List[Dict]) -> Dict:
+    return {
+        "user_query": build_user_query(target_role, location, additional_filters),
+        "search_results": format_search_results(results),
+    }
+
+
+def run_fanout_search(
+    target_role: str,
+    location: str,
+    additional_filters: str = "",
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_results: int = DEFAULT_MAX_RESULTS,
+    num_queries: int = DEFAULT_FANOUT_QUERIES,
+    config: Optional[RunnableConfig] = None,
+) -> AgentResponse:
+    """One concurrent search wave followed by a single structured-output LLM call."""
+    queries = build_query_variants(target_role, location, additional_filters, num_queries)
+    results = fan_out_search(queries, max_results, config=config)
+    return get_fanout_chain(model, temperature).invoke(
+        _chain_inputs(target_role, location, additional_filters, results), config
+    )
+
+
+async def arun_fanout_search(
+    target_role: str,
+    location: str,
+    additional_filters: str = "",
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_results: int = DEFAULT_MAX_RESULTS,
+    num_queries: int = DEFAULT_FANOUT_QUERIES,
+    config: Optional[RunnableConfig] = None,
+) -> AgentResponse:
+    queries = build_query_variants(target_role, location, additional_filters, num_queries)
+    results = await afan_out_search(queries, max_results, config=config)
+    return await get_fanout_chain(model, temperature).ainvoke(
+        _chain_inputs(target_role, location, additional_filters, results), config
+    )
@@ -0,0 +1,435 @@
+import contextvars
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# --- Defaults (override through .env) ---
+DEFAULT_INDEX_PATH = os.getenv("JOB_INDEX_PATH", ".cache/job_index.sqlite")
+# Max differing SimHash bits for two titles to count as the same posting (0-3; bands below assume <= 3)
+DEFAULT_NEAR_DUPLICATE_BITS = int(os.getenv("JOB_INDEX_NEAR_DUPLICATE_BITS", "3"))
+
+# Only parameters that say how a visitor arrived; ids such as LinkedIn's currentJobId name the posting itself
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "ref", "refid", "src", "source", "trk", "trkinfo",
+    "trackingid", "originalsubdomain", "from",
+}
+# ORDER BY clauses accepted by JobIndex.page(); never interpolate user input here
+PAGE_SORTS = {
+    "recent": "first_seen DESC, id DESC",
+    "last_seen": "last_seen DESC, id DESC",
+    "role": "role, first_seen DESC",
+    "location": "location, first_seen DESC",
+    "title": "title COLLATE NOCASE, id",
+}
+# Job boards: their host says nothing about the employer, and their page titles carry a board suffix
+JOB_BOARDS = {
+    "linkedin", "indeed", "glassdoor", "monster", "ziprecruiter", "naukri", "wellfound", "angel",
+    "simplyhired", "dice", "careerbuilder", "builtin", "remoteok", "weworkremotely", "otta", "jobgether",
+}
+# Applicant tracking systems: the employer is the first path segment (jobs.lever.co/acme/...)
+ATS_HOSTS = ("lever.co", "greenhouse.io", "ashbyhq.com", "workable.com", "smartrecruiters.com", "recruitee.com")
+# Legal forms and filler words that do not tell employers apart
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "limited", "corp", "corporation", "co", "gmbh", "plc", "sa", "ag", "the"}
+_TOKEN = re.compile(r"[a-z0-9+#]+")
+_SIMHASH_BANDS = 4  # 4 x 16 bits: titles within 3 bits share at least one band exactly
+_TITLE_SEPARATOR = re.compile(r"\s+[|\-\u2013\u2014\u00b7]\s+")
+_HIRING = re.compile(r"^(?P<company>.+?)\s+(?:is\s+)?hiring\s+(?:an?\s+)?(?P<position>.+?)(?:\s+in\s+.+)?$", re.I)
+_AT_COMPANY = re.compile(r"^(?P<position>.+?)\s+at\s+(?P<company>.+)$", re.I)
+
+
+def canonicalize_url(url: str) -> str:
+    """Identity of a posting URL: lowercase host without www., no fragment, tracking params or trailing slash."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, urlencode(query), ""))
+
+
+def _host_label(host: str) -> str:
+    """Registrable name of a host: careers.acme.co.uk -> acme."""
+    labels = [label for label in host.split(".") if label]
+    while len(labels) > 1 and (len(labels[-1]) <= 3 or labels[-1] in ("co", "com")):
+        labels.pop()
+    return labels[-1] if labels else ""
+
+
+def normalize_company(name: str) -> str:
+    return " ".join(token for token in _TOKEN.findall(name.lower()) if token not in COMPANY_SUFFIXES)
+
+
+def parse_posting(title: str, url_key: str, location: str = "") -> Tuple[str, str]:
+    """
+    (position, company) of a posting, from its page title and canonical URL:
+    "Acme hiring Junior Python Developer in Remote | LinkedIn", "Junior Python
+    Developer - Acme - Remote | Indeed.com" and "Junior Python Developer at Acme"
+    all give ("Junior Python Developer", "acme"). Without a company in the title
+    an employer's own host (or its ATS path) names it; on a job board it stays "".
+    """
+    parts = urlsplit(url_key)
+    host = _host_label(parts.netloc)
+    segments = [s.strip() for s in _TITLE_SEPARATOR.split(title.strip()) if s.strip()]
+    # Board suffixes ("| LinkedIn", "- Indeed.com") and the location say nothing about the posting
+    location_key = normalize_company(location)
+    segments = [
+        s for s in segments
+        if _host_label(s.lower()) not in JOB_BOARDS and normalize_company(s) not in ("", location_key, "remote")
+    ] or segments[:1]
+    position, company = (segments[0] if segments else ""), ""
+    hiring = _HIRING.match(position)
+    at_company = _AT_COMPANY.match(position)
+    if hiring:
+        position, company = hiring.group("position"), hiring.group("company")
+    elif at_company:
+        position, company = at_company.group("position"), at_company.group("company")
+    elif len(segments) > 1:
+        company = segments[1]
+    if not company and host not in JOB_BOARDS:
+        ats = next((suffix for suffix in ATS_HOSTS if parts.netloc.endswith(suffix)), None)
+        company = parts.path.strip("/").split("/")[0] if ats else host
+    return position, normalize_company(company)
+
+
+def same_company(a: str, b: str) -> bool:
+    """Whether two normalized company names name the same employer ("acme" / "acme labs")."""
+    if not a or not b:
+        return False
+    tokens_a, tokens_b = set(a.split()), set(b.split())
+    return tokens_a <= tokens_b or tokens_b <= tokens_a
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word unigrams and bigrams."""
+    tokens = _TOKEN.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    weights = [0] * 64
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def _signed(value: int) -> int:
+    # SQLite INTEGER is signed 64-bit
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _bands(value: int) -> List[int]:
+    return [(value >> (16 * i)) & 0xFFFF for i in range(_SIMHASH_BANDS)]
+
+
+@dataclass
+class IndexUpdate:
+    """Outcome of indexing one run's sources, split by whether each posting was already known."""
+
+    new: List[Dict] = field(default_factory=list)
+    known: List[Dict] = field(default_factory=list)
+    previous_run_at: Optional[float] = None
+
+    @property
+    def new_urls(self) -> set:
+        return {item["url"] for item in self.new}
+
+
+class JobIndex:
+    """
+    Persistent index of every job posting the agent has reported.
+
+    Postings are keyed by canonical URL. A posting with a different URL, a
+    near-identical position (SimHash within `near_duplicate_bits`) and the same
+    company, for the same role and location, is the same job: reposted, or
+    listed on another site (LinkedIn and Indeed). Position and company come
+    from parse_posting(); when neither posting names its company, only the
+    same host counts, since a title alone ("Junior Python Developer") does not
+    tell two employers apart. Titles
+    are full-text searchable (FTS5, falling back to LIKE when SQLite lacks it),
+    and every indexed run is recorded so callers can ask for postings that
+    are new since the previous run of the same role/location.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH, near_duplicate_bits: int = DEFAULT_NEAR_DUPLICATE_BITS):
+        self.near_duplicate_bits = near_duplicate_bits
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY,"
+            " url_key TEXT NOT NULL UNIQUE,"
+            " url TEXT NOT NULL,"
+            " title TEXT NOT NULL,"
+            " role TEXT NOT NULL,"
+            " location TEXT NOT NULL,"
+            " host TEXT NOT NULL,"
+            " company TEXT NOT NULL,"
+            " simhash INTEGER NOT NULL,"
+            " band0 INTEGER, band1 INTEGER, band2 INTEGER, band3 INTEGER,"
+            " first_seen REAL NOT NULL,"
+            " last_seen REAL NOT NULL,"
+            " times_seen INTEGER NOT NULL DEFAULT 1);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_scope ON jobs(role, location, first_seen);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_first_seen ON jobs(first_seen);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs(location, first_seen);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_band0 ON jobs(band0);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_band1 ON jobs(band1);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_band2 ON jobs(band2);"
+            "CREATE INDEX IF NOT EXISTS idx_jobs_band3 ON jobs(band3);"
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " id INTEGER PRIMARY KEY,"
+            " role TEXT NOT NULL,"
+            " location TEXT NOT NULL,"
+            " started_at REAL NOT NULL,"
+            " new_count INTEGER NOT NULL,"
+            " known_count INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_runs_scope ON runs(role, location, started_at);"
+        )
+        try:
+            self._db.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5("
+                " title, role, location, content='jobs', content_rowid='id')"
+            )
+            self.full_text = True
+        except sqlite3.OperationalError:
+            self.full_text = False
+        self._db.commit()
+
+    # --- Lookups ---
+
+    def _find(
+        self, url_key: str, title_hash: int, company: str, role: str, location: str
+    ) -> Optional[sqlite3.Row]:
+        row = self._db.execute("SELECT * FROM jobs WHERE url_key = ?", (url_key,)).fetchone()
+        # Titles without any words would all hash to 0 and collide
+        if row is not None or self.near_duplicate_bits <= 0 or title_hash == 0:
+            return row
+        bands = _bands(title_hash)
+        candidates = self._db.execute(
+            "SELECT * FROM jobs WHERE role = ? AND location = ?"
+            " AND (band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?)",
+            (role, location, *bands),
+        ).fetchall()
+        host = urlsplit(url_key).netloc
+        for candidate in candidates:
+            if bin((candidate["simhash"] & 0xFFFFFFFFFFFFFFFF) ^ title_hash).count("1") > self.near_duplicate_bits:
+                continue
+            if company and candidate["company"]:
+                if same_company(company, candidate["company"]):
+                    return candidate
+            elif candidate["host"] == host:
+                return candidate
+        return None
+
+    def is_known_url(self, url: str) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM jobs WHERE url_key = ?", (canonicalize_url(url),)
+            ).fetchone() is not None
+
+    def last_run_at(self, role: str, location: str) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MAX(started_at) FROM runs WHERE role = ? AND location = ?", (role, location)
+            ).fetchone()
+        return row[0] if row else None
+
+    # --- Updates ---
+
+    def add_sources(self, sources: Iterable, role: str, location: str) -> IndexUpdate:
+        """
+        Index one run's Source objects (or {"url", "title"} dicts) and record the run.
+        Returns which postings were new and which were already known.
+        """
+        now = time.time()
+        update = IndexUpdate(previous_run_at=self.last_run_at(role, location))
+        with self._lock:
+            for source in sources:
+                url = source["url"] if isinstance(source, dict) else source.url
+                title = (source.get("title") if isinstance(source, dict) else source.title) or ""
+                url_key = canonicalize_url(url)
+                position, company = parse_posting(title, url_key, location)
+                title_hash = simhash(position)
+                item = {"url": url, "title": title}
+                row = self._find(url_key, title_hash, company, role, location)
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE jobs SET last_seen = ?, times_seen = times_seen + 1 WHERE id = ?",
+                        (now, row["id"]),
+                    )
+                    update.known.append(dict(item, first_seen=row["first_seen"]))
+                    continue
+                cursor = self._db.execute(
+                    "INSERT INTO jobs (url_key, url, title, role, location, host, company, simhash,"
+                    " band0, band1, band2, band3, first_seen, last_seen)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        url_key, url, title, role, location, urlsplit(url_key).netloc, company,
+                        _signed(title_hash), *_bands(title_hash), now, now,
+                    ),
+                )
+                if self.full_text:
+                    self._db.execute(
+                        "INSERT INTO jobs_fts (rowid, title, role, location) VALUES (?, ?, ?, ?)",
+                        (cursor.lastrowid, title, role, location),
+                    )
+                update.new.append(dict(item, first_seen=now))
+            self._db.execute(
+                "INSERT INTO runs (role, location, started_at, new_count, known_count) VALUES (?, ?, ?, ?, ?)",
+                (role, location, now, len(update.new), len(update.known)),
+            )
+            self._db.commit()
+        return update
+
+    def filter_unknown(self, results: List[Dict]) -> Tuple[List[Dict], int]:
+        """Drop search results whose URL is already indexed; returns (remaining, skipped count)."""
+        remaining = [item for item in results if not self.is_known_url(item.get("url", ""))]
+        return remaining, len(results) - len(remaining)
+
+    # --- Queries ---
+
+    def new_since_last_run(self, role: str, location: str) -> List[Dict]:
+        """Postings first seen by the most recent run of this role/location."""
+        with self._lock:
+            runs = self._db.execute(
+                "SELECT started_at FROM runs WHERE role = ? AND location = ? ORDER BY started_at DESC LIMIT 2",
+                (role, location),
+            ).fetchall()
+            if not runs:
+                return []
+            since = runs[1]["started_at"] if len(runs) > 1 else 0.0
+            rows = self._db.execute(
+                "SELECT url, title, first_seen FROM jobs WHERE role = ? AND location = ? AND first_seen > ?"
+                " ORDER BY first_seen DESC",
+                (role, location, since),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, text: str, limit: int = 20) -> List[Dict]:
+        """Full-text search over titles, roles and locations."""
+        with self._lock:
+            if self.full_text:
+                # Quote every term so user input cannot inject FTS5 query syntax
+                match = " ".join(f'"{term}"' for term in _TOKEN.findall(text.lower()))
+                if not match:
+                    return []
+                rows = self._db.execute(
+                    "SELECT jobs.url, jobs.title, jobs.role, jobs.location, jobs.first_seen FROM jobs_fts"
+                    " JOIN jobs ON jobs.id = jobs_fts.rowid WHERE jobs_fts MATCH ? ORDER BY rank LIMIT ?",
+                    (match, limit),
+                ).fetchall()
+            else:
+                rows = self._db.execute(
+                    "SELECT url, title, role, location, first_seen FROM jobs WHERE title LIKE ? LIMIT ?",
+                    (f"%{text}%", limit),
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _filters(
+        self,
+        role: Optional[str] = None,
+        location: Optional[str] = None,
+        text: str = "",
+        since: Optional[float] = None,
+    ) -> Tuple[str, List]:
+        where, params = [], []
+        if role:
+            where.append("role = ?")
+            params.append(role)
+        if location:
+            where.append("location = ?")
+            params.append(location)
+        if since is not None:
+            where.append("first_seen > ?")
+            params.append(since)
+        terms = _TOKEN.findall(text.lower())
+        if terms:
+            if self.full_text:
+                where.append("id IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)")
+                params.append(" ".join(f'"{term}"' for term in terms))
+            else:
+                where.append("title LIKE ?")
+                params.append(f"%{text}%")
+        return (f" WHERE {' AND '.join(where)}" if where else ""), params
+
+    def count(self, **filters) -> int:
+        """Number of postings matching the page() filters (role, location, text, since)."""
+        clause, params = self._filters(**filters)
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM jobs{clause}", params).fetchone()[0]
+
+    def page(self, sort: str = "recent", offset: int = 0, limit: int = 20, **filters) -> List[Dict]:
+        """
+        One page of indexed postings, filtered (role, location, text, since) and sorted in SQL.
+        Only `limit` rows are read, however many postings the index holds.
+        """
+        clause, params = self._filters(**filters)
+        order = PAGE_SORTS.get(sort, PAGE_SORTS["recent"])
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT url, title, role, location, first_seen, last_seen, times_seen FROM jobs{clause}"
+                f" ORDER BY {order} LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def distinct(self, column: str) -> List[str]:
+        """Values of role or location present in the index, for filter widgets."""
+        if column not in ("role", "location"):
+            raise ValueError(f"unsupported column: {column}")
+        with self._lock:
+            rows = self._db.execute(f"SELECT DISTINCT {column} FROM jobs ORDER BY {column}").fetchall()
+        return [row[0] for row in rows]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            jobs = self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            runs = self._db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        return {"jobs": jobs, "runs": runs}
+
+
+_default_index: Optional[JobIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_job_index() -> JobIndex:
+    """Process-wide job index shared by every session, the search tool and batch runs."""
+    global _default_index
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = JobIndex()
+        return _default_index
+
+
+# The search tool is shared by every session, so "skip known postings" is scoped to a run through a ContextVar
+_skip_known: contextvars.ContextVar[bool] = contextvars.ContextVar("skip_known_postings", default=False)
+
+
+@contextmanager
+def skipping_known_postings(enabled: bool = True) -> Iterator[None]:
+    """Within this block, search tools drop results whose URL is already in the job index."""
+    token = _skip_known.set(enabled)
+    try:
+        yield
+    finally:
+        _skip_known.reset(token)
+
+
+def should_skip_known() -> bool:
+    return _skip_known.get()
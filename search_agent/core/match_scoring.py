@@ -0,0 +1,96 @@
+"""
+Resume-to-posting match scores without an LLM call.
+
+The resume and every posting (title plus search snippet, when there is one)
+are turned into TF-IDF vectors over a shared vocabulary. Rows are
+L2-normalized, so one matrix-vector product gives the cosine similarity of
+every posting to the resume. Scoring a few hundred postings takes a few
+milliseconds.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from constants.data import RESUME_CONTEXT
+from context_compression import tokenize
+
+MAX_MATCHED_TERMS = 5
+
+# Words that carry no skill or role signal; seniority is handled by the search prompt and context compression
+STOP_WORDS = frozenset(
+    "a about across all an and are as at be by for from has have in into is it its of on or our "
+    "role strong that the their this to we will with within years yoe you your".split()
+)
+
+
+@dataclass
+class MatchScore:
+    """Cosine similarity to the resume (0-1) and the resume terms that contributed most."""
+
+    score: float
+    terms: List[str] = field(default_factory=list)
+
+    @property
+    def percent(self) -> int:
+        return round(self.score * 100)
+
+
+def _terms(text: str) -> List[str]:
+    return [token for token in tokenize(text) if token not in STOP_WORDS and len(token) > 1]
+
+
+def score_documents(documents: Sequence[str], resume: str = RESUME_CONTEXT) -> List[MatchScore]:
+    """Match scores of `documents` against `resume`, in input order."""
+    if not documents:
+        return []
+    rows = [_terms(document) for document in documents]
+    resume_terms = _terms(resume)
+    vocabulary: Dict[str, int] = {}
+    for tokens in [resume_terms, *rows]:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+    if not vocabulary:
+        return [MatchScore(0.0) for _ in documents]
+
+    # Row 0 is the resume, rows 1.. the documents
+    counts = np.zeros((len(rows) + 1, len(vocabulary)))
+    for i, tokens in enumerate([resume_terms, *rows]):
+        for token in tokens:
+            counts[i, vocabulary[token]] += 1
+    df = (counts[1:] > 0).sum(axis=0)
+    idf = np.log((1 + len(rows)) / (1 + df)) + 1
+    weights = np.where(counts > 0, 1 + np.log(np.maximum(counts, 1)), 0.0) * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    weights /= np.where(norms == 0, 1.0, norms)
+
+    resume_vector, matrix = weights[0], weights[1:]
+    contributions = matrix * resume_vector
+    scores = contributions.sum(axis=1)
+    top_terms = np.argsort(-contributions, axis=1)[:, :MAX_MATCHED_TERMS]
+    names = list(vocabulary)
+    return [
+        MatchScore(float(score), [names[j] for j in top if contributions[i, j] > 0])
+        for i, (score, top) in enumerate(zip(scores, top_terms))
+    ]
+
+
+def _get(source, name: str) -> str:
+    return (source.get(name) if isinstance(source, Mapping) else getattr(source, name, None)) or ""
+
+
+def rank_sources(
+    sources: Sequence,
+    snippets: Optional[Mapping[str, str]] = None,
+    resume: str = RESUME_CONTEXT,
+) -> List[Tuple[object, MatchScore]]:
+    """
+    Sources (Source models or {"url", "title"} dicts) paired with their
+    MatchScore, best match first; ties keep the agent's order. `snippets` maps
+    URLs to the search result text seen for them.
+    """
+    snippets = snippets or {}
+    documents = [f"{_get(src, 'title')}\n{snippets.get(_get(src, 'url'), '')}" for src in sources]
+    scored = list(zip(sources, score_documents(documents, resume)))
+    return sorted(scored, key=lambda pair: -pair[1].score)
@@ -0,0 +1,67 @@
+"""
+Lazy entry points to the LangChain / Groq / Tavily backends for app.py.
+
+The Streamlit script imports only this module at startup; langchain.agents,
+langchain_community (which drags in SQLAlchemy and aiohttp), langchain_groq and
+the instrumentation callbacks are imported the first time a search actually
+runs. Streamlit reruns and fresh pods render the sidebar without paying for them.
+"""
+
+import sys
+from typing import Any, Dict, Optional
+
+
+def get_agent_executor(*args, **kwargs):
+    from core.resources import get_agent_executor as factory
+
+    return factory(*args, **kwargs)
+
+
+def run_fanout_search(*args, **kwargs):
+    from core.fanout import run_fanout_search as run
+
+    return run(*args, **kwargs)
+
+
+def extract_agent_response(result: Dict[str, Any]):
+    from tools.submit_report import extract_agent_response as extract
+
+    return extract(result)
+
+
+def iter_agent_events(*args, **kwargs):
+    from core.agent_stream import iter_agent_events as iterate
+
+    return iterate(*args, **kwargs)
+
+
+def iter_service_events(*args, **kwargs):
+    from core.agent_stream import iter_service_events as iterate
+
+    return iterate(*args, **kwargs)
+
+
+def rank_sources(*args, **kwargs):
+    from core.match_scoring import rank_sources as rank
+
+    return rank(*args, **kwargs)
+
+
+def to_agent_response(answer: str, source):
+    from tools.submit_report import to_agent_response as build
+
+    return build(answer, source)
+
+
+def start_run_instrumentation(name: str, **attributes: Any):
+    """New RunInstrumentation handler; also makes sure the /metrics endpoint is up."""
+    from instrumentation import RunInstrumentation, start_metrics_server
+
+    start_metrics_server()
+    return RunInstrumentation(name, **attributes)
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    # Nothing has been rate limited until a backend has been loaded, so do not import it just to report that
+    rate_limit: Optional[Any] = sys.modules.get("rate_limit")
+    return rate_limit.limiter_stats() if rate_limit is not None else {}
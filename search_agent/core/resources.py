@@ -0,0 +1,67 @@
+import os
+from functools import lru_cache
+
+from langchain.agents import create_tool_calling_agent
+from langchain_core.prompts import ChatPromptTemplate
+
+from constants.prompts import JOB_SEARCH_SYSTEM_PROMPT
+from core.concurrent_executor import ConcurrentAgentExecutor
+from rate_limit import RateLimitedChatGroq
+from tools.cached_search import CachedTavilySearchResults
+from tools.submit_report import SubmitJobReportTool
+
+# --- Defaults ---
+DEFAULT_MODEL = "llama-3.3-70b-versatile"
+DEFAULT_TEMPERATURE = 0.1
+DEFAULT_MAX_RESULTS = 5
+DEFAULT_MAX_ITERATIONS = 5
+
+# Every factory below is memoized per process, so Streamlit reruns and
+# concurrent sessions share one HTTP client (and its connection pool) per
+# model and one compiled prompt instead of rebuilding them on every click.
+
+
+@lru_cache(maxsize=None)
+def get_llm(model: str = DEFAULT_MODEL, temperature: float = DEFAULT_TEMPERATURE) -> RateLimitedChatGroq:
+    return RateLimitedChatGroq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        model=model,
+        temperature=temperature,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_search_tool(max_results: int = DEFAULT_MAX_RESULTS) -> CachedTavilySearchResults:
+    return CachedTavilySearchResults(max_results=max_results)
+
+
+@lru_cache(maxsize=None)
+def get_submit_tool() -> SubmitJobReportTool:
+    return SubmitJobReportTool()
+
+
+@lru_cache(maxsize=None)
+def get_prompt() -> ChatPromptTemplate:
+    return ChatPromptTemplate.from_messages([
+        ("system", JOB_SEARCH_SYSTEM_PROMPT),
+        ("human", "{user_query}"),
+        ("placeholder", "{agent_scratchpad}"),
+    ])
+
+
+@lru_cache(maxsize=None)
+def get_agent_executor(
+    model: str = DEFAULT_MODEL,
+    temperature: float = DEFAULT_TEMPERATURE,
+    max_results: int = DEFAULT_MAX_RESULTS,
+) -> ConcurrentAgentExecutor:
+    tools = [get_search_tool(max_results), get_submit_tool()]
+    agent = create_tool_calling_agent(get_llm(model, temperature), tools, get_prompt())
+    # Several searches requested in one turn run side by side (core/concurrent_executor.py)
+    return ConcurrentAgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=True,
+        max_iterations=DEFAULT_MAX_ITERATIONS,
+        return_intermediate_steps=True,
+    )
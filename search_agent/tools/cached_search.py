@@ -0,0 +1,78 @@
+from typing import Dict, List, Optional, Union
+
+from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForToolRun,
+)
+from langchain_core.pydantic_v1 import Field
+
+from core.job_index import get_job_index, should_skip_known
+from context_compression import compress_results
+from rate_limit import get_limiter
+from search_cache import SearchCache, get_search_cache, make_cache_key
+
+
+class CachedTavilySearchResults(TavilySearchResults):
+    """
+    Drop-in replacement for TavilySearchResults that serves repeated queries
+    from the shared SearchCache instead of calling the Tavily API again. It
+    caches the raw Tavily response, as react_search_agent's tool does, so the
+    two agents can serve each other's searches.
+    Cache misses go through the shared Tavily rate limiter. Inside
+    skipping_known_postings() (core/job_index.py), postings that are already in
+    the job index are dropped so the LLM does not summarize them again. What
+    remains is compressed to its most relevant passages
+    (../shared/context_compression.py) before it is returned to the agent.
+    """
+
+    cache: SearchCache = Field(default_factory=get_search_cache, exclude=True)
+
+    def _run(
+        self,
+        query: str,
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ) -> Union[List[Dict], str]:
+        key = make_cache_key(query, self.max_results)
+        raw_results = self.cache.get(key)
+        if raw_results is None:
+            try:
+                raw_results = get_limiter("tavily").call(self.api_wrapper.raw_results, query, self.max_results)
+            except Exception as e:
+                return repr(e)
+            self.cache.set(key, raw_results)
+        return self._prepare(self.api_wrapper.clean_results(raw_results["results"]), query)
+
+    async def _arun(
+        self,
+        query: str,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> Union[List[Dict], str]:
+        key = make_cache_key(query, self.max_results)
+        raw_results = self.cache.get(key)
+        if raw_results is None:
+            try:
+                raw_results = await get_limiter("tavily").acall(
+                    self.api_wrapper.raw_results_async, query, self.max_results
+                )
+            except Exception as e:
+                return repr(e)
+            self.cache.set(key, raw_results)
+        return self._prepare(self.api_wrapper.clean_results(raw_results["results"]), query)
+
+    @classmethod
+    def _prepare(cls, results: List[Dict], query: str) -> Union[List[Dict], str]:
+        # The cache keeps the raw response; filtering and compression happen per call
+        results = cls._drop_known(results)
+        if isinstance(results, str):
+            return results
+        return compress_results(results, query)
+
+    @staticmethod
+    def _drop_known(results: List[Dict]) -> Union[List[Dict], str]:
+        if not should_skip_known():
+            return results
+        remaining, skipped = get_job_index().filter_unknown(results)
+        if skipped and not remaining:
+            return f"All {skipped} results are postings already reported in earlier runs; try a different query."
+        return remaining
@@ -0,0 +1,48 @@
+from typing import Any, Dict, List, Optional, Type
+
+from langchain_core.tools import BaseTool
+
+from models.schema import AgentResponse, Source
+
+SUBMIT_TOOL_NAME = "submit_job_report"
+SUBMIT_SUCCESS_MESSAGE = "Results submitted successfully."
+
+
+class SubmitJobReportTool(BaseTool):
+    name: str = SUBMIT_TOOL_NAME
+    description: str = "Submit the final job search results including the summary and list of sources."
+    args_schema: Type[AgentResponse] = AgentResponse
+
+    def _run(self, answer: str, source: List):
+        """
+        The method that runs when the agent calls the tool.
+        Validation only: the report itself is read back from the run's
+        intermediate steps, so one tool instance can be shared by every session.
+        """
+        try:
+            to_agent_response(answer, source)
+            return SUBMIT_SUCCESS_MESSAGE
+        except Exception as e:
+            return f"Error saving results: {str(e)}"
+
+
+def to_agent_response(answer: str, source: List) -> AgentResponse:
+    # 'source' usually comes in as a list of dictionaries.
+    # We convert them to Source objects for consistency if needed.
+    validated_sources = []
+    for s in source:
+        if isinstance(s, dict):
+            validated_sources.append(Source(**s))
+        else:
+            validated_sources.append(s)
+    return AgentResponse(answer=answer, source=validated_sources)
+
+
+def extract_agent_response(result: Dict[str, Any]) -> Optional[AgentResponse]:
+    """Return the last successfully submitted report from an AgentExecutor result."""
+    for action, observation in reversed(result.get("intermediate_steps", [])):
+        if action.tool == SUBMIT_TOOL_NAME and observation == SUBMIT_SUCCESS_MESSAGE:
+            return to_agent_response(
+                action.tool_input.get("answer", ""), action.tool_input.get("source", [])
+            )
+    return None
@@ -0,0 +1,96 @@
+"""
+Agent service worker for the job search agent.
+
+Started by ../agent_service (search pool) with this project's interpreter and
+working directory. It answers "search" requests over stdio and streams the
+agent's steps back as they happen (see ../agent_service/protocol.py).
+
+Payload: {"role", "location", "filters", "mode": "agent" | "fanout",
+          "skip_known", "model", "temperature"}
+Result:  {"response": AgentResponse dict or null, "snippets": {url: text},
+          "index": {"new", "known", "previous_run_at"} or null}
+
+Reported postings are added to this box's job index, so "skip_known" and
+"index" (a core/job_index.IndexUpdate) refer to every run the service has made.
+"""
+
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "agent_service"))
+
+from protocol import InvalidRequest, RequestContext, require, serve  # noqa: E402
+
+from constants.data import RESUME_CONTEXT  # noqa: E402
+from constants.prompts import build_user_query  # noqa: E402
+from core.agent_stream import iter_agent_events  # noqa: E402
+from core.fanout import run_fanout_search  # noqa: E402
+from core.job_index import get_job_index, skipping_known_postings  # noqa: E402
+from core.providers import start_run_instrumentation  # noqa: E402
+from core.resources import DEFAULT_MODEL, DEFAULT_TEMPERATURE, get_agent_executor  # noqa: E402
+
+MODES = ("agent", "fanout")
+
+
+def search(payload: dict, context: RequestContext) -> dict:
+    role, location = require(payload, "role", "location")
+    filters = payload.get("filters") or ""
+    mode = payload.get("mode", "agent")
+    if mode not in MODES:
+        raise InvalidRequest(f"mode must be one of {', '.join(MODES)}")
+    model = payload.get("model") or DEFAULT_MODEL
+    temperature = float(payload.get("temperature", DEFAULT_TEMPERATURE))
+
+    # Each worker serves its own /metrics (the pool hands it INSTRUMENTATION_METRICS_PORT)
+    instrumentation = start_run_instrumentation(mode, role=role, location=location)
+    config = {"callbacks": [instrumentation]}
+    run_error = None
+    try:
+        response, snippets = None, {}
+        with skipping_known_postings(bool(payload.get("skip_known"))):
+            if mode == "fanout":
+                response = run_fanout_search(
+                    role, location, filters, model=model, temperature=temperature, config=config
+                )
+            else:
+                inputs = {
+                    "resume_data": RESUME_CONTEXT,
+                    "role": role,
+                    "location": location,
+                    "user_query": build_user_query(role, location, filters),
+                }
+                events = iter_agent_events(get_agent_executor(model, temperature), inputs, config)
+                try:
+                    for event in events:
+                        # emit() raises Cancelled once the client has gone; closing the stream stops the agent
+                        if event.kind == "tool_start":
+                            context.emit("tool_start", {"tool": event.tool, "query": event.query})
+                        elif event.kind == "results":
+                            snippets.update((job["url"], job["snippet"]) for job in event.jobs)
+                            context.emit("results", {"tool": event.tool, "query": event.query, "jobs": event.jobs})
+                        elif event.kind == "tool_end":
+                            context.emit("tool_end", {"tool": event.tool, "text": event.text})
+                        else:
+                            response = event.response
+                finally:
+                    events.close()
+    except BaseException as e:
+        run_error = e
+        raise
+    finally:
+        instrumentation.finish(run_error)
+
+    if response is None:
+        return {"response": None, "snippets": snippets, "index": None}
+    update = get_job_index().add_sources(response.source, role, location)
+    return {"response": response.dict(), "snippets": snippets, "index": asdict(update)}
+
+
+if __name__ == "__main__":
+    # Build the executor before reporting ready, so the first request does not pay for it
+    get_agent_executor()
+    serve({"search": search})
@@ -0,0 +1,230 @@
+"""
+Local relevance ranking of search results before they reach the LLM.
+
+Each result's content is split into short passages, every passage is scored
+with BM25 against the search query plus the junior-role constraints of the
+job search prompt (preferred terms add to the score, excluded ones such as
+"senior" subtract), and only the best passages that fit a token budget are
+forwarded, grouped back under their result's URL. A result with no passage
+selected (aggregator pages, senior roles) is not dropped: it keeps its single
+best passage and is listed after the ranked ones, so the agent still sees
+every URL the search returned.
+
+Scoring is a handful of NumPy array operations over a passages x terms
+count matrix, so ranking 5-20 results costs well under a millisecond
+compared with the prompt tokens it saves on every following LLM call.
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# --- Defaults (override through .env) ---
+# Approximate tokens of result content forwarded per search; 0 disables compression
+DEFAULT_CONTEXT_TOKENS = int(os.getenv("SEARCH_CONTEXT_TOKENS", "600"))
+DEFAULT_CHUNK_WORDS = int(os.getenv("SEARCH_CONTEXT_CHUNK_WORDS", "30"))
+# Passages scoring below this fraction of the best passage are not forwarded even if the budget allows
+DEFAULT_MIN_RELATIVE_SCORE = float(os.getenv("SEARCH_CONTEXT_MIN_SCORE", "0.2"))
+
+# Mirrors the rules of the job search system prompt: prefer 0-2 year roles, exclude senior ones
+PREFER_TERMS = ("junior", "entry", "level", "associate", "graduate", "fresher", "intern", "0-2", "trainee")
+AVOID_TERMS = ("senior", "sr", "lead", "principal", "staff", "manager", "head", "director", "5+", "7+", "10+")
+PREFER_WEIGHT = 0.5
+AVOID_WEIGHT = 1.0
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+CHARS_PER_TOKEN = 4
+
+# Query words that match every job board page and say nothing about relevance
+STOP_WORDS = frozenset(
+    "a an and are as at by find for from in is job jobs latest new of on openings opening or "
+    "position positions posting postings role roles the to vacancies vacancy with".split()
+)
+
+# Words that turn the terms after them into excluded ones: "no senior", "exclude lead or staff roles"
+NEGATION_CUES = frozenset("no not non without exclude excluding except avoid".split())
+_NEGATION_JOINERS = frozenset(("or", "and", "nor", ","))
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[+\-][a-z0-9]*)*\+?")
+# Also a leading "-" (search engine exclusion, "-senior") and commas, which join negated terms
+_QUERY_TOKEN = re.compile(r"(?<![a-z0-9+])-(?=[a-z0-9])|[a-z0-9]+(?:[+\-][a-z0-9]*)*\+?|,")
+_SENTENCE = re.compile(r"(?<=[.!?\n])\s+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def chunk_text(text: str, chunk_words: int = DEFAULT_CHUNK_WORDS) -> List[str]:
+    """Split into passages of about `chunk_words` words, breaking on sentence ends where possible."""
+    chunks, current, size = [], [], 0
+    for sentence in _SENTENCE.split(text.strip()):
+        words = sentence.split()
+        if not words:
+            continue
+        if current and size + len(words) > chunk_words:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        # A single very long sentence is cut into word windows
+        while len(words) > chunk_words:
+            chunks.append(" ".join(words[:chunk_words]))
+            words = words[chunk_words:]
+        current.extend(words)
+        size += len(words)
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def bm25_scores(chunk_tokens: List[List[str]], query_weights: Dict[str, float]) -> np.ndarray:
+    """BM25 score of every chunk for a weighted bag of query terms (negative weights penalize)."""
+    terms = list(query_weights)
+    if not chunk_tokens or not terms:
+        return np.zeros(len(chunk_tokens))
+    column = {term: j for j, term in enumerate(terms)}
+    tf = np.zeros((len(chunk_tokens), len(terms)))
+    for i, tokens in enumerate(chunk_tokens):
+        for token in tokens:
+            j = column.get(token)
+            if j is not None:
+                tf[i, j] += 1
+    lengths = np.array([len(tokens) for tokens in chunk_tokens], dtype=float)
+    avg_length = lengths.mean() or 1.0
+    df = (tf > 0).sum(axis=0)
+    n = len(chunk_tokens)
+    idf = np.log1p((n - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length)
+    saturated = tf * (BM25_K1 + 1) / (tf + norm[:, None])
+    weights = np.array([query_weights[t] for t in terms])
+    return saturated @ (idf * weights)
+
+
+def negated_terms(query: str) -> set:
+    """
+    Terms the query excludes: "-senior", and the terms right after a negation
+    cue, with the ones joined to them by "or" / "and" / "," ("exclude senior
+    or lead roles" excludes senior and lead, not roles).
+    """
+    tokens = _QUERY_TOKEN.findall(query.lower())
+    negated = set()
+    i = 0
+    while i < len(tokens):
+        if tokens[i] == "-" and i + 1 < len(tokens):
+            negated.add(tokens[i + 1])
+            i += 2
+            continue
+        if tokens[i] not in NEGATION_CUES:
+            i += 1
+            continue
+        i += 1
+        while i < len(tokens):
+            while i < len(tokens) and (tokens[i] in STOP_WORDS or tokens[i] in _NEGATION_JOINERS):
+                i += 1
+            if i == len(tokens) or tokens[i] == "-" or tokens[i] in NEGATION_CUES:
+                break
+            negated.add(tokens[i])
+            i += 1
+            if i == len(tokens) or tokens[i] not in _NEGATION_JOINERS:
+                break
+    return negated
+
+
+def query_weights(query: str, prefer: Sequence[str] = PREFER_TERMS, avoid: Sequence[str] = AVOID_TERMS) -> Dict[str, float]:
+    negated = negated_terms(query)
+    weights: Dict[str, float] = {}
+    for token in tokenize(query):
+        if token in STOP_WORDS or token in NEGATION_CUES or token in negated:
+            continue
+        weights[token] = weights.get(token, 0.0) + 1.0
+    for token in prefer:
+        weights[token] = weights.get(token, 0.0) + PREFER_WEIGHT
+    for token in avoid:
+        # An avoided term the user explicitly searched for is not penalized
+        if token not in weights:
+            weights[token] = -AVOID_WEIGHT
+    # ...but one the user excluded ("-senior", "no senior roles") is, and so is any other excluded term
+    for token in negated:
+        weights[token] = -AVOID_WEIGHT
+    return weights
+
+
+def compress_results(
+    results: List[Dict],
+    query: str,
+    max_tokens: int = DEFAULT_CONTEXT_TOKENS,
+    chunk_words: int = DEFAULT_CHUNK_WORDS,
+    min_relative_score: float = DEFAULT_MIN_RELATIVE_SCORE,
+    prefer: Sequence[str] = PREFER_TERMS,
+    avoid: Sequence[str] = AVOID_TERMS,
+) -> List[Dict]:
+    """
+    Keep the highest-scoring passages of `results` ({"url", "content", ...} dicts)
+    within `max_tokens`; each result's content is replaced by its selected
+    passages in their original order. Results without a selected passage fall
+    back to their best one (or their original content when it has no text) and
+    follow the ranked results. Results keep their other keys.
+    """
+    if max_tokens <= 0 or not isinstance(results, list) or not results:
+        return results
+    owners, chunks = [], []
+    for index, item in enumerate(results):
+        for chunk in chunk_text(item.get("content") or "", chunk_words):
+            owners.append(index)
+            chunks.append(chunk)
+    if not chunks:
+        return results
+    scores = bm25_scores([tokenize(chunk) for chunk in chunks], query_weights(query, prefer, avoid))
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    # Non-positive passages share nothing with the query or are dominated by excluded terms
+    threshold = max(float(scores.max()) * min_relative_score, 0.0)
+    selected: Dict[int, List[int]] = {}
+    for position in np.argsort(-scores, kind="stable"):
+        if scores[position] <= threshold and selected:
+            break
+        cost = len(chunks[position])
+        if cost > budget and selected:
+            continue
+        selected.setdefault(owners[position], []).append(int(position))
+        budget -= cost
+        if budget <= 0:
+            break
+
+    ranked = sorted(selected, key=lambda index: -max(scores[p] for p in selected[index]))
+    compressed = []
+    for index in ranked:
+        item = dict(results[index])
+        item["content"] = _join(chunks, sorted(selected[index]))
+        compressed.append(item)
+
+    # Below the threshold or over the budget: keep the result with its best passage
+    best: Dict[int, int] = {}
+    for position, owner in enumerate(owners):
+        if owner not in selected and (owner not in best or scores[position] > scores[best[owner]]):
+            best[owner] = position
+    for index, item in enumerate(results):
+        if index in selected:
+            continue
+        item = dict(item)
+        if index in best:
+            item["content"] = chunks[best[index]]
+        compressed.append(item)
+    return compressed
+
+
+def _join(chunks: List[str], positions: List[int]) -> str:
+    """Adjacent passages are joined with a space, gaps are marked with an ellipsis."""
+    text = chunks[positions[0]]
+    for previous, position in zip(positions, positions[1:]):
+        text += (" " if position == previous + 1 else " … ") + chunks[position]
+    return text
+
+
+def content_tokens(results: Optional[List[Dict]]) -> int:
+    """Approximate prompt tokens of the results' content, for before/after comparisons."""
+    if not isinstance(results, list):
+        return 0
+    return sum(len(item.get("content") or "") for item in results) // CHARS_PER_TOKEN
@@ -0,0 +1,378 @@
+"""
+Per-run instrumentation for the agents (shared through ../shared on sys.path):
+OpenTelemetry-style spans for every LLM and tool call, a JSONL span export,
+and process-wide Prometheus metrics served on GET /metrics.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# --- Defaults (override through .env) ---
+DEFAULT_SPANS_PATH = os.getenv("INSTRUMENTATION_SPANS_PATH", ".cache/agent_spans.jsonl")
+DEFAULT_METRICS_PORT = int(os.getenv("INSTRUMENTATION_METRICS_PORT", "9464"))
+
+# AgentExecutor reports output-parsing failures as a call to this pseudo tool
+PARSE_ERROR_TOOL = "_Exception"
+
+
+class Span:
+    """One timed operation (LLM call, tool call or the whole run), shaped after an OpenTelemetry span."""
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"] = None, **attributes: Any):
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.attributes: Dict[str, Any] = attributes
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self.first_token_s: Optional[float] = None
+        self.duration_s: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def mark_first_token(self) -> None:
+        if self.first_token_s is None:
+            self.first_token_s = time.perf_counter() - self._started
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.duration_s = time.perf_counter() - self._started
+        if error is not None:
+            self.error = repr(error)
+
+    def to_otel(self, trace_id: str) -> Dict[str, Any]:
+        attributes = dict(self.attributes)
+        if self.first_token_s is not None:
+            attributes["llm.time_to_first_token_ms"] = round(self.first_token_s * 1000, 2)
+        start_ns = int(self.start * 1e9)
+        return {
+            "trace_id": trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": start_ns,
+            "end_time_unix_nano": start_ns + int((self.duration_s or 0.0) * 1e9),
+            "attributes": attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+def token_usage(response: LLMResult) -> Tuple[int, int]:
+    """(prompt_tokens, completion_tokens) from whichever place the provider reported them."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+    prompt = completion = 0
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            metadata = getattr(message, "usage_metadata", None)
+            if metadata:
+                prompt += metadata.get("input_tokens", 0)
+                completion += metadata.get("output_tokens", 0)
+                continue
+            response_metadata = getattr(message, "response_metadata", None) or {}
+            usage = (
+                (generation.generation_info or {}).get("token_usage")
+                or response_metadata.get("token_usage")
+                or response_metadata.get("usage")
+                or {}
+            )
+            prompt += usage.get("prompt_tokens", 0)
+            completion += usage.get("completion_tokens", 0)
+    return prompt, completion
+
+
+def _model_name(serialized: Optional[Dict[str, Any]], kwargs: Dict[str, Any]) -> str:
+    params = kwargs.get("invocation_params") or {}
+    model = params.get("model") or params.get("model_name")
+    if not model and serialized:
+        init_kwargs = serialized.get("kwargs") or {}
+        model = init_kwargs.get("model") or init_kwargs.get("model_name")
+    return model or "unknown"
+
+
+class RunInstrumentation(BaseCallbackHandler):
+    """
+    Callback handler that records one agent run: per-LLM-call latency, tokens
+    and time-to-first-token, per-tool-call latency, iterations and parsing retries.
+    Create one per run and pass it in the config: {"callbacks": [handler]}.
+
+    Iterations are agent steps, as AgentExecutor reports them (an action or the
+    finish; the parallel tool calls of one step count once). Loops that run the
+    model themselves report their steps with record_steps().
+    """
+
+    def __init__(self, name: str = "agent_run", **attributes: Any):
+        self.trace_id = uuid.uuid4().hex
+        self.root = Span(name, "INTERNAL", **attributes)
+        self.spans: List[Span] = []
+        self.agent_steps = 0
+        self._open: Dict[UUID, Span] = {}
+        self._step_llm_span: Optional[Span] = None
+        self._lock = threading.Lock()
+
+    # --- LLM calls ---
+    def _start_llm(self, serialized, run_id: UUID, kwargs: Dict[str, Any]) -> None:
+        span = Span("llm", "CLIENT", self.root, **{"llm.model": _model_name(serialized, kwargs)})
+        with self._lock:
+            self._open[run_id] = span
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start_llm(serialized, run_id, kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._start_llm(serialized, run_id, kwargs)
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._open.get(run_id)
+        if span is not None:
+            span.mark_first_token()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        span = self._close(run_id)
+        if span is not None:
+            prompt, completion = token_usage(response)
+            span.attributes["llm.prompt_tokens"] = prompt
+            span.attributes["llm.completion_tokens"] = completion
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._close(run_id, error)
+
+    # --- Tool calls ---
+    def on_tool_start(self, serialized, input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        span = Span(f"tool {name}", "INTERNAL", self.root, **{"tool.name": name})
+        with self._lock:
+            self._open[run_id] = span
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._close(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._close(run_id, error)
+
+    # --- Agent steps ---
+    def _agent_step(self) -> None:
+        with self._lock:
+            llm_spans = [s for s in self.spans if s.kind == "CLIENT"]
+            latest = llm_spans[-1] if llm_spans else None
+            # Every action of a step follows the same model output
+            if latest is None or latest is not self._step_llm_span:
+                self.agent_steps += 1
+                self._step_llm_span = latest
+
+    def on_agent_action(self, action: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._agent_step()
+
+    def on_agent_finish(self, finish: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._agent_step()
+
+    def record_steps(self, count: int = 1) -> None:
+        """Count steps of an agent loop that does not run under AgentExecutor."""
+        with self._lock:
+            self.agent_steps += count
+
+    def _close(self, run_id: UUID, error: Optional[BaseException] = None) -> Optional[Span]:
+        with self._lock:
+            span = self._open.pop(run_id, None)
+            if span is not None:
+                span.finish(error)
+                self.spans.append(span)
+        return span
+
+    # --- Results ---
+    def finish(self, error: Optional[BaseException] = None) -> "RunInstrumentation":
+        """Close the run span, update the process-wide metrics and append the spans to the JSONL export."""
+        summary = self.summary()
+        self.root.attributes.update({
+            "agent.iterations": summary["iterations"],
+            "agent.parse_retries": summary["parse_retries"],
+            "llm.prompt_tokens": summary["prompt_tokens"],
+            "llm.completion_tokens": summary["completion_tokens"],
+        })
+        self.root.finish(error)
+        get_metrics().record_run(self)
+        if DEFAULT_SPANS_PATH:
+            export_spans_jsonl(self, DEFAULT_SPANS_PATH)
+        return self
+
+    def llm_spans(self) -> List[Span]:
+        return [s for s in self.spans if s.kind == "CLIENT"]
+
+    def tool_spans(self) -> List[Span]:
+        return [s for s in self.spans if s.name.startswith("tool ")]
+
+    def summary(self) -> Dict[str, Any]:
+        llm_spans = self.llm_spans()
+        parse_errors = [s for s in self.tool_spans() if s.attributes["tool.name"] == PARSE_ERROR_TOOL]
+        tool_spans = [s for s in self.tool_spans() if s.attributes["tool.name"] != PARSE_ERROR_TOOL]
+        llm_s = sum(s.duration_s or 0.0 for s in llm_spans)
+        tool_s = sum(s.duration_s or 0.0 for s in tool_spans)
+        ttfts = [s.first_token_s for s in llm_spans if s.first_token_s is not None]
+        return {
+            "total_s": self.root.duration_s,
+            "iterations": self.agent_steps,
+            "parse_retries": len(parse_errors),
+            "llm_calls": len(llm_spans),
+            "llm_s": llm_s,
+            "tool_calls": len(tool_spans),
+            "tool_s": tool_s,
+            "prompt_tokens": sum(s.attributes.get("llm.prompt_tokens", 0) for s in llm_spans),
+            "completion_tokens": sum(s.attributes.get("llm.completion_tokens", 0) for s in llm_spans),
+            "mean_ttft_s": sum(ttfts) / len(ttfts) if ttfts else None,
+            "errors": sum(1 for s in self.spans if s.error),
+        }
+
+    def steps(self) -> List[Dict[str, Any]]:
+        """One row per LLM/tool call in start order, for tables."""
+        rows = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            rows.append({
+                "step": span.name,
+                "offset_ms": round((span.start - self.root.start) * 1000, 1),
+                "latency_ms": round((span.duration_s or 0.0) * 1000, 1),
+                "ttft_ms": round(span.first_token_s * 1000, 1) if span.first_token_s is not None else None,
+                "prompt_tokens": span.attributes.get("llm.prompt_tokens"),
+                "completion_tokens": span.attributes.get("llm.completion_tokens"),
+                "error": span.error,
+            })
+        return rows
+
+    def to_otel(self) -> List[Dict[str, Any]]:
+        return [self.root.to_otel(self.trace_id)] + [s.to_otel(self.trace_id) for s in self.spans]
+
+
+def export_spans_jsonl(run: RunInstrumentation, path: str) -> None:
+    """Append the run's spans, one OpenTelemetry-style JSON object per line."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for span in run.to_otel():
+            f.write(json.dumps(span, default=str) + "\n")
+
+
+class AgentMetrics:
+    """
+    Process-wide metrics over every finished run, rendered in the Prometheus text
+    format: counters (*_total) and summaries of durations (*_seconds_sum / _count).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        # (name, labels) -> [sum, count]
+        self._summaries: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], List[float]] = {}
+
+    def _inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def _observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        observed = self._summaries.setdefault(key, [0.0, 0])
+        observed[0] += value
+        observed[1] += 1
+
+    def record_run(self, run: RunInstrumentation) -> None:
+        summary = run.summary()
+        with self._lock:
+            self._inc("agent_runs_total", run=run.root.name)
+            self._observe("agent_run_seconds", summary["total_s"] or 0.0, run=run.root.name)
+            self._inc("agent_iterations_total", summary["iterations"], run=run.root.name)
+            self._inc("agent_parse_retries_total", summary["parse_retries"], run=run.root.name)
+            for span in run.llm_spans():
+                model = span.attributes["llm.model"]
+                self._inc("agent_llm_calls_total", model=model)
+                self._observe("agent_llm_seconds", span.duration_s or 0.0, model=model)
+                self._inc("agent_llm_tokens_total", span.attributes.get("llm.prompt_tokens", 0), model=model, type="prompt")
+                self._inc("agent_llm_tokens_total", span.attributes.get("llm.completion_tokens", 0), model=model, type="completion")
+                if span.first_token_s is not None:
+                    self._observe("agent_llm_ttft_seconds", span.first_token_s, model=model)
+                if span.error:
+                    self._inc("agent_llm_errors_total", model=model)
+            for span in run.tool_spans():
+                tool = span.attributes["tool.name"]
+                self._inc("agent_tool_calls_total", tool=tool)
+                self._observe("agent_tool_seconds", span.duration_s or 0.0, tool=tool)
+                if span.error:
+                    self._inc("agent_tool_errors_total", tool=tool)
+
+    def render(self) -> str:
+        with self._lock:
+            samples = [(name, "counter", labels, [("", value)]) for (name, labels), value in self._counters.items()]
+            samples += [
+                (name, "summary", labels, [("_sum", total), ("_count", count)])
+                for (name, labels), (total, count) in self._summaries.items()
+            ]
+        lines, typed = [], set()
+        # Sorted by family name, so each family's samples follow its TYPE line
+        for name, kind, labels, values in sorted(samples, key=lambda sample: (sample[0], sample[2])):
+            if name not in typed:
+                lines.append(f"# TYPE {name} {kind}")
+                typed.add(name)
+            label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+            for suffix, value in values:
+                lines.append(f"{name}{suffix}{{{label_str}}} {value:g}" if label_str else f"{name}{suffix} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics = AgentMetrics()
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+_unavailable_ports: set = set()
+
+
+def get_metrics() -> AgentMetrics:
+    return _metrics
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = _metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("content-type", "text/plain; version=0.0.4")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port: int = DEFAULT_METRICS_PORT, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Serve GET /metrics on a daemon thread (once per process); port 0 disables it."""
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            if port in _unavailable_ports:
+                return None
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                # Another process (e.g. a second Streamlit server) already owns the port; say so once
+                _unavailable_ports.add(port)
+                print(
+                    f"[instrumentation] metrics are not served: port {port} is unavailable ({e}); "
+                    "give this process its own INSTRUMENTATION_METRICS_PORT, or 0 to disable",
+                    file=sys.stderr,
+                )
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+        return _server
@@ -0,0 +1,454 @@
+"""
+Rate limiting, retries and circuit breaking for the Groq and Tavily calls of
+every project in this repo (shared through ../shared on sys.path).
+
+Each call waits for a token bucket: one per provider model ("groq:<model>")
+and, for models, one more for the whole provider ("groq"), since the account's
+budget is shared by its models. Retryable failures are retried with jittered
+exponential backoff, and a provider that keeps failing trips its circuit
+breaker until a single probe call gets through again.
+"""
+
+import asyncio
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_groq import ChatGroq
+
+# --- Defaults (override through .env) ---
+# Requests per minute, read from RATE_LIMIT_<KEY>_RPM when a limiter is created (after load_dotenv()):
+# "groq" is per model, "groq_total" is shared by all Groq models
+DEFAULT_RPM = {"groq": 30.0, "groq_total": 60.0, "tavily": 60.0}
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens are added per second up to `capacity`.
+    acquire() blocks the calling thread, aacquire() suspends the coroutine.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, requests_per_minute: float, burst: Optional[float] = None) -> "TokenBucket":
+        # Default burst: ten seconds' worth of budget, so short agent loops are not serialized
+        if burst is None:
+            burst = max(1.0, requests_per_minute / 6.0)
+        return cls(requests_per_minute / 60.0, burst)
+
+    def _reserve(self, tokens: float) -> float:
+        """Take `tokens` now (possibly going negative) and return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def wait_time(self, tokens: float = 1.0) -> float:
+        """How long acquire(tokens) would block right now, without taking anything."""
+        with self._lock:
+            available = min(self.capacity, self._tokens + (time.monotonic() - self._updated) * self.rate)
+            return max(0.0, tokens - available) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        wait = self._reserve(tokens)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, tokens: float = 1.0) -> float:
+        wait = self._reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive provider failures. After
+    `reset_timeout` it is half open: one probe call is let through and the
+    others are still rejected until the probe succeeds (closing the breaker)
+    or fails (opening it again). A probe that never reports back is replaced
+    after another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                return False
+            self._probe_started = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_started = None
+            if self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for attr in ("status_code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None)
+    if isinstance(value, int):
+        return value
+    # Some clients (Tavily's async one) raise a bare Exception("Error 429: Too Many Requests")
+    match = re.match(r"Error (\d{3})", str(exc))
+    return int(match.group(1)) if match else None
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, CircuitOpenError):
+        return False
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    name = type(exc).__name__
+    return any(word in name for word in ("Timeout", "Connection"))
+
+
+class ProviderLimiter:
+    """
+    Rate limit + retry + circuit breaker for one provider (or one provider model).
+    Every call waits for a token from each of its buckets, retries retryable
+    failures with jittered exponential backoff (honoring Retry-After), and trips
+    the breaker when a provider keeps failing.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        bucket: Optional[TokenBucket],
+        breaker: Optional[CircuitBreaker] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        provider_bucket: Optional[TokenBucket] = None,
+    ):
+        self.name = name
+        self.bucket = bucket
+        # Shared with the provider's other models
+        self.provider_bucket = provider_bucket
+        self.breaker = breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._stats_lock = threading.Lock()
+        self._stats = {"calls": 0, "throttled": 0, "retried": 0, "failed": 0, "rejected": 0}
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["breaker"] = self.breaker.state
+        return stats
+
+    def _reserve(self) -> float:
+        """Take a token from every bucket; returns how long to wait for the scarcest one."""
+        self._count("calls")
+        wait = max([b._reserve(1.0) for b in (self.bucket, self.provider_bucket) if b is not None] or [0.0])
+        if wait:
+            self._count("throttled")
+        return wait
+
+    def wait_time(self) -> float:
+        """How long the next call would wait for its scarcest bucket (0 when unlimited)."""
+        return max([b.wait_time() for b in (self.bucket, self.provider_bucket) if b is not None] or [0.0])
+
+    def _before_attempt(self) -> None:
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open), try again shortly")
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def _abefore_attempt(self) -> None:
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open), try again shortly")
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def _backoff(self, attempt: int, exc: BaseException) -> Optional[float]:
+        """Delay before the next attempt, or None if the error should propagate."""
+        retryable = is_retryable(exc)
+        if retryable:
+            # Only provider-side trouble (429/5xx/timeouts) counts against the breaker
+            self.breaker.record_failure()
+        else:
+            # The provider answered (a 400, say): it is up, and a half-open probe is over
+            self.breaker.record_success()
+        if not retryable or attempt >= self.max_retries:
+            self._count("failed")
+            return None
+        self._count("retried")
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        delay = random.uniform(delay / 2, delay)  # jitter so concurrent callers do not retry in lockstep
+        retry_after = _retry_after(exc)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    def call(self, fn: Callable, *args, **kwargs):
+        attempt = 0
+        while True:
+            self._before_attempt()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, fn: Callable, *args, **kwargs):
+        attempt = 0
+        while True:
+            await self._abefore_attempt()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def stream(self, factory: Callable[[], Iterator]) -> Iterator:
+        """Like call(), for generators; only failures before the first chunk are retried."""
+        attempt = 0
+        while True:
+            self._before_attempt()
+            iterator = factory()
+            try:
+                first = next(iterator)
+            except StopIteration:
+                self.breaker.record_success()
+                return
+            except Exception as e:
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            yield first
+            yield from iterator
+            return
+
+    async def astream(self, factory: Callable[[], AsyncIterator]) -> AsyncIterator:
+        attempt = 0
+        while True:
+            await self._abefore_attempt()
+            iterator = factory()
+            try:
+                first = await iterator.__anext__()
+            except StopAsyncIteration:
+                self.breaker.record_success()
+                return
+            except Exception as e:
+                delay = self._backoff(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            yield first
+            async for chunk in iterator:
+                yield chunk
+            return
+
+
+# --- Registry: one limiter per provider (and per model for LLMs) ---
+_limiters: Dict[str, ProviderLimiter] = {}
+_provider_buckets: Dict[str, Optional[TokenBucket]] = {}
+_configured_rpm: Dict[str, float] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_limits(**requests_per_minute: float) -> None:
+    """
+    Override the RPM per key (env and defaults), e.g. configure_limits(groq=20, tavily=100).
+    groq_total limits all Groq models together; 0 means unlimited.
+    """
+    with _limiters_lock:
+        _configured_rpm.update(requests_per_minute)
+        _limiters.clear()
+        _provider_buckets.clear()
+
+
+def _rpm(key: str) -> float:
+    if key in _configured_rpm:
+        return _configured_rpm[key]
+    return float(os.getenv(f"RATE_LIMIT_{key.upper()}_RPM", DEFAULT_RPM.get(key, 60.0)))
+
+
+def _bucket(rpm: float) -> Optional[TokenBucket]:
+    # rpm <= 0 means "unlimited": retries and the breaker still apply
+    return TokenBucket.per_minute(rpm) if rpm > 0 else None
+
+
+def get_limiter(provider: str, model: Optional[str] = None) -> ProviderLimiter:
+    key = f"{provider}:{model}" if model else provider
+    with _limiters_lock:
+        if key not in _limiters:
+            provider_bucket = None
+            if model:
+                if provider not in _provider_buckets:
+                    _provider_buckets[provider] = _bucket(_rpm(f"{provider}_total"))
+                provider_bucket = _provider_buckets[provider]
+            _limiters[key] = ProviderLimiter(
+                key,
+                _bucket(_rpm(provider)),
+                max_retries=int(os.getenv("RATE_LIMIT_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+                provider_bucket=provider_bucket,
+            )
+        return _limiters[key]
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {key: limiter.stats() for key, limiter in limiters.items()}
+
+
+class RateLimitedChatGroq(ChatGroq):
+    """
+    ChatGroq whose requests go through the shared per-model ProviderLimiter.
+    The Groq SDK's own retries are disabled so backoff is handled in one place.
+    """
+
+    max_retries: int = 0
+
+    def _limiter(self) -> ProviderLimiter:
+        return get_limiter("groq", self.model_name)
+
+    def _create_chat_result(self, response, *args, **kwargs) -> ChatResult:
+        # langchain-groq 0.1.x fakes streaming for tool calls and drops llm_output on
+        # the way; keep the token usage on each generation so callbacks still see it.
+        # (Later versions pass request params too, hence *args.)
+        result = super()._create_chat_result(response, *args, **kwargs)
+        usage = (result.llm_output or {}).get("token_usage")
+        if usage:
+            for generation in result.generations:
+                generation.generation_info = dict(generation.generation_info or {}, token_usage=usage)
+        return result
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return self._limiter().call(super()._generate, messages, stop, run_manager, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return await self._limiter().acall(super()._agenerate, messages, stop, run_manager, **kwargs)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        parent = super()._stream
+        yield from self._limiter().stream(lambda: parent(messages, stop, run_manager, **kwargs))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        parent = super()._astream
+        async for chunk in self._limiter().astream(lambda: parent(messages, stop, run_manager, **kwargs)):
+            yield chunk
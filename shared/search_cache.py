@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# --- Defaults (override through .env) ---
+# At the repo root rather than the working directory, so every project shares one store
+DEFAULT_CACHE_PATH = os.getenv(
+    "SEARCH_CACHE_PATH", str(Path(__file__).resolve().parents[1] / ".cache" / "tavily_search.sqlite")
+)
+DEFAULT_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600"))
+DEFAULT_MEMORY_ENTRIES = int(os.getenv("SEARCH_CACHE_MEMORY_ENTRIES", "256"))
+DEFAULT_DISK_ENTRIES = int(os.getenv("SEARCH_CACHE_DISK_ENTRIES", "5000"))
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share a key."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+# Every tool stores the raw Tavily response ({"results": [...], ...}) and cleans it
+# per call; bump this when the stored shape changes
+CACHE_FORMAT = "tavily-raw/1"
+
+# Search parameters that change the response, at the Tavily API wrapper's defaults
+SEARCH_PARAM_DEFAULTS: Dict[str, Any] = {
+    "search_depth": "advanced",
+    "include_domains": [],
+    "exclude_domains": [],
+    "include_answer": False,
+    "include_raw_content": False,
+    "include_images": False,
+}
+
+
+def make_cache_key(query: str, max_results: int, **search_params: Any) -> str:
+    """Key for one Tavily search; parameters left out (or None) are taken at their defaults."""
+    params = dict(SEARCH_PARAM_DEFAULTS)
+    params.update({name: value for name, value in search_params.items() if value is not None})
+    for name in ("include_domains", "exclude_domains"):
+        params[name] = sorted(domain.lower() for domain in params[name])
+    raw = json.dumps([CACHE_FORMAT, normalize_query(query), max_results, params], sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """
+    Two-level cache for search results: an in-memory LRU in front of a SQLite store.
+    Every entry carries its own expiry, and both levels are bounded by entry count.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_CACHE_PATH,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_disk_entries: int = DEFAULT_DISK_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._db = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_search_cache_created ON search_cache(created_at)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if row[1] > now:
+                        value = json.loads(row[0])
+                        self._remember(key, value, row[1])
+                        self._stats["disk_hits"] += 1
+                        return value
+                    self._db.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        now = time.time()
+        expires_at = now + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (key, value, created_at, expires_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, json.dumps(value), now, expires_at),
+                )
+                self._evict_disk(now)
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM search_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            stats["memory_entries"] = len(self._memory)
+            return stats
+
+    # --- Internal helpers (caller holds the lock) ---
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now: float) -> None:
+        self._db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,))
+        count = self._db.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                " SELECT key FROM search_cache ORDER BY created_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._stats["evictions"] += overflow
+
+
+_default_cache: Optional[SearchCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """Process-wide cache shared by every session and tool instance."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SearchCache()
+        return _default_cache
@@ -0,0 +1,101 @@
+"""
+Client for the headless agent service (../agent_service).
+
+When AGENT_SERVICE_URL is set, the Streamlit app sends its runs to the
+service's worker pools instead of running the agents in its own process,
+so the app itself only renders. Standard library only: the thin client
+does not need the LangChain stack to talk to the service.
+
+The settings are read on every call rather than at import, so a value
+from .env applies whenever load_dotenv() runs.
+"""
+
+import json
+import os
+import urllib.error
+import urllib.request
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# --- Defaults (override through .env) ---
+# Covers the whole run, not only the connection; the service has its own (shorter) deadline
+DEFAULT_CLIENT_TIMEOUT_S = 300.0
+
+
+class ServiceError(RuntimeError):
+    """The service rejected or failed a run (`error_type` as in its error body: overloaded, timeout, ...)."""
+
+    def __init__(self, message: str, status: Optional[int] = None, error_type: str = "worker_failed"):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+
+
+def service_url() -> str:
+    """AGENT_SERVICE_URL without a trailing slash, or "" when the apps run the agents themselves."""
+    return os.getenv("AGENT_SERVICE_URL", "").rstrip("/")
+
+
+def service_enabled() -> bool:
+    return bool(service_url())
+
+
+def _post(path: str, payload: Dict[str, Any], stream: bool):
+    base_url = service_url()
+    timeout_s = float(os.getenv("AGENT_SERVICE_CLIENT_TIMEOUT_S", DEFAULT_CLIENT_TIMEOUT_S))
+    request = urllib.request.Request(
+        base_url + path,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream" if stream else "application/json",
+        },
+        method="POST",
+    )
+    try:
+        return urllib.request.urlopen(request, timeout=timeout_s)
+    except urllib.error.HTTPError as e:
+        try:
+            error = json.loads(e.read() or b"{}").get("error", {})
+        except ValueError:
+            error = {}
+        raise ServiceError(
+            error.get("message") or f"agent service answered {e.code}",
+            status=e.code,
+            error_type=error.get("type", "worker_failed"),
+        ) from None
+    except OSError as e:
+        raise ServiceError(f"agent service at {base_url} is unreachable: {e}") from None
+
+
+def call_service(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one task and return its result."""
+    with _post(path, payload, stream=False) as response:
+        return json.load(response)
+
+
+def stream_service(path: str, payload: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run one task and yield its (event, data) pairs as the service sends them;
+    the last one is ("result", data). Closing the generator early drops the
+    connection, which makes the service cancel the run on its worker.
+    """
+    response = _post(path, payload, stream=True)
+    try:
+        event, data = None, []
+        for raw in response:
+            line = raw.decode("utf-8").rstrip("\r\n")
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data.append(line[len("data:"):].lstrip())
+            elif not line and event:
+                body = json.loads("\n".join(data))
+                if event == "error":
+                    raise ServiceError(body.get("message", "agent run failed"), error_type=body.get("type", "worker_failed"))
+                yield event, body
+                if event == "result":
+                    return
+                event, data = None, []
+        raise ServiceError("agent service closed the stream before the result")
+    finally:
+        response.close()
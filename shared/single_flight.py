@@ -0,0 +1,130 @@
+"""
+Request coalescing: concurrent identical requests share one execution.
+
+The first caller for a fingerprint runs the work; callers that arrive while
+it is in flight wait for it and get the same result (or the same
+exception). Nothing is kept once the flight lands, so this is not a cache.
+A later request runs again.
+
+If the leader is interrupted rather than failing (a Streamlit rerun or stop
+raises a BaseException in the script thread), its waiters retry the request,
+and one of them becomes the new leader.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# --- Defaults (override through .env) ---
+# Longest a waiter blocks for another session's flight before giving up (0 = no limit)
+DEFAULT_WAIT_SECONDS = float(os.getenv("SINGLE_FLIGHT_WAIT_SECONDS", "300"))
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable key for a request; strings are compared case- and whitespace-insensitively."""
+    normalized = [" ".join(part.split()).casefold() if isinstance(part, str) else part for part in parts]
+    raw = json.dumps(normalized, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.interrupted = False
+
+
+class SingleFlight:
+    """Coalesces concurrent calls per key, for threads (do) and for asyncio (ado)."""
+
+    def __init__(self, wait_seconds: float = DEFAULT_WAIT_SECONDS):
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._tasks: Dict[Tuple[int, str], "asyncio.Task"] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def in_flight(self, key: str) -> bool:
+        with self._lock:
+            return key in self._flights
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn() unless an identical call is in flight; returns (result, shared)."""
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.executions += 1
+            if leader:
+                return self._lead(key, flight, fn), False
+            if not flight.done.wait(self.wait_seconds or None):
+                raise TimeoutError(f"identical request still running after {self.wait_seconds:.0f}s")
+            if flight.interrupted:
+                continue
+            with self._lock:
+                self.shared += 1
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+    def _lead(self, key: str, flight: _Flight, fn: Callable[[], Any]) -> Any:
+        try:
+            flight.result = fn()
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        except BaseException:
+            flight.interrupted = True
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def ado(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Async twin of do(): waiters await the leader's task; cancelling a waiter does not cancel it."""
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            shared = task is not None
+            if shared:
+                self.shared += 1
+            else:
+                task = asyncio.ensure_future(factory())
+                self._tasks[task_key] = task
+                self.executions += 1
+                task.add_done_callback(lambda _: self._forget(task_key))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, task_key: Tuple[int, str]) -> None:
+        with self._lock:
+            self._tasks.pop(task_key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights) + len(self._tasks),
+                "executions": self.executions,
+                "shared": self.shared,
+            }
+
+
+_default_flight: Optional[SingleFlight] = None
+_default_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide coalescer shared by every Streamlit session."""
+    global _default_flight
+    with _default_flight_lock:
+        if _default_flight is None:
+            _default_flight = SingleFlight()
+        return _default_flight